@@ -8,13 +8,24 @@ import re
 import subprocess
 import sys
 import time
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+# Shared pipeline helpers live next door in hermesify/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "hermesify"))
+from llm_cascade import ModelCascade
+from llm_usage import UsageLog, parse_verbose_stats
+
 DEFAULT_MODEL = "qwen2.5:7b-instruct"
 OLLAMA_TIMEOUT_SEC = 180
 RETRY_JSON_REPAIRS = 2
 
 SAVE_EVERY = 10  # checkpoint interval by grammar point index
+# --small-model: explanations must have these labels and this many words to be kept.
+EXPLANATION_LABELS = ("Pattern:", "Meaning:", "How to use:", "Edge cases:")
+MIN_EXPLANATION_WORDS = 120
+MAX_SUMMARY_WORDS = 24
+
 EMOJI_RE = re.compile(r"[\U0001F300-\U0001FAFF\U00002700-\U000027BF]")
 
 
@@ -30,10 +41,19 @@ def strip_emoji(s: str) -> str:
     return EMOJI_RE.sub("", s).strip()
 
 
-def call_ollama(model: str, prompt: str, timeout_sec: int = OLLAMA_TIMEOUT_SEC) -> str:
+def call_ollama(
+    model: str,
+    prompt: str,
+    timeout_sec: int = OLLAMA_TIMEOUT_SEC,
+    usage: Optional[UsageLog] = None,
+    field: str = "",
+    kind: str = "request",
+) -> str:
+    # --verbose puts Ollama's token/timing stats on stderr for `usage`.
+    t0 = time.perf_counter()
     try:
         p = subprocess.run(
-            ["ollama", "run", model],
+            ["ollama", "run", "--verbose", model],
             input=prompt.encode("utf-8"),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -42,10 +62,14 @@ def call_ollama(model: str, prompt: str, timeout_sec: int = OLLAMA_TIMEOUT_SEC)
     except FileNotFoundError:
         raise RuntimeError("Could not find 'ollama' on PATH.")
     except subprocess.TimeoutExpired:
+        if usage is not None:
+            usage.record(model, field, {}, time.perf_counter() - t0, kind, ok=False)
         raise RuntimeError(f"Ollama timed out after {timeout_sec}s (model={model}).")
 
     out = p.stdout.decode("utf-8", errors="replace").strip()
     err = p.stderr.decode("utf-8", errors="replace").strip()
+    if usage is not None:
+        usage.record(model, field, parse_verbose_stats(err), time.perf_counter() - t0, kind, ok=p.returncode == 0)
 
     if p.returncode != 0:
         raise RuntimeError(f"Ollama failed (code={p.returncode}): {err or out}")
@@ -262,6 +286,34 @@ def normalize_fragment(
     return exp, use, summ, notes_out
 
 
+def check_fragment(
+    obj: Dict[str, Any],
+    needs_explanation: bool,
+    needs_usage: bool,
+    needs_summary: bool,
+    needs_example_notes: bool,
+) -> Optional[str]:
+    """
+    Cheap quality gate for a --small-model fragment: None when it delivers the
+    requested fields in the prompt's format, else the reason to escalate.
+    """
+    explanation, usage, summary, example_notes = normalize_fragment(obj)
+    if needs_explanation:
+        if explanation is None:
+            return "no_explanation"
+        if any(label not in explanation for label in EXPLANATION_LABELS):
+            return "explanation_format"
+        if len(explanation.split()) < MIN_EXPLANATION_WORDS:
+            return "explanation_short"
+    if needs_usage and usage is None:
+        return "no_usage_notes"
+    if needs_summary and (summary is None or len(summary.split()) > MAX_SUMMARY_WORDS):
+        return "summary_format"
+    if needs_example_notes and example_notes is None:
+        return "no_example_notes"
+    return None
+
+
 def save_json(path: str, data: Dict[str, Any]) -> None:
     out_dir = os.path.dirname(path)
     if out_dir:
@@ -300,6 +352,11 @@ def main() -> None:
     ap.add_argument("--output", "-o", default="", help="Output grammar pack JSON path (default: --input if --in-place)")
     ap.add_argument("--in-place", action="store_true", help="Write output back to input file")
     ap.add_argument("--model", default=DEFAULT_MODEL, help=f"Ollama model (default: {DEFAULT_MODEL})")
+    ap.add_argument(
+        "--small-model",
+        default="",
+        help="Try this (faster) model first; points whose output fails validation go to --model",
+    )
     ap.add_argument("--limit", type=int, default=0, help="Process at most N grammar points (0=all)")
     ap.add_argument(
         "--mode",
@@ -331,6 +388,7 @@ def main() -> None:
         action="store_true",
         help="Also allow LLM to rewrite summary for consistency/clarity.",
     )
+    ap.add_argument("--usage-log", default="", help="Append per-call Ollama token/timing records to this JSONL (llm_usage.py)")
     args = ap.parse_args()
 
     if not args.in_place and not args.output:
@@ -379,6 +437,9 @@ def main() -> None:
         start_idx = state["next_index"]
         print(f"[RESUME] starting at grammar_points[{start_idx}]", file=sys.stderr)
 
+    cascade = ModelCascade.from_args(args.model, args.small_model)
+    usage_log = UsageLog("grammar", args.usage_log)
+
     processed = 0
     changed_points = 0
     llm_calls = 0
@@ -426,30 +487,42 @@ def main() -> None:
             args.fill_example_notes,
             args.rewrite_summary,
         )
-        raw = ""
+        field = "+".join(
+            name for name, wanted in (
+                ("explanation", needs_explanation),
+                ("usage_notes", needs_usage),
+                ("summary", needs_summary),
+                ("example_notes", needs_example_notes),
+            ) if wanted
+        )
 
-        try:
-            raw = call_ollama(args.model, prompt)
+        def request_fragment(model: str) -> Dict[str, Any]:
+            nonlocal llm_calls
+            raw = call_ollama(model, prompt, usage=usage_log, field=field)
             llm_calls += 1
 
-            frag_obj = None
             last_err: Optional[Exception] = None
-
             for attempt in range(RETRY_JSON_REPAIRS + 1):
                 try:
-                    frag_obj = coerce_json_object(raw)
-                    break
+                    return coerce_json_object(raw)
                 except Exception as e:
                     last_err = e
                     if attempt < RETRY_JSON_REPAIRS:
                         raw = call_ollama(
-                            args.model,
+                            model,
                             repair_prompt(raw, args.fill_example_notes, args.rewrite_summary),
+                            usage=usage_log,
+                            field=field,
+                            kind="repair",
                         )
                         llm_calls += 1
+            raise ValueError(f"JSON parse failed after retries: {last_err}")
 
-            if frag_obj is None:
-                raise ValueError(f"JSON parse failed after retries: {last_err}")
+        try:
+            frag_obj, _ = cascade.run(
+                request_fragment,
+                lambda obj: check_fragment(obj, needs_explanation, needs_usage, needs_summary, needs_example_notes),
+            )
 
             explanation, usage, summary, example_notes = normalize_fragment(frag_obj)
 
@@ -508,6 +581,13 @@ def main() -> None:
     print(f"[DONE] Already complete (skipped): {skipped_complete}")
     print(f"[DONE] Failed points: {failed_points}")
     print(f"[DONE] LLM calls (incl repairs): {llm_calls}")
+    if args.small_model:
+        print(cascade.summary())
+    usage_log.close()
+    if llm_calls:
+        print(usage_log.summary())
+    if args.usage_log:
+        print(f"[DONE] Per-call usage log: {args.usage_log}")
 
     if args.dry_run:
         print("[DRY RUN] No output written.")
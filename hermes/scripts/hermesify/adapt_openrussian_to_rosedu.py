@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import argparse
-import json
+
+from jsonl_io import JsonlWriter, loads
 
 
 def adapt_entry(entry: dict) -> dict:
@@ -35,15 +36,15 @@ def main():
 
     count = 0
 
-    with open(args.input, "r", encoding="utf-8") as fin, open(args.output, "w", encoding="utf-8") as fout:
+    with open(args.input, "rb") as fin, JsonlWriter(args.output) as fout:
         for line_no, line in enumerate(fin, start=1):
             line = line.strip()
             if not line:
                 continue
 
             try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
+                entry = loads(line)
+            except ValueError:
                 print(f"[WARN] Skipping invalid JSON on line {line_no}", flush=True)
                 continue
 
@@ -54,7 +55,7 @@ def main():
                 print(f"[WARN] Empty word on line {line_no}; source keys: {list(entry.keys())}", flush=True)
                 continue
 
-            fout.write(json.dumps(adapted, ensure_ascii=False) + "\n")
+            fout.write(adapted)
             count += 1
 
     print(f"Converted {count} entries → {args.output}")
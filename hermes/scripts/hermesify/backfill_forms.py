@@ -2,24 +2,20 @@
 from __future__ import annotations
 
 import argparse
-import json
-import re
+import os
 from typing import Any, Dict, List, Optional, Tuple
 
+from fingerprint import forms_fingerprint, matches, set_fingerprint, strip_stress
+from jsonl_io import JsonlWriter, loads
+
 try:
     import pymorphy2
 except Exception:  # pragma: no cover
     pymorphy2 = None
 
-STRESS_RE = re.compile(r"\u0301")
-
 MORPH = pymorphy2.MorphAnalyzer() if pymorphy2 is not None else None
 
 
-def strip_stress(text: str) -> str:
-    return STRESS_RE.sub("", text or "")
-
-
 def guess_pos_from_morph(p: Any) -> str:
     pos = (p.tag.POS or "").upper()
     if pos == "NOUN":
@@ -217,7 +213,12 @@ def generate_forms(base_form_stressed: str) -> Tuple[str, str, List[Dict[str, An
     return lemma, pos, dedupe_forms(forms)
 
 
-def should_backfill(entry: Dict[str, Any], only_missing: bool) -> bool:
+def should_backfill(entry: Dict[str, Any], only_missing: bool, incremental: bool = False, force: bool = False) -> bool:
+    if force or not (only_missing or incremental):
+        return True
+    # Forms already produced by the current generator are up to date.
+    if matches(entry, forms=forms_fingerprint()):
+        return False
     if not only_missing:
         return True
     forms = entry.get("forms")
@@ -234,6 +235,13 @@ def main() -> None:
     ap.add_argument("--in-place", action="store_true", help="Rewrite input file")
     ap.add_argument("--only-missing", action="store_true", help="Only update entries with missing/minimal forms")
     ap.add_argument("--keep-pos", action="store_true", help="Do not overwrite vocab_item.part_of_speech")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip entries whose forms fingerprint is current (--only-missing also skips them)",
+    )
+    ap.add_argument("--force", action="store_true", help="With --only-missing/--incremental: regenerate every entry anyway")
+    ap.add_argument("--write-index", action="store_true", help="Also write the <output>.idx offset sidecar (jsonl_index.py)")
     args = ap.parse_args()
 
     if MORPH is None:
@@ -250,7 +258,9 @@ def main() -> None:
     updated = 0
     skipped = 0
 
-    with open(args.input, "r", encoding="utf-8") as fin, open(out_path, "w", encoding="utf-8") as fout:
+    # Write next to the output and swap at the end, so --in-place never reads a truncated file.
+    tmp_path = out_path + ".tmp"
+    with open(args.input, "rb") as fin, JsonlWriter(tmp_path) as fout:
         for line_no, line in enumerate(fin, start=1):
             s = line.strip()
             if not s:
@@ -258,30 +268,30 @@ def main() -> None:
             total += 1
 
             try:
-                entry = json.loads(s)
-            except json.JSONDecodeError:
-                fout.write(line)
+                entry = loads(s)
+            except ValueError:
+                fout.write_line(line)
                 skipped += 1
                 continue
 
             if not isinstance(entry, dict):
-                fout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                fout.write(entry)
                 skipped += 1
                 continue
 
-            if not should_backfill(entry, args.only_missing):
-                fout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if not should_backfill(entry, args.only_missing, args.incremental, args.force):
+                fout.write(entry)
                 continue
 
             vocab_item = entry.get("vocab_item") if isinstance(entry.get("vocab_item"), dict) else None
             if not vocab_item:
-                fout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                fout.write(entry)
                 skipped += 1
                 continue
 
             base_form = (vocab_item.get("base_form") or vocab_item.get("lookup_form") or "").strip()
             if not base_form:
-                fout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                fout.write(entry)
                 skipped += 1
                 continue
 
@@ -290,12 +300,18 @@ def main() -> None:
                 entry["forms"] = forms
                 if not args.keep_pos:
                     vocab_item["part_of_speech"] = morph_pos
+                set_fingerprint(entry, forms=forms_fingerprint())
                 updated += 1
             except Exception:
                 skipped += 1
 
-            fout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            fout.write(entry)
+
+    os.replace(tmp_path, out_path)
+    if args.write_index:
+        from jsonl_index import build_index
 
+        build_index(out_path)
     print(f"[DONE] total={total} updated={updated} skipped={skipped} out={out_path}")
 
 
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Incremental build for the RU vocab packs:
+
+  scrape -> adapt -> transform -> backfill -> enrich   (per CEFR level)
+  dedupe -> publish -> index                           (across all levels)
+
+Each stage records a stamp under <work-dir>/.build/ with content hashes of its
+inputs, its command-line parameters and the versions of the tools it runs
+(source hashes of the script and every local module it imports, transitively,
++ relevant package versions). A stage reruns only when
+that stamp no longer matches, so a rebuild after editing one level's seed
+file reruns that level's chain and the shared tail, nothing else.
+
+Within a stale stage, transform/backfill/enrich use per-entry fingerprints
+(see fingerprint.py) to recompute only the entries whose inputs changed.
+
+Levels build in parallel (--jobs). --dry-run prints what would run and why.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+HERMESIFY_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = HERMESIFY_DIR.parent
+HERMES_DIR = SCRIPTS_DIR.parent
+
+SCRAPER = SCRIPTS_DIR / "russian_vocab_scraper" / "scrape_openrussian_vocab.py"
+ADAPT = HERMESIFY_DIR / "adapt_openrussian_to_rosedu.py"
+TRANSFORM = HERMESIFY_DIR / "transform_vocab_to_hermes.py"
+BACKFILL = HERMESIFY_DIR / "backfill_forms.py"
+ENRICH = HERMESIFY_DIR / "llmenrich.py"
+DEDUPE = HERMESIFY_DIR / "dedupe_vocab_by_level.py"
+FORM_INDEX = HERMESIFY_DIR / "form_index.py"
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+STAGES = ["scrape", "adapt", "transform", "backfill", "enrich", "dedupe", "publish", "index"]
+
+
+@dataclass
+class Stage:
+    name: str
+    level: str                         # CEFR level, or "all" for cross-level stages
+    inputs: List[Path]
+    outputs: List[Path]
+    cmd: Optional[List[str]] = None    # subprocess to run; None for in-process `action`
+    action: Optional[Callable[[], None]] = None
+    prepare: Optional[Callable[[], None]] = None  # runs before `cmd`
+    tools: List[Path] = field(default_factory=list)
+    packages: List[str] = field(default_factory=list)
+
+    @property
+    def id(self) -> str:
+        return f"{self.level}.{self.name}"
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def package_version(name: str) -> Optional[str]:
+    try:
+        from importlib.metadata import version
+
+        return version(name)
+    except Exception:
+        return None
+
+
+def local_modules(script: Path) -> List[Path]:
+    """`script` plus the modules it imports from its own directory or hermesify/, transitively."""
+    seen: Dict[Path, None] = {}
+    stack = [script]
+    while stack:
+        path = stack.pop()
+        if path in seen or not path.exists():
+            continue
+        seen[path] = None
+        # ast.walk also finds imports inside functions (e.g. the lazy `import jsonl_index`).
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"), str(path))):
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                for d in (path.parent, HERMESIFY_DIR):
+                    candidate = d / f"{name.split('.')[0]}.py"
+                    if candidate.exists():
+                        stack.append(candidate)
+                        break
+    return sorted(seen, key=rel)
+
+
+def tool_fingerprint(stage: Stage) -> Dict[str, Optional[str]]:
+    tools: Dict[str, Optional[str]] = {"python": ".".join(map(str, sys.version_info[:3]))}
+    for t in stage.tools:
+        for module in local_modules(t) or [t]:
+            tools[module.name] = file_sha256(module)
+    for pkg in stage.packages:
+        tools[pkg] = package_version(pkg)
+    return tools
+
+
+def stage_params(stage: Stage) -> List[str]:
+    # The interpreter path is machine-specific; everything after it is the stage's parameters.
+    return [rel(Path(a)) if os.path.isabs(a) else a for a in (stage.cmd or [])[1:]]
+
+
+def rel(path: Path) -> str:
+    try:
+        return str(path.resolve().relative_to(HERMES_DIR))
+    except ValueError:
+        return str(path)
+
+
+class Stamps:
+    def __init__(self, work_dir: Path):
+        self.dir = work_dir / ".build"
+
+    def path(self, stage: Stage) -> Path:
+        return self.dir / f"{stage.id}.json"
+
+    def load(self, stage: Stage) -> Optional[Dict]:
+        p = self.path(stage)
+        if not p.exists():
+            return None
+        with p.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, stage: Stage, record: Dict) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        p = self.path(stage)
+        tmp = p.with_suffix(".json.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        tmp.replace(p)
+
+
+def current_record(stage: Stage) -> Dict:
+    return {
+        "stage": stage.name,
+        "level": stage.level,
+        "inputs": {rel(p): file_sha256(p) for p in stage.inputs},
+        "params": stage_params(stage),
+        "tools": tool_fingerprint(stage),
+    }
+
+
+def stale_reason(stage: Stage, stamps: Stamps, forced: bool) -> Optional[str]:
+    """Returns why `stage` must run, or None if it is up to date."""
+    if forced:
+        return "forced"
+    missing_in = [rel(p) for p in stage.inputs if not p.exists()]
+    if missing_in:
+        return f"missing input {missing_in[0]}"
+    missing_out = [rel(p) for p in stage.outputs if not p.exists()]
+    if missing_out:
+        return f"missing output {missing_out[0]}"
+    prev = stamps.load(stage)
+    if prev is None:
+        return "never built"
+    cur = current_record(stage)
+    for path, digest in cur["inputs"].items():
+        if prev.get("inputs", {}).get(path) != digest:
+            return f"input changed: {path}"
+    if prev.get("params") != cur["params"]:
+        return "parameters changed"
+    for tool, ver in cur["tools"].items():
+        if prev.get("tools", {}).get(tool) != ver:
+            return f"tool changed: {tool}"
+    for path in stage.outputs:
+        if prev.get("outputs", {}).get(rel(path)) != file_sha256(path):
+            return f"output modified: {rel(path)}"
+    return None
+
+
+def write_stamp(stage: Stage, stamps: Stamps, started: float) -> None:
+    record = current_record(stage)
+    record["outputs"] = {rel(p): file_sha256(p) for p in stage.outputs}
+    record["built_at"] = now_iso()
+    record["duration_s"] = round(time.time() - started, 2)
+    stamps.save(stage, record)
+
+
+def run_stage(stage: Stage, stamps: Stamps, log_dir: Path) -> None:
+    for out in stage.outputs:
+        out.parent.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+    if stage.prepare:
+        stage.prepare()
+    if stage.cmd:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = log_dir / f"{stage.id}.log"
+        with log_path.open("w", encoding="utf-8") as log:
+            rc = subprocess.call(stage.cmd, stdout=log, stderr=subprocess.STDOUT, cwd=str(HERMES_DIR))
+        if rc != 0:
+            raise RuntimeError(f"{stage.id} failed (exit {rc}); see {log_path}")
+    elif stage.action:
+        stage.action()
+
+    missing = [rel(p) for p in stage.outputs if not p.exists()]
+    if missing:
+        raise RuntimeError(f"{stage.id} finished but did not produce {missing[0]}")
+    write_stamp(stage, stamps, started)
+
+
+# ----------------------------
+# Build graph
+# ----------------------------
+
+def level_stages(level: str, args: argparse.Namespace, work: Path) -> List[Stage]:
+    py = sys.executable
+    scraped = work / f"openrussian_vocab_{level}.jsonl"
+    adapted = work / f"rosedu_adapted_{level}.jsonl"
+    transformed = work / f"{level}.jsonl"
+    backfilled = work / f"{level}.forms.jsonl"
+    enriched = work / f"{level}.enriched.jsonl"
+
+    transform_cmd = [
+        py, str(TRANSFORM),
+        "--input", str(adapted),
+        "--out", str(transformed),
+        "--progress", str(work / f"{level}.progress.json"),
+        "--ollama-model", args.transform_model,
+        "--incremental",
+    ]
+    if args.no_llm:
+        transform_cmd.append("--no-llm")
+
+    return [
+        Stage(
+            "scrape", level, inputs=[], outputs=[scraped],
+            cmd=[py, str(SCRAPER), "--levels", level, "--outdir", str(work), "--headless", "--quiet"],
+            tools=[SCRAPER], packages=["playwright"],
+        ),
+        Stage(
+            "adapt", level, inputs=[scraped], outputs=[adapted],
+            cmd=[py, str(ADAPT), "--input", str(scraped), "--output", str(adapted)],
+            tools=[ADAPT],
+        ),
+        Stage(
+            "transform", level, inputs=[adapted], outputs=[transformed],
+            cmd=transform_cmd,
+            tools=[TRANSFORM], packages=["pymorphy2", "beautifulsoup4", "requests"],
+        ),
+        Stage(
+            "backfill", level, inputs=[transformed], outputs=[backfilled],
+            cmd=[py, str(BACKFILL), "--input", str(transformed), "--output", str(backfilled), "--only-missing"],
+            tools=[BACKFILL], packages=["pymorphy2"],
+        ),
+        Stage(
+            "enrich", level, inputs=[backfilled], outputs=[enriched],
+            cmd=[py, str(ENRICH), "--input", str(backfilled), "--output", str(enriched), "--model", args.enrich_model, "--incremental"],
+            tools=[ENRICH],
+        ),
+    ]
+
+
+def shared_stages(levels: List[str], args: argparse.Namespace, work: Path, pack_dir: Path) -> List[Stage]:
+    staging = work / "dedupe"
+    enriched = [work / f"{lvl}.enriched.jsonl" for lvl in levels]
+    staged = [staging / f"{lvl}.jsonl" for lvl in levels]
+    published = [pack_dir / f"{lvl}.jsonl" for lvl in levels]
+    removed = staging / "dedupe_removed.jsonl"
+
+    def stage_inputs() -> None:
+        staging.mkdir(parents=True, exist_ok=True)
+        for src, dst in zip(enriched, staged):
+            shutil.copyfile(src, dst)
+
+    def publish() -> None:
+        pack_dir.mkdir(parents=True, exist_ok=True)
+        for src, dst in zip(staged, published):
+            tmp = dst.with_suffix(".jsonl.tmp")
+            shutil.copyfile(src, tmp)
+            tmp.replace(dst)
+
+    return [
+        # dedupe rewrites its directory in place, so seed it from the enriched files first.
+        Stage(
+            "dedupe", "all", inputs=enriched, outputs=staged + [removed],
+            cmd=[sys.executable, str(DEDUPE), "--vocab-dir", str(staging), "--apply", "--removed-out", str(removed)],
+            prepare=stage_inputs,
+            tools=[DEDUPE],
+        ),
+        Stage("publish", "all", inputs=staged, outputs=published, action=publish, tools=[Path(__file__)]),
+        # Offsets in the index point into the published files.
+        Stage(
+            "index", "all", inputs=published, outputs=[work / "forms.idx"],
+            cmd=[sys.executable, str(FORM_INDEX), "build", *map(str, published), "--out", str(work / "forms.idx")],
+            tools=[FORM_INDEX],
+        ),
+    ]
+
+
+# ----------------------------
+# Driver
+# ----------------------------
+
+class Builder:
+    def __init__(self, args: argparse.Namespace, stamps: Stamps, log_dir: Path):
+        self.args = args
+        self.stamps = stamps
+        self.log_dir = log_dir
+        self.ran: List[str] = []
+        self.skipped: List[str] = []
+
+    def forced(self, stage: Stage) -> bool:
+        if stage.name in self.args.force:
+            return True
+        return bool(self.args.from_stage) and STAGES.index(stage.name) >= STAGES.index(self.args.from_stage)
+
+    def build_chain(self, stages: List[Stage]) -> None:
+        """Runs a dependency chain in order. Once a stage runs, later stages re-check staleness against new outputs."""
+        upstream_pending = False
+        for stage in stages:
+            reason = stale_reason(stage, self.stamps, self.forced(stage))
+            if self.args.adopt:
+                if reason and all(p.exists() for p in stage.inputs + stage.outputs):
+                    write_stamp(stage, self.stamps, time.time())
+                    print(f"[ADOPT] {stage.id}")
+                continue
+            if self.args.dry_run:
+                if upstream_pending and reason != "forced":
+                    reason = "upstream will rerun"
+                if reason:
+                    upstream_pending = True
+                    print(f"[WOULD RUN] {stage.id:<16} {reason}")
+                else:
+                    print(f"[UP TO DATE] {stage.id}")
+                continue
+            if reason is None:
+                self.skipped.append(stage.id)
+                print(f"[UP TO DATE] {stage.id}")
+                continue
+            print(f"[RUN] {stage.id:<16} {reason}", flush=True)
+            run_stage(stage, self.stamps, self.log_dir)
+            self.ran.append(stage.id)
+            print(f"[OK]  {stage.id}", flush=True)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Incrementally build RU vocab packs; reruns only stale stages.")
+    ap.add_argument("--levels", nargs="+", default=LEVELS, help="CEFR levels to build (dedupe/publish need all six)")
+    ap.add_argument("--work-dir", default=str(HERMESIFY_DIR / "out" / "build"), help="Intermediate outputs + build stamps")
+    ap.add_argument("--pack-dir", default=str(HERMES_DIR / "src" / "assets" / "packs" / "ru" / "vocab"))
+    ap.add_argument("--jobs", "-j", type=int, default=3, help="Levels to build in parallel")
+    ap.add_argument("--dry-run", action="store_true", help="Explain what would run without running anything")
+    ap.add_argument("--adopt", action="store_true", help="Stamp existing outputs as up to date without running anything")
+    ap.add_argument("--force", nargs="*", default=[], choices=STAGES, help="Rerun these stages regardless of stamps")
+    ap.add_argument("--from-stage", choices=STAGES, default=None, help="Force this stage and every later one")
+    ap.add_argument("--no-publish", action="store_true", help="Stop after the per-level stages")
+    ap.add_argument("--transform-model", default="gemma3:4b")
+    ap.add_argument("--enrich-model", default="qwen2.5:7b-instruct")
+    ap.add_argument("--no-llm", action="store_true", help="Pass --no-llm to the transform stage")
+    args = ap.parse_args()
+
+    levels = [lvl.upper() for lvl in args.levels]
+    work = Path(args.work_dir).resolve()
+    pack_dir = Path(args.pack_dir).resolve()
+    stamps = Stamps(work)
+    builder = Builder(args, stamps, work / ".build" / "logs")
+
+    chains = [level_stages(lvl, args, work) for lvl in levels]
+    failures: List[str] = []
+
+    if args.dry_run or args.adopt:
+        for chain in chains:
+            builder.build_chain(chain)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex:
+            futures = {ex.submit(builder.build_chain, chain): chain[0].level for chain in chains}
+            for fut, level in futures.items():
+                try:
+                    fut.result()
+                except Exception as e:
+                    failures.append(level)
+                    print(f"[FAIL] {level}: {e}", file=sys.stderr)
+
+    if failures:
+        print(f"[STOP] levels failed: {', '.join(failures)}; skipping dedupe/publish", file=sys.stderr)
+        return 1
+
+    if not args.no_publish:
+        if sorted(levels) != LEVELS:
+            print("[SKIP] dedupe/publish need all six levels; pass --no-publish to silence", file=sys.stderr)
+        else:
+            builder.build_chain(shared_stages(levels, args, work, pack_dir))
+
+    if not (args.dry_run or args.adopt):
+        print(f"[DONE] ran={len(builder.ran)} up_to_date={len(builder.skipped)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Compile the bundled vocab JSONL + grammar JSON packs into a ready-made SQLite
+database in the app's schema, so the device doesn't have to parse and insert
+every row one at a time on install.
+
+The table/index DDL is read straight from shared/schema.ts, and pack order and
+level tags from the packs' index.ts files, so the output stays in step with the
+app. Row semantics mirror vocabPackImporter.ts / grammarPackImporter.ts: the
+same external ids, the same upsert-by-external-id-then-natural-key rules, the
+same CEFR tag preservation across levels. Rows are built in memory, written
+with executemany in one transaction, then ANALYZE + VACUUM.
+
+The app can ATTACH the file and copy tables with INSERT ... SELECT.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from jsonl_io import loads
+
+HERMES_DIR = Path(__file__).resolve().parent.parent.parent
+SCHEMA_TS = HERMES_DIR / "shared" / "schema.ts"
+PACKS_DIR = HERMES_DIR / "src" / "assets" / "packs"
+
+PACK_DB_FORMAT = 1
+
+# Tables the packs populate; everything else in schema.ts is per-user state.
+PACK_TABLES = [
+    "languages",
+    "vocab_items",
+    "vocab_senses",
+    "vocab_forms",
+    "vocab_media",
+    "vocab_examples",
+    "vocab_tags",
+    "vocab_item_tags",
+    "grammar_points",
+    "grammar_examples",
+    "grammar_sections",
+    "grammar_point_sections",
+    "grammar_tags",
+    "grammar_point_tags",
+]
+
+CEFR_TAG_RE = re.compile(r"^cefr\s*:\s*([abc][12])$", re.I)
+CEFR_STRICT_RE = re.compile(r"^CEFR:(A1|A2|B1|B2|C1|C2)$", re.I)
+PACK_REF_RE = re.compile(
+    r'name:\s*"(?P<name>[^"]+)",\s*asset:\s*require\("(?P<asset>[^"]+)"\)(?:,\s*levelTag:\s*"(?P<level_tag>[^"]+)")?'
+)
+
+
+def now_iso() -> str:
+    # Same shape as JS Date.toISOString()
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ----------------------------
+# Schema + pack discovery
+# ----------------------------
+
+def load_schema_statements(schema_ts: Path) -> List[str]:
+    """CREATE TABLE/INDEX statements from schema.ts for the pack tables only."""
+    text = schema_ts.read_text(encoding="utf-8")
+    statements = re.findall(r"`([^`]*)`", text)
+    out: List[str] = []
+    for stmt in statements:
+        m = re.search(r"CREATE\s+TABLE\s+IF\s+NOT\s+EXISTS\s+(\w+)", stmt, re.I)
+        if m and m.group(1) in PACK_TABLES:
+            out.append(stmt)
+            continue
+        m = re.search(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+IF\s+NOT\s+EXISTS\s+\w+\s+ON\s+(\w+)", stmt, re.I)
+        if m and m.group(1) in PACK_TABLES:
+            out.append(stmt)
+    return out
+
+
+@dataclass
+class PackRef:
+    name: str
+    path: Path
+    level_tag: Optional[str]
+
+
+def load_pack_refs(index_ts: Path) -> List[PackRef]:
+    text = index_ts.read_text(encoding="utf-8")
+    refs = []
+    for m in PACK_REF_RE.finditer(text):
+        refs.append(PackRef(m.group("name"), (index_ts.parent / m.group("asset")).resolve(), m.group("level_tag")))
+    return refs
+
+
+# ----------------------------
+# Importer semantics
+# ----------------------------
+
+def encode_id_part(s: str) -> str:
+    # encodeURIComponent(s.normalize("NFKC").trim().toLowerCase())
+    return quote(unicodedata.normalize("NFKC", s).strip().lower(), safe="-_.!~*'()")
+
+
+def default_external_id(base_form: str, pos: str) -> str:
+    return f"auto:vocab:{encode_id_part(base_form)}:{encode_id_part(pos)}"
+
+
+def normalize_tag_name(name: str) -> str:
+    trimmed = name.strip()
+    m = CEFR_TAG_RE.match(trimmed)
+    if m:
+        return f"CEFR:{m.group(1).upper()}"
+    return trimmed
+
+
+def is_cefr_tag(name: str) -> bool:
+    return bool(CEFR_STRICT_RE.match(name.strip()))
+
+
+def as_json_or_none(v: Any) -> Optional[str]:
+    if v is None:
+        return None
+    return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+
+
+def truthy_int(v: Any) -> int:
+    if v is True:
+        return 1
+    if v is False:
+        return 0
+    if v in (0, 1):
+        return int(v)
+    return 1 if v else 0
+
+
+def slugify_id_part(s: str) -> str:
+    s = re.sub(r"['\"]", "", s.lower().strip())
+    s = re.sub(r"[^a-z0-9]+", "-", s)
+    return s.strip("-")
+
+
+@dataclass
+class VocabItem:
+    id: int
+    row: Dict[str, Any]
+    forms: List[Dict[str, Any]] = field(default_factory=list)
+    media: List[Dict[str, Any]] = field(default_factory=list)
+    senses: List[Dict[str, Any]] = field(default_factory=list)
+    tag_ids: Dict[int, None] = field(default_factory=dict)  # ordered set
+
+
+class TagTable:
+    def __init__(self) -> None:
+        self.rows: Dict[Any, Tuple[int, Optional[str], str]] = {}
+
+    def ensure(self, key: Any, description: Optional[str], ts: str) -> int:
+        # INSERT OR IGNORE: the first description wins.
+        if key not in self.rows:
+            self.rows[key] = (len(self.rows) + 1, description, ts)
+        return self.rows[key][0]
+
+
+class PackDb:
+    def __init__(self, language_id: int, ts: str):
+        self.language_id = language_id
+        self.ts = ts
+        self.items: List[VocabItem] = []
+        self.by_external: Dict[str, VocabItem] = {}
+        self.by_natural: Dict[Tuple[str, str], VocabItem] = {}
+        self.vocab_tags = TagTable()
+        self.grammar_tags = TagTable()
+        self.sections: Dict[int, Dict[str, Any]] = {}
+        self.points: Dict[int, Dict[str, Any]] = {}
+        self.stats: Dict[str, int] = {"vocab_lines": 0, "vocab_skipped": 0, "vocab_updated": 0, "grammar_points": 0}
+
+    # -- vocab --
+
+    def _find_item(self, external_id: str, base: str, pos: str) -> Optional[VocabItem]:
+        item = self.by_external.get(external_id)
+        if item is not None:
+            return item
+        item = self.by_natural.get((base, pos))
+        if item is not None and (item.row["base_form"], item.row["part_of_speech"]) == (base, pos):
+            return item
+        # by_natural can be stale if an update renamed the item; fall back to a scan (ORDER BY id ASC).
+        for cand in self.items:
+            if (cand.row["base_form"], cand.row["part_of_speech"]) == (base, pos):
+                return cand
+        return None
+
+    def import_vocab_pack(self, pack: PackRef) -> None:
+        ts = self.ts
+        with pack.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line:
+                    continue
+                self.stats["vocab_lines"] += 1
+                try:
+                    obj = loads(line)
+                except ValueError:
+                    self.stats["vocab_skipped"] += 1
+                    continue
+                vi = obj.get("vocab_item") if isinstance(obj, dict) else None
+                if not vi:
+                    self.stats["vocab_skipped"] += 1
+                    continue
+                base = (vi.get("base_form") or "").strip()
+                pos = (vi.get("part_of_speech") or "").strip()
+                if not base or not pos:
+                    self.stats["vocab_skipped"] += 1
+                    continue
+                external_id = (vi.get("external_id") or "").strip() or default_external_id(base, pos)
+
+                row = {
+                    "language_id": self.language_id,
+                    "external_id": external_id,
+                    "base_form": base,
+                    "part_of_speech": pos,
+                    "frequency_rank": vi.get("frequency_rank"),
+                    "frequency_band": vi.get("frequency_band"),
+                    "lexeme_features": as_json_or_none(vi.get("lexeme_features")) if vi.get("lexeme_features") else None,
+                    "usage_notes": vi.get("usage_notes"),
+                    "updated_at": vi.get("updated_at") or ts,
+                }
+
+                item = self._find_item(external_id, base, pos)
+                if item is not None:
+                    self.stats["vocab_updated"] += 1
+                    if item.row["external_id"] != external_id:
+                        self.by_external.pop(item.row["external_id"], None)
+                    row["created_at"] = item.row["created_at"]
+                    item.row = row
+                    # Children are replaced; only CEFR tags survive the re-import.
+                    preserved = [
+                        name for name, (tid, _, _) in self.vocab_tags.rows.items() if tid in item.tag_ids
+                    ]
+                    item.forms, item.media, item.senses, item.tag_ids = [], [], [], {}
+                    for name in preserved:
+                        normalized = normalize_tag_name(name)
+                        if is_cefr_tag(normalized):
+                            item.tag_ids[self.vocab_tags.ensure(normalized, None, ts)] = None
+                else:
+                    row["created_at"] = vi.get("created_at") or ts
+                    item = VocabItem(id=len(self.items) + 1, row=row)
+                    self.items.append(item)
+                    self.by_natural.setdefault((base, pos), item)
+                self.by_external[external_id] = item
+
+                for fm in obj.get("forms") or []:
+                    sf = (fm.get("surface_form") or "").strip()
+                    if not sf:
+                        continue
+                    item.forms.append({
+                        "surface_form": sf,
+                        "tense": fm.get("tense"),
+                        "mood": fm.get("mood"),
+                        "person": fm.get("person"),
+                        "number": fm.get("number"),
+                        "gender": fm.get("gender"),
+                        "case": fm.get("case"),
+                        "aspect": fm.get("aspect"),
+                        "degree": fm.get("degree"),
+                        "morph_features": as_json_or_none(fm.get("morph_features")) if fm.get("morph_features") else None,
+                        "is_irregular": truthy_int(fm.get("is_irregular")),
+                        "created_at": fm.get("created_at") or ts,
+                        "updated_at": fm.get("updated_at") or ts,
+                    })
+
+                for m in obj.get("media") or []:
+                    uri = (m.get("uri") or "").strip()
+                    mt = (m.get("media_type") or "").strip()
+                    if not uri or not mt:
+                        continue
+                    item.media.append({
+                        "media_type": mt,
+                        "uri": uri,
+                        "description": m.get("description"),
+                        "attribution": m.get("attribution"),
+                        "created_at": m.get("created_at") or ts,
+                        "updated_at": m.get("updated_at") or ts,
+                    })
+
+                for s in obj.get("senses") or []:
+                    examples = []
+                    for ex in s.get("examples") or []:
+                        ex_text = (ex.get("ru") or "").strip()
+                        if not ex_text:
+                            continue
+                        examples.append({
+                            "example_text": ex_text,
+                            "translation_text": ex.get("en"),
+                            "surface_form": (ex.get("surface_form") or "").strip(),
+                            "media_uri": (ex.get("media_uri") or "").strip(),
+                            "created_at": ex.get("created_at") or ts,
+                            "updated_at": ex.get("updated_at") or ts,
+                        })
+                    item.senses.append({
+                        "sense_index": int(s.get("sense_index") or 1),
+                        "definition": s.get("definition"),
+                        "translation": s.get("translation"),
+                        "usage_notes": s.get("usage_notes"),
+                        "grammar_hint": s.get("grammar_hint"),
+                        "created_at": s.get("created_at") or ts,
+                        "updated_at": s.get("updated_at") or ts,
+                        "examples": examples,
+                    })
+
+                tags: List[Any] = []
+                own_tags = obj.get("tags") or []
+                item_has_cefr = any(
+                    is_cefr_tag(normalize_tag_name(t if isinstance(t, str) else (t.get("name") or "")))
+                    for t in own_tags
+                )
+                if pack.level_tag and not item_has_cefr:
+                    tags.append(pack.level_tag)
+                tags.extend(own_tags)
+                for t in tags:
+                    raw = (t if isinstance(t, str) else (t.get("name") or "")).strip()
+                    name = normalize_tag_name(raw)
+                    if not name:
+                        continue
+                    desc = t.get("description") if isinstance(t, dict) else None
+                    item.tag_ids[self.vocab_tags.ensure(name, desc, ts)] = None
+
+    # -- grammar --
+
+    def _find_by(self, table: Dict[int, Dict[str, Any]], external_id: str, title: str) -> Optional[int]:
+        for rid, row in table.items():
+            if row["external_id"] == external_id:
+                return rid
+        for rid, row in table.items():  # ORDER BY id ASC
+            if row["title"] == title:
+                return rid
+        return None
+
+    def _upsert_section(self, slug: str, s: Dict[str, Any], parent_id: Optional[int]) -> int:
+        ts = self.ts
+        external_id = f"grammar-section:{slug}"
+        values = {
+            "external_id": external_id,
+            "title": s["title"],
+            "description": s.get("description"),
+            "parent_id": parent_id,
+            "sort_order": s.get("sort_order") or 0,
+            "updated_at": ts,
+        }
+        rid = self._find_by(self.sections, external_id, s["title"])
+        if rid is not None:
+            self.sections[rid].update(values)
+            return rid
+        rid = len(self.sections) + 1
+        self.sections[rid] = dict(values, created_at=ts)
+        return rid
+
+    def import_grammar_pack(self, pack: PackRef) -> None:
+        ts = self.ts
+        with pack.path.open("r", encoding="utf-8") as f:
+            obj = json.load(f)
+
+        by_slug: Dict[str, Dict[str, Any]] = {}
+        for s in obj.get("sections") or []:
+            slug = (s.get("slug") or "").strip()
+            title = (s.get("title") or "").strip()
+            if slug and title:
+                by_slug[slug] = s
+
+        # Parents must be upserted first, and only parents from this same pack resolve.
+        upserted: Dict[str, int] = {}
+        pending = list(by_slug.keys())
+        while pending:
+            progressed = False
+            for slug in list(pending):
+                s = by_slug[slug]
+                parent_slug = (s.get("parent_slug") or "").strip()
+                parent_id = None
+                if parent_slug:
+                    if parent_slug not in upserted:
+                        continue
+                    parent_id = upserted[parent_slug]
+                upserted[slug] = self._upsert_section(slug, s, parent_id)
+                pending.remove(slug)
+                progressed = True
+            if not progressed:
+                for slug in list(pending):
+                    upserted[slug] = self._upsert_section(slug, by_slug[slug], None)
+                    pending.remove(slug)
+
+        tag_ids: Dict[str, int] = {}
+        for t in obj.get("tags") or []:
+            name = (t.get("name") or "").strip()
+            if name:
+                tag_ids[name] = self.grammar_tags.ensure(name, t.get("description"), ts)
+
+        auto_level = ((obj.get("meta") or {}).get("level") or "").strip()
+        level_tag = (pack.level_tag or (f"CEFR:{auto_level}" if auto_level else "")).strip()
+        if level_tag:
+            tag_ids[level_tag] = self.grammar_tags.ensure(level_tag, f"CEFR level from pack {pack.name}", ts)
+
+        for gp in obj.get("grammar_points") or []:
+            title = (gp.get("title") or "").strip()
+            if not title:
+                continue
+            self.stats["grammar_points"] += 1
+            slug = (gp.get("slug") or "").strip()
+            external_id = f"grammar-point:{slug}" if slug else f"grammar-point:title:{slugify_id_part(title)}"
+            values = {
+                "external_id": external_id,
+                "title": title,
+                "summary": gp.get("summary"),
+                "explanation": gp.get("explanation"),
+                "usage_notes": gp.get("usage_notes"),
+                "updated_at": ts,
+            }
+            rid = self._find_by(self.points, external_id, title)
+            if rid is not None:
+                self.points[rid].update(values)
+            else:
+                rid = len(self.points) + 1
+                self.points[rid] = dict(values, created_at=ts)
+            point = self.points[rid]
+            point["sections"] = {}
+            point["tags"] = {}
+            point["examples"] = []
+
+            for sec_slug in gp.get("section_slugs") or []:
+                section_id = upserted.get(sec_slug)
+                if not section_id or section_id in point["sections"]:
+                    continue
+                sort_orders = gp.get("section_sort_order")
+                order = sort_orders.get(sec_slug) if isinstance(sort_orders, dict) else None
+                point["sections"][section_id] = order if order is not None else 0
+
+            names = dict.fromkeys(gp.get("tag_names") or [])
+            if level_tag:
+                names[level_tag] = None
+            for name in names:
+                if not name:
+                    continue
+                if name not in tag_ids:
+                    tag_ids[name] = self.grammar_tags.ensure(name, None, ts)
+                point["tags"][tag_ids[name]] = None
+
+            for ex in gp.get("examples") or []:
+                text = (ex.get("example_text") or "").strip()
+                if text:
+                    point["examples"].append((text, ex.get("translation_text"), ex.get("notes")))
+
+    # -- output --
+
+    def write(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        lang = self.language_id
+        counts: Dict[str, int] = {}
+
+        def put(table: str, cols: List[str], rows: List[Tuple]) -> None:
+            quoted = ", ".join(f'"{c}"' for c in cols)
+            marks = ", ".join("?" for _ in cols)
+            conn.executemany(f"INSERT INTO {table} ({quoted}) VALUES ({marks});", rows)
+            counts[table] = counts.get(table, 0) + len(rows)
+
+        item_cols = ["id", "language_id", "external_id", "base_form", "part_of_speech", "frequency_rank",
+                     "frequency_band", "lexeme_features", "usage_notes", "created_at", "updated_at"]
+        put("vocab_items", item_cols, [
+            (it.id, *(it.row[c] for c in item_cols[1:])) for it in self.items
+        ])
+
+        form_rows, media_rows, sense_rows, example_rows, item_tag_rows = [], [], [], [], []
+        form_id = media_id = sense_id = example_id = 0
+        for it in self.items:
+            form_by_surface: Dict[str, int] = {}
+            for fm in it.forms:
+                form_id += 1
+                form_rows.append((form_id, it.id, fm["surface_form"], fm["tense"], fm["mood"], fm["person"],
+                                  fm["number"], fm["gender"], fm["case"], fm["aspect"], fm["degree"],
+                                  fm["morph_features"], fm["is_irregular"], fm["created_at"], fm["updated_at"]))
+                form_by_surface.setdefault(fm["surface_form"], form_id)
+            media_by_uri: Dict[str, int] = {}
+            for m in it.media:
+                media_id += 1
+                media_rows.append((media_id, it.id, m["media_type"], m["uri"], m["description"],
+                                   m["attribution"], m["created_at"], m["updated_at"]))
+                media_by_uri[m["uri"]] = media_id
+            for s in it.senses:
+                sense_id += 1
+                sense_rows.append((sense_id, it.id, s["sense_index"], s["definition"], s["translation"],
+                                   s["usage_notes"], s["grammar_hint"], s["created_at"], s["updated_at"]))
+                for ex in s["examples"]:
+                    example_id += 1
+                    example_rows.append((example_id, sense_id, form_by_surface.get(ex["surface_form"]),
+                                         ex["example_text"], ex["translation_text"],
+                                         media_by_uri.get(ex["media_uri"]), ex["created_at"], ex["updated_at"]))
+            for tid in it.tag_ids:
+                item_tag_rows.append((it.id, tid))
+
+        put("vocab_forms", ["id", "vocab_item_id", "surface_form", "tense", "mood", "person", "number", "gender",
+                            "case", "aspect", "degree", "morph_features", "is_irregular", "created_at", "updated_at"],
+            form_rows)
+        put("vocab_media", ["id", "vocab_item_id", "media_type", "uri", "description", "attribution",
+                            "created_at", "updated_at"], media_rows)
+        put("vocab_senses", ["id", "vocab_item_id", "sense_index", "definition", "translation", "usage_notes",
+                             "grammar_hint", "created_at", "updated_at"], sense_rows)
+        put("vocab_examples", ["id", "vocab_sense_id", "vocab_form_id", "example_text", "translation_text",
+                               "media_id", "created_at", "updated_at"], example_rows)
+        put("vocab_tags", ["id", "name", "description", "created_at"],
+            [(tid, name, desc, created) for name, (tid, desc, created) in self.vocab_tags.rows.items()])
+        put("vocab_item_tags", ["vocab_item_id", "vocab_tag_id"], item_tag_rows)
+
+        put("grammar_sections", ["id", "language_id", "external_id", "title", "description", "parent_id",
+                                 "sort_order", "created_at", "updated_at"],
+            [(rid, lang, s["external_id"], s["title"], s["description"], s["parent_id"], s["sort_order"],
+              s["created_at"], s["updated_at"]) for rid, s in self.sections.items()])
+        put("grammar_tags", ["id", "language_id", "name", "description", "created_at"],
+            [(tid, lang, name, desc, created) for name, (tid, desc, created) in self.grammar_tags.rows.items()])
+        put("grammar_points", ["id", "language_id", "external_id", "title", "summary", "explanation", "usage_notes",
+                               "created_at", "updated_at"],
+            [(rid, lang, p["external_id"], p["title"], p["summary"], p["explanation"], p["usage_notes"],
+              p["created_at"], p["updated_at"]) for rid, p in self.points.items()])
+        put("grammar_point_sections", ["grammar_point_id", "grammar_section_id", "sort_order"],
+            [(rid, sid, order) for rid, p in self.points.items() for sid, order in p["sections"].items()])
+        put("grammar_point_tags", ["grammar_point_id", "grammar_tag_id"],
+            [(rid, tid) for rid, p in self.points.items() for tid in p["tags"]])
+        ex_rows = []
+        for rid, p in self.points.items():
+            for text, tr, notes in p["examples"]:
+                ex_rows.append((rid, text, tr, None, notes, self.ts, self.ts))
+        put("grammar_examples", ["grammar_point_id", "example_text", "translation_text", "media_id", "notes",
+                                 "created_at", "updated_at"], ex_rows)
+        return counts
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compile vocab + grammar packs into a prebuilt SQLite database.")
+    ap.add_argument("--out", "-o", required=True, help="Output .db path")
+    ap.add_argument("--language-code", default="ru")
+    ap.add_argument("--language-name", default="Russian")
+    ap.add_argument("--vocab-index", default="", help="Vocab packs index.ts (default: src/assets/packs/<code>/vocab/index.ts)")
+    ap.add_argument("--grammar-index", default="", help="Grammar packs index.ts (default: src/assets/packs/<code>/grammar/index.ts)")
+    ap.add_argument("--schema", default=str(SCHEMA_TS), help="App schema source (shared/schema.ts)")
+    args = ap.parse_args()
+
+    lang_dir = PACKS_DIR / args.language_code
+    vocab_index = Path(args.vocab_index) if args.vocab_index else lang_dir / "vocab" / "index.ts"
+    grammar_index = Path(args.grammar_index) if args.grammar_index else lang_dir / "grammar" / "index.ts"
+
+    started = time.time()
+    ts = now_iso()
+    db = PackDb(language_id=1, ts=ts)
+    sources: Dict[str, str] = {}
+
+    for kind, index, load in (
+        ("vocab", vocab_index, db.import_vocab_pack),
+        ("grammar", grammar_index, db.import_grammar_pack),
+    ):
+        for ref in load_pack_refs(index):
+            if not ref.path.exists():
+                print(f"[WARN] {kind} pack {ref.name!r} missing: {ref.path}", file=sys.stderr)
+                continue
+            load(ref)
+            sources[ref.name] = file_sha256(ref.path)
+            print(f"[{kind}] {ref.name}: {ref.path.name}")
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+
+    conn = sqlite3.connect(str(tmp))
+    try:
+        conn.execute("PRAGMA journal_mode = OFF;")
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        for stmt in load_schema_statements(Path(args.schema)):
+            conn.execute(stmt)
+        conn.execute("CREATE TABLE pack_meta (key TEXT PRIMARY KEY, value TEXT);")
+
+        with conn:  # one transaction for every row
+            # Section parents can have a higher id than their children after a re-parenting upsert.
+            conn.execute("PRAGMA defer_foreign_keys = ON;")
+            conn.execute(
+                "INSERT INTO languages (id, name, code, created_at, updated_at) VALUES (1, ?, ?, ?, ?);",
+                (args.language_name, args.language_code, ts, ts),
+            )
+            counts = db.write(conn)
+            meta = {
+                "format": str(PACK_DB_FORMAT),
+                "language_code": args.language_code,
+                "built_at": ts,
+                "schema_sha256": file_sha256(Path(args.schema)),
+                "sources": json.dumps(sources, ensure_ascii=False),
+            }
+            conn.executemany("INSERT INTO pack_meta (key, value) VALUES (?, ?);", meta.items())
+
+        violations = conn.execute("PRAGMA foreign_key_check;").fetchall()
+        if violations:
+            raise SystemExit(f"foreign key violations: {violations[:5]}")
+        conn.execute("ANALYZE;")
+        conn.execute("VACUUM;")
+    finally:
+        conn.close()
+    os.replace(tmp, out)
+
+    for table, n in counts.items():
+        print(f"  {table:<24} {n}")
+    print(
+        f"[DONE] {out} ({out.stat().st_size / 1e6:.1f} MB) in {time.time() - started:.2f}s "
+        f"(vocab lines={db.stats['vocab_lines']} skipped={db.stats['vocab_skipped']} merged={db.stats['vocab_updated']})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,16 +2,43 @@
 from __future__ import annotations
 
 import argparse
-import json
+import hashlib
+import os
+import random
 import re
+import time
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fingerprint import strip_stress
+from jsonl_io import JsonlWriter, iter_jsonl_numbered
 
-STRESS_RE = re.compile(r"\u0301")
 LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
 
+# Near-duplicate mode
+TOKEN_RE = re.compile(r"[a-z]+")
+STOPWORDS = {"the", "and", "for", "with", "one", "something", "someone", "etc"}
+REFLEXIVE_RE = re.compile(r"(ся|сь)$")
+MERSENNE_61 = (1 << 61) - 1
+# Wiktionary headings vs pymorphy2/OpenCorpora labels; "" matches anything.
+COARSE_POS = {
+    "proper_noun": "noun",
+    "noun": "noun",
+    "verb": "verb",
+    "infn": "verb",
+    "adjective": "adjective",
+    "adjf": "adjective",
+    "adjs": "adjective",
+    "adverb": "adverb",
+    "advb": "adverb",
+    "pronoun": "pronoun",
+    "npro": "pronoun",
+    "other": "",
+}
+
 
 @dataclass
 class RowRef:
@@ -19,11 +46,6 @@ class RowRef:
     line_no: int
     key: str
     lemma: str
-    row: Dict
-
-
-def strip_stress(text: str) -> str:
-    return STRESS_RE.sub("", text or "")
 
 
 def normalize(text: str) -> str:
@@ -39,27 +61,175 @@ def row_key(row: Dict) -> Tuple[str, str]:
     return lemma, pos
 
 
-def load_jsonl(path: Path) -> List[Dict]:
-    rows: List[Dict] = []
-    with path.open("r", encoding="utf-8") as f:
-        for idx, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError as exc:
-                raise ValueError(f"{path}:{idx}: invalid JSON ({exc})") from exc
-            if not isinstance(row, dict):
-                raise ValueError(f"{path}:{idx}: expected JSON object per line")
-            rows.append(row)
-    return rows
+# ----------------------------
+# Near-duplicate detection (MinHash + LSH)
+# ----------------------------
+
+@lru_cache(maxsize=None)
+def morph_analyzer() -> Optional[Any]:
+    """pymorphy2 analyzer, loaded on first use so plain (non --near) runs don't pay for it."""
+    try:
+        import pymorphy2
+    except Exception:  # pragma: no cover
+        return None
+    return pymorphy2.MorphAnalyzer()
+
+
+@dataclass
+class NearItem:
+    level: str
+    line_no: int
+    lemma: str
+    pos: str
+    translations: List[str]
+
+
+def translations_of(row: Dict) -> List[str]:
+    out: List[str] = []
+    for sense in row.get("senses") or []:
+        if isinstance(sense, dict) and sense.get("translation"):
+            out.append(str(sense["translation"]))
+    source = row.get("source") or {}
+    if isinstance(source, dict) and source.get("seed_translation"):
+        out.append(str(source["seed_translation"]))
+    return out
+
+
+def fold(text: str) -> str:
+    return normalize(text).replace("ё", "е")
+
+
+def morph_key(item: NearItem) -> Tuple[str, str]:
+    """Lemma with stress, ё and reflexive suffix folded (pymorphy2 normal form when available) + coarse POS."""
+    lemma = fold(item.lemma)
+    morph = morph_analyzer()
+    if morph is not None and " " not in lemma:
+        parses = morph.parse(lemma)
+        if parses:
+            lemma = fold(parses[0].normal_form)
+    lemma = REFLEXIVE_RE.sub("", lemma) if len(lemma) > 4 else lemma
+    return lemma, COARSE_POS.get(item.pos, item.pos)
+
+
+def pos_compatible(a: str, b: str) -> bool:
+    return a == b or not a or not b
+
+
+def shingles(item: NearItem, n: int = 3) -> Set[str]:
+    lemma = f"^{fold(item.lemma)}$"
+    out = {"c:" + lemma[i:i + n] for i in range(max(1, len(lemma) - n + 1))}
+    for t in item.translations:
+        for tok in TOKEN_RE.findall(t.lower()):
+            if len(tok) > 2 and tok not in STOPWORDS:
+                out.add("t:" + tok)
+    return out
 
 
-def write_jsonl(path: Path, rows: List[Dict]) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+class MinHasher:
+    def __init__(self, num_perm: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, MERSENNE_61), rng.randrange(0, MERSENNE_61)) for _ in range(num_perm)]
+        self._cache: Dict[str, Tuple[int, ...]] = {}
+
+    def _hashes(self, shingle: str) -> Tuple[int, ...]:
+        # Shingles repeat heavily across entries, so each one is hashed once.
+        hv = self._cache.get(shingle)
+        if hv is None:
+            x = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            hv = tuple((a * x + b) % MERSENNE_61 for a, b in self.params)
+            self._cache[shingle] = hv
+        return hv
+
+    def signature(self, features: Set[str]) -> Tuple[int, ...]:
+        return tuple(map(min, zip(*(self._hashes(f) for f in features))))
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def find_near_duplicates(
+    items: List[NearItem], num_perm: int, bands: int, max_bucket: int = 200
+) -> Tuple[List[List[Tuple[int, float]]], int]:
+    """Returns (clusters of (item index, similarity to the cluster's first item), candidate pair count)."""
+    rows_per_band = num_perm // bands
+    hasher = MinHasher(num_perm)
+    feats = [shingles(it) for it in items]
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for i, f in enumerate(feats):
+        if not f:
+            continue
+        sig = hasher.signature(f)
+        for b in range(bands):
+            buckets[(b, sig[b * rows_per_band:(b + 1) * rows_per_band])].append(i)
+
+    candidates: Set[Tuple[int, int]] = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > max_bucket:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                candidates.add((members[x], members[y]))
+
+    keys: Dict[int, Tuple[str, str]] = {}
+
+    def key_of(i: int) -> Tuple[str, str]:
+        if i not in keys:
+            keys[i] = morph_key(items[i])
+        return keys[i]
+
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidates:
+        (la, pa), (lb, pb) = key_of(i), key_of(j)
+        if la == lb and pos_compatible(pa, pb):
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(items)):
+        groups[find(i)].append(i)
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort()
+        first = members[0]
+        clusters.append([(m, 1.0 if m == first else jaccard(feats[first], feats[m])) for m in members])
+    clusters.sort(key=lambda c: c[0][0])
+    return clusters, len(candidates)
+
+
+def report_near_duplicates(items: List[NearItem], num_perm: int, bands: int, limit: int) -> None:
+    started = time.time()
+    clusters, n_candidates = find_near_duplicates(items, num_perm, bands)
+    print(
+        f"[NEAR] {len(items)} rows, {n_candidates} LSH candidate pairs, {len(clusters)} confirmed clusters "
+        f"in {time.time() - started:.2f}s (num_perm={num_perm}, bands={bands}, pymorphy2={'yes' if morph_analyzer() else 'no'})"
+    )
+    for cluster in clusters[:limit] if limit >= 0 else clusters:
+        print("  cluster:")
+        for i, score in cluster:
+            it = items[i]
+            print(f"    {score:.2f}  {it.level} line {it.line_no}: {it.lemma} ({it.pos or 'unspecified pos'})")
+    if 0 <= limit < len(clusters):
+        print(f"  ... and {len(clusters) - limit} more clusters")
+    print("")
+
+
+def iter_jsonl(path: Path) -> Iterable[Tuple[int, Dict]]:
+    """Yields (line_no, row) one line at a time."""
+    for idx, row in iter_jsonl_numbered(path):
+        if not isinstance(row, dict):
+            raise ValueError(f"{path}:{idx}: expected JSON object per line")
+        yield idx, row
 
 
 def level_path(vocab_dir: Path, level: str) -> Path:
@@ -72,6 +242,104 @@ def removed_path(vocab_dir: Path, override: str | None) -> Path:
     return vocab_dir / "dedupe_removed.jsonl"
 
 
+def index_path(vocab_dir: Path, override: str | None) -> Path:
+    if override:
+        return Path(override)
+    return vocab_dir / "dedupe_index.tsv"
+
+
+# ----------------------------
+# First-seen key index
+# ----------------------------
+
+def key_digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+
+class KeyIndex:
+    """First-seen level per key, held as 8-byte digests only; persisted as `<hex digest>\t<level>` lines."""
+
+    def __init__(self) -> None:
+        self.first_seen: Dict[bytes, str] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "KeyIndex":
+        idx = cls()
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                digest, _, level = line.rstrip("\n").partition("\t")
+                if digest and level:
+                    idx.first_seen[bytes.fromhex(digest)] = level
+        return idx
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for digest, level in self.first_seen.items():
+                f.write(f"{digest.hex()}\t{level}\n")
+        os.replace(tmp, path)
+
+
+@dataclass
+class LevelResult:
+    before: int = 0
+    after: int = 0
+    samples: List[Tuple[RowRef, str]] = field(default_factory=list)  # (removed row, first-seen level), capped at --show-samples
+    relevelled: int = 0  # incremental: keys this level now owns that a later level had first
+
+
+def dedupe_level(
+    level: str,
+    path: Path,
+    index: KeyIndex,
+    kept_out,
+    removed_out,
+    show_samples: int,
+    near_items: Optional[List[NearItem]],
+) -> LevelResult:
+    """Streams one level file; kept rows go to kept_out, removed rows to removed_out (either may be None)."""
+    res = LevelResult()
+    order = {lvl: i for i, lvl in enumerate(LEVELS)}
+    this_run: Set[bytes] = set()
+
+    for idx, row in iter_jsonl(path):
+        res.before += 1
+        lemma, pos = row_key(row)
+        keep = True
+        if lemma:
+            key = f"{lemma}::{pos}"
+            digest = key_digest(key)
+            first = index.first_seen.get(digest)
+            if digest in this_run or (first is not None and order.get(first, -1) < order[level]):
+                keep = False
+                first_level = first  # == level for a repeat within this file
+                if len(res.samples) < show_samples:
+                    res.samples.append((RowRef(level=level, line_no=idx, key=key, lemma=lemma), first_level or "?"))
+                if removed_out is not None:
+                    record = {
+                        "level": level,
+                        "line_no": idx,
+                        "key": key,
+                        "lemma": lemma,
+                        "first_seen_level": first_level,
+                        "row": row,
+                    }
+                    removed_out.write(record)
+            else:
+                if first is not None and first != level:
+                    res.relevelled += 1
+                index.first_seen[digest] = level
+                this_run.add(digest)
+        if keep:
+            # Malformed rows (no lemma) are kept untouched so no data is silently dropped.
+            res.after += 1
+            if kept_out is not None:
+                kept_out.write(row)
+            if near_items is not None and lemma:
+                near_items.append(NearItem(level, idx, lemma, pos, translations_of(row)))
+    return res
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Deduplicate vocab across CEFR levels, keeping the first (lowest-level) occurrence."
@@ -100,92 +368,133 @@ def main() -> int:
             "(default: <vocab-dir>/dedupe_removed.jsonl)."
         ),
     )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="First-seen key index, saved on --apply (default: <vocab-dir>/dedupe_index.tsv).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Load the saved key index and dedupe only --levels against it, without reading the other "
+            "level files. Removed rows are appended to --removed-out."
+        ),
+    )
+    parser.add_argument(
+        "--levels",
+        nargs="+",
+        choices=LEVELS,
+        default=None,
+        help="Levels to process (default: all; with --incremental this is required).",
+    )
+    parser.add_argument(
+        "--near",
+        action="store_true",
+        help=(
+            "Also report near-duplicates among the kept rows (stress/ё/POS-label/reflexive variants), "
+            "blocked with MinHash/LSH and confirmed by a morphology-normalized key. Report only."
+        ),
+    )
+    parser.add_argument("--num-perm", type=int, default=64, help="MinHash permutations for --near (default: 64).")
+    parser.add_argument("--bands", type=int, default=32, help="LSH bands for --near; must divide --num-perm (default: 32).")
     args = parser.parse_args()
+    if args.near and args.num_perm % args.bands:
+        parser.error("--bands must divide --num-perm")
+    if args.incremental and not args.levels:
+        parser.error("--incremental needs --levels (the new or changed levels)")
 
     vocab_dir = Path(args.vocab_dir)
     if not vocab_dir.exists():
         raise SystemExit(f"Directory not found: {vocab_dir}")
 
-    loaded: Dict[str, List[Dict]] = {}
-    for level in LEVELS:
+    levels = [lvl for lvl in LEVELS if lvl in (args.levels or LEVELS)]
+    for level in levels:
         path = level_path(vocab_dir, level)
         if not path.exists():
             raise SystemExit(f"Missing level file: {path}")
-        loaded[level] = load_jsonl(path)
-
-    seen: Set[str] = set()
-    first_seen_level: Dict[str, str] = {}
-    kept: Dict[str, List[Dict]] = {}
-    removed: Dict[str, List[RowRef]] = defaultdict(list)
-
-    for level in LEVELS:
-        kept[level] = []
-        for idx, row in enumerate(loaded[level], start=1):
-            lemma, pos = row_key(row)
-            if not lemma:
-                # Keep malformed rows untouched so no data is silently dropped.
-                kept[level].append(row)
-                continue
-            key = f"{lemma}::{pos}"
-            if key in seen:
-                removed[level].append(
-                    RowRef(
-                        level=level,
-                        line_no=idx,
-                        key=key,
-                        lemma=lemma,
-                        row=row,
-                    )
+
+    idx_path = index_path(vocab_dir, args.index)
+    if args.incremental:
+        if not idx_path.exists():
+            raise SystemExit(f"No key index at {idx_path}; run a full dedupe with --apply first")
+        index = KeyIndex.load(idx_path)
+    else:
+        index = KeyIndex()
+
+    removed_out = removed_path(vocab_dir, args.removed_out)
+    near_items: Optional[List[NearItem]] = [] if args.near else None
+    results: Dict[str, LevelResult] = {}
+    tmp_files: List[Tuple[Path, Path]] = []  # (tmp, final), replaced only once every level succeeded
+    removed_f = None
+    try:
+        if args.apply:
+            removed_tmp = removed_out.with_suffix(removed_out.suffix + ".tmp")
+            if args.incremental and removed_out.exists():
+                removed_tmp.write_bytes(removed_out.read_bytes())
+            removed_f = JsonlWriter(removed_tmp, "a" if args.incremental else "w")
+            tmp_files.append((removed_tmp, removed_out))
+        for level in levels:
+            path = level_path(vocab_dir, level)
+            kept_f = None
+            if args.apply:
+                kept_tmp = path.with_suffix(".jsonl.tmp")
+                kept_f = JsonlWriter(kept_tmp)
+                tmp_files.append((kept_tmp, path))
+            try:
+                results[level] = dedupe_level(
+                    level, path, index, kept_f, removed_f, max(0, args.show_samples), near_items
                 )
-                continue
-            seen.add(key)
-            first_seen_level[key] = level
-            kept[level].append(row)
+            finally:
+                if kept_f is not None:
+                    kept_f.close()
+    except BaseException:
+        if removed_f is not None:
+            removed_f.close()
+        for tmp, _ in tmp_files:
+            tmp.unlink(missing_ok=True)
+        raise
+    if removed_f is not None:
+        removed_f.close()
 
-    total_before = sum(len(loaded[level]) for level in LEVELS)
-    total_after = sum(len(kept[level]) for level in LEVELS)
+    total_before = sum(r.before for r in results.values())
+    total_after = sum(r.after for r in results.values())
     total_removed = total_before - total_after
 
     mode = "APPLY" if args.apply else "DRY-RUN"
-    print(f"[{mode}] dedupe by key = normalized(lookup_form|base_form) + part_of_speech")
+    scope = f" (incremental: {', '.join(levels)} against {idx_path})" if args.incremental else ""
+    print(f"[{mode}] dedupe by key = normalized(lookup_form|base_form) + part_of_speech{scope}")
     print(f"Total: {total_before} -> {total_after} (removed {total_removed})")
     print("")
 
-    for level in LEVELS:
-        before = len(loaded[level])
-        after = len(kept[level])
-        removed_count = before - after
-        print(f"{level}: {before} -> {after} (removed {removed_count})")
+    for level in levels:
+        res = results[level]
+        removed_count = res.before - res.after
+        print(f"{level}: {res.before} -> {res.after} (removed {removed_count})")
         if removed_count and args.show_samples > 0:
-            for ref in removed[level][: args.show_samples]:
-                first_level = first_seen_level.get(ref.key, "?")
+            for ref, first_level in res.samples:
                 print(
                     f"  - line {ref.line_no}: {ref.lemma} ({ref.key.split('::', 1)[1] or 'unspecified pos'}) "
                     f"already introduced in {first_level}"
                 )
             if removed_count > args.show_samples:
                 print(f"  ... and {removed_count - args.show_samples} more")
+        if res.relevelled:
+            print(
+                f"  [WARN] {res.relevelled} key(s) were first seen in a later level; "
+                "that level still has them until it is deduped again"
+            )
         print("")
 
+    if near_items is not None:
+        report_near_duplicates(near_items, args.num_perm, args.bands, args.show_samples)
+
     if args.apply:
-        removed_out = removed_path(vocab_dir, args.removed_out)
-        removed_rows: List[Dict] = []
-        for level in LEVELS:
-            for ref in removed[level]:
-                removed_rows.append(
-                    {
-                        "level": ref.level,
-                        "line_no": ref.line_no,
-                        "key": ref.key,
-                        "lemma": ref.lemma,
-                        "first_seen_level": first_seen_level.get(ref.key),
-                        "row": ref.row,
-                    }
-                )
-        write_jsonl(removed_out, removed_rows)
-        for level in LEVELS:
-            write_jsonl(level_path(vocab_dir, level), kept[level])
+        for tmp, final in tmp_files:
+            os.replace(tmp, final)
+        index.save(idx_path)
         print(f"Removed rows written to: {removed_out}")
+        print(f"Key index written to: {idx_path} ({len(index.first_seen)} keys)")
         print("Files updated in place.")
     else:
         print("Dry run only. Re-run with --apply to write changes.")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Checks that Russian example sentences actually use their entry's word.
+
+Surface forms (base_form plus every `forms[].surface_form`, normalized the
+same way as form_index: strip_stress, ё -> е, casefold) go into one
+Aho-Corasick automaton, so each example is checked in a single pass over
+its text regardless of how many forms the paradigm has. A hit only counts
+at word boundaries and for the example's own entry.
+
+Entries whose `forms` hold nothing beyond the base form (no pymorphy2 when
+they were built) can't be told apart from an inflected use, so their
+examples are reported as unchecked rather than flagged, except for
+parts of speech that don't inflect.
+
+llmenrich.py and the transform use lemma_checker() on fresh LLM output (and
+llmenrich.py also on reused and --incremental carried-over examples). The
+CLI scans finished JSONL:
+
+  example_check.py out/A1enriched.jsonl out/A2enriched.jsonl --flagged out/flagged.jsonl
+  example_check.py out/A1enriched.jsonl --strip out/A1enriched.stripped.jsonl
+
+--strip drops flagged examples, so a following llmenrich.py run (which only
+fills empty fields) regenerates just those senses.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from form_index import normalize
+from jsonl_io import JsonlWriter, iter_jsonl
+
+# These don't inflect, so the base form alone is a complete paradigm.
+INVARIABLE_POS = {"adverb", "preposition", "conjunction", "particle", "interjection"}
+
+# Seed headwords like "зонт; зо́нтик" or "из, изо" list alternatives (and their
+# generated forms inherit the prefix), so each part counts on its own.
+ALTERNATIVES_RE = re.compile(r"[;,/]")
+
+
+class FormMatcher:
+    """Aho-Corasick automaton: normalized surface form -> the entry ids that have it."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (pattern length, entry ids) for every pattern ending there, incl. via fail links.
+        self._out: List[List[Tuple[int, Set[int]]]] = [[]]
+        self._ids: Dict[int, Set[int]] = {}
+        self._built = False
+
+    def add(self, surface: str, entry_id: int) -> None:
+        if self._built:
+            raise RuntimeError("FormMatcher.add() after build()")
+        state = 0
+        for ch in surface:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        if state not in self._ids:
+            self._ids[state] = set()
+            self._out[state].append((len(surface), self._ids[state]))
+        self._ids[state].add(entry_id)
+
+    def build(self) -> "FormMatcher":
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def entries_in(self, text: str) -> Set[int]:
+        """Entry ids with a surface form in `text` (already normalized) at word boundaries."""
+        found: Set[int] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, ids in out[state]:
+                start = i - length + 1
+                if (start == 0 or not text[start - 1].isalpha()) and (i + 1 == n or not text[i + 1].isalpha()):
+                    found |= ids
+        return found
+
+
+def entry_surfaces(entry: Dict[str, Any]) -> Set[str]:
+    vocab_item = entry.get("vocab_item") if isinstance(entry.get("vocab_item"), dict) else {}
+    raw = [vocab_item.get("base_form") or vocab_item.get("lookup_form") or ""]
+    raw += [f.get("surface_form") or "" for f in entry.get("forms") or [] if isinstance(f, dict)]
+    out = set()
+    for surface in raw:
+        for part in ALTERNATIVES_RE.split(normalize(surface)):
+            part = part.strip()
+            if part:
+                out.add(part)
+    return out
+
+
+def checkable(entry: Dict[str, Any], surfaces: Optional[Set[str]] = None) -> bool:
+    surfaces = entry_surfaces(entry) if surfaces is None else surfaces
+    if not surfaces:
+        return False
+    pos = ((entry.get("vocab_item") or {}).get("part_of_speech") or "").lower()
+    return len(surfaces) > 1 or pos in INVARIABLE_POS
+
+
+def example_text(ex: Any) -> str:
+    """Russian side of an example: transform writes example_text, llmenrich ru."""
+    if not isinstance(ex, dict):
+        return ""
+    return (ex.get("example_text") or ex.get("ru") or "").strip()
+
+
+def all_use_lemma(texts: Iterable[str], uses_lemma: Optional[Callable[[str], bool]]) -> bool:
+    """
+    The gate both LLM scripts hold a --small-model answer to: every example
+    uses the word. Examples that still miss it on the last tier are dropped.
+    """
+    return uses_lemma is None or all(uses_lemma(t) for t in texts)
+
+
+def lemma_checker(entry: Dict[str, Any]) -> Optional[Callable[[str], bool]]:
+    """uses_lemma(russian_text) for one entry, or None when its forms are too sparse to judge."""
+    surfaces = entry_surfaces(entry)
+    if not checkable(entry, surfaces):
+        return None
+    matcher = FormMatcher()
+    for s in surfaces:
+        matcher.add(s, 0)
+    matcher.build()
+    return lambda text: bool(matcher.entries_in(normalize(text)))
+
+
+# ----------------------------
+# CLI: scan finished JSONL
+# ----------------------------
+
+def _entries(paths: Iterable[str]) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    for path in paths:
+        for entry in iter_jsonl(path, skip_invalid=True):
+            if isinstance(entry, dict):
+                yield path, entry
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Flag Russian examples that don't use their entry's word.")
+    ap.add_argument("inputs", nargs="+", help="Hermes vocab JSONL files")
+    ap.add_argument("--flagged", default="", help="Write one JSONL record per flagged example")
+    ap.add_argument("--strip", default="", help="Single input only: write it here without the flagged examples")
+    args = ap.parse_args()
+
+    if args.strip and len(args.inputs) != 1:
+        ap.error("--strip takes a single input")
+
+    # Pass 1: one automaton over every entry's forms.
+    t0 = time.perf_counter()
+    matcher = FormMatcher()
+    checkable_ids: Set[int] = set()
+    for entry_id, (_, entry) in enumerate(_entries(args.inputs)):
+        surfaces = entry_surfaces(entry)
+        for s in surfaces:
+            matcher.add(s, entry_id)
+        if checkable(entry, surfaces):
+            checkable_ids.add(entry_id)
+    matcher.build()
+    build_s = time.perf_counter() - t0
+
+    # Pass 2: one scan per example.
+    t1 = time.perf_counter()
+    scanned = flagged = unchecked = chars = 0
+    flagged_out = JsonlWriter(args.flagged) if args.flagged else None
+    strip_out = JsonlWriter(args.strip) if args.strip else None
+    try:
+        for entry_id, (path, entry) in enumerate(_entries(args.inputs)):
+            base_form = (entry.get("vocab_item") or {}).get("base_form")
+            for sense in entry.get("senses") or []:
+                if not isinstance(sense, dict) or not isinstance(sense.get("examples"), list):
+                    continue
+                kept = []
+                for ex_idx, ex in enumerate(sense["examples"]):
+                    text = example_text(ex)
+                    if not text:
+                        kept.append(ex)
+                        continue
+                    scanned += 1
+                    chars += len(text)
+                    if entry_id not in checkable_ids:
+                        unchecked += 1
+                        kept.append(ex)
+                    elif entry_id in matcher.entries_in(normalize(text)):
+                        kept.append(ex)
+                    else:
+                        flagged += 1
+                        if flagged_out is not None:
+                            flagged_out.write({
+                                "input": path,
+                                "base_form": base_form,
+                                "sense_index": sense.get("sense_index"),
+                                "example_index": ex_idx,
+                                "example": text,
+                            })
+                sense["examples"] = kept
+            if strip_out is not None:
+                strip_out.write(entry)
+    finally:
+        for w in (flagged_out, strip_out):
+            if w is not None:
+                w.close()
+    scan_s = time.perf_counter() - t1
+
+    print(f"[DONE] automaton built in {build_s:.2f}s; scanned {scanned} examples in {scan_s:.2f}s "
+          f"({chars / max(scan_s, 1e-9) / 1e6:.1f}M chars/s)")
+    print(f"[DONE] flagged {flagged} examples missing their word, {unchecked} unchecked (forms too sparse)")
+    if args.flagged:
+        print(f"[DONE] flagged examples -> {args.flagged}")
+    if args.strip:
+        print(f"[DONE] stripped copy -> {args.strip} (rerun llmenrich.py on it to regenerate those senses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-entry content fingerprints stored in each Hermes entry's `source.fingerprint`.
+
+Every pipeline stage records the inputs it consumed for an entry:
+
+  seed              hash of the scraped seed row            (transform)
+  wiki_revid        Wiktionary revision the senses came from (transform)
+  forms             forms-generator version                  (transform, backfill)
+  transform_model   LLM used by the transform, or "none"     (transform)
+  transform_prompt  transform prompt version                 (transform)
+  details           hash of the OpenRussian details record   (transform --details)
+  enrich_input      hash of the entry as llmenrich received it
+  enrich_model      LLM used by llmenrich
+  enrich_prompt     llmenrich prompt version
+
+A stage compares the current values with the recorded ones and only
+recomputes entries where something changed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict
+
+# Bump when generate_forms() output changes (transform + backfill share it).
+FORMS_GENERATOR_VERSION = "1"
+
+STRESS_RE = re.compile(r"\u0301")  # combining acute accent
+
+
+def strip_stress(text: str) -> str:
+    """base_form -> lookup_form. Every stage strips stress through this one helper."""
+    return STRESS_RE.sub("", text or "")
+
+
+def content_hash(obj: Any) -> str:
+    raw = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def entry_key(entry: Dict[str, Any]) -> str:
+    """Same identity as transform_vocab_to_hermes.stable_key()."""
+    vocab_item = entry.get("vocab_item") if isinstance(entry.get("vocab_item"), dict) else {}
+    language_id = vocab_item.get("language_id") or 1
+    base_form = (vocab_item.get("base_form") or "").strip()
+    raw = f"{language_id}::{base_form}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:24]
+
+
+def _package_version(name: str) -> str:
+    try:
+        from importlib.metadata import version
+
+        return version(name)
+    except Exception:
+        return "none"
+
+
+@lru_cache(maxsize=None)
+def forms_fingerprint() -> str:
+    return (
+        f"v{FORMS_GENERATOR_VERSION}"
+        f"/pymorphy2-{_package_version('pymorphy2')}"
+        f"/dicts-{_package_version('pymorphy2-dicts-ru')}"
+    )
+
+
+def get_fingerprint(entry: Dict[str, Any]) -> Dict[str, Any]:
+    source = entry.get("source") if isinstance(entry.get("source"), dict) else {}
+    fp = source.get("fingerprint")
+    return fp if isinstance(fp, dict) else {}
+
+
+def set_fingerprint(entry: Dict[str, Any], **fields: Any) -> None:
+    source = entry.get("source")
+    if not isinstance(source, dict):
+        source = {}
+        entry["source"] = source
+    fp = source.get("fingerprint")
+    if not isinstance(fp, dict):
+        fp = {}
+        source["fingerprint"] = fp
+    fp.update(fields)
+
+
+def matches(entry: Dict[str, Any], **expected: Any) -> bool:
+    fp = get_fingerprint(entry)
+    return all(fp.get(k) == v for k, v in expected.items())
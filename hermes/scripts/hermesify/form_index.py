@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Inflected-surface-form lookup index: "книгу" -> книга, forms rows with that surface.
+
+Keys are normalized surface forms (strip_stress, ё -> е, casefold), taken
+from every entry's `forms` plus its base_form. Each key points at postings
+(entry id, forms row index); entry ids resolve to (source pack, byte offset
+of the JSONL line, entry key, base form, part of speech), so a hit can be
+expanded to the full entry with one seek.
+
+File layout (little endian, memory-mapped by FormIndex):
+  header        HEADER struct
+  key offsets   u32 * (keys + 1)      into the key blob
+  post offsets  u32 * (keys + 1)      into the postings array
+  postings      (u32 entry id, u16 form row) per posting; row 0xFFFF = base_form
+  key blob      sorted UTF-8 keys, concatenated
+  meta          JSON: sources, entries
+
+Usage:
+  form_index.py build --out out/forms.idx
+  form_index.py lookup книгу шёл --rows
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fingerprint import strip_stress
+from jsonl_io import loads
+
+HERMES_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_VOCAB_DIR = HERMES_DIR / "src" / "assets" / "packs" / "ru" / "vocab"
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+MAGIC = b"HFX\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHIIQQQQQQ")
+OFFSET = struct.Struct("<I")
+POSTING = struct.Struct("<IH")
+BASE_FORM_ROW = 0xFFFF
+
+def normalize(text: str) -> str:
+    return strip_stress(text).replace("ё", "е").replace("Ё", "Е").strip().casefold()
+
+
+@dataclass(frozen=True)
+class EntryRef:
+    source: str
+    offset: int
+    key: str
+    base_form: str
+    pos: str
+
+
+@dataclass(frozen=True)
+class Hit:
+    entry: EntryRef
+    row: Optional[int]  # index into entry["forms"]; None when the match is the base_form
+
+
+# ----------------------------
+# Build
+# ----------------------------
+
+def iter_entries(path: Path):
+    """Yields (byte offset, entry) per JSONL line."""
+    with path.open("rb") as f:
+        offset = 0
+        for raw in f:
+            if raw.strip():
+                yield offset, loads(raw)
+            offset += len(raw)
+
+
+def build_index(paths: List[Path], out: Path, root: Path) -> Dict[str, int]:
+    from fingerprint import entry_key
+
+    sources: List[str] = []
+    entries: List[List[Any]] = []
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+    for path in paths:
+        try:
+            source = str(path.resolve().relative_to(root))
+        except ValueError:
+            source = str(path.resolve())
+        sources.append(source)
+        src_id = len(sources) - 1
+        for offset, e in iter_entries(path):
+            vi = e.get("vocab_item") or {}
+            eid = len(entries)
+            entries.append([src_id, offset, entry_key(e), vi.get("base_form") or "", vi.get("part_of_speech") or ""])
+            seen = set()
+            for row, f in enumerate(e.get("forms") or []):
+                k = normalize(f.get("surface_form") or "")
+                if k:
+                    seen.add(k)
+                    postings[k].append((eid, row))
+            base = normalize(vi.get("base_form") or "")
+            if base and base not in seen:
+                postings[base].append((eid, BASE_FORM_ROW))
+
+    # UTF-8 byte order equals code point order, so lookups can compare raw bytes.
+    keys = sorted(k.encode("utf-8") for k in postings)
+    key_offsets = bytearray()
+    post_offsets = bytearray()
+    post_blob = bytearray()
+    key_blob = bytearray()
+    n_posts = 0
+    for kb in keys:
+        key_offsets += OFFSET.pack(len(key_blob))
+        post_offsets += OFFSET.pack(n_posts)
+        key_blob += kb
+        for eid, row in postings[kb.decode("utf-8")]:
+            post_blob += POSTING.pack(eid, row)
+            n_posts += 1
+    key_offsets += OFFSET.pack(len(key_blob))
+    post_offsets += OFFSET.pack(n_posts)
+
+    meta = json.dumps({"sources": sources, "entries": entries}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    key_off_at = HEADER.size
+    post_off_at = key_off_at + len(key_offsets)
+    postings_at = post_off_at + len(post_offsets)
+    key_blob_at = postings_at + len(post_blob)
+    meta_at = key_blob_at + len(key_blob)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(keys), len(entries),
+                            post_off_at, postings_at, key_blob_at, len(key_blob), meta_at, len(meta)))
+        f.write(key_offsets)
+        f.write(post_offsets)
+        f.write(post_blob)
+        f.write(key_blob)
+        f.write(meta)
+    tmp.replace(out)
+    return {"keys": len(keys), "entries": len(entries), "postings": n_posts, "bytes": out.stat().st_size}
+
+
+# ----------------------------
+# Query
+# ----------------------------
+
+class FormIndex:
+    def __init__(self, path: Path, root: Path = HERMES_DIR):
+        self.path = Path(path)
+        self.root = root
+        self._f = self.path.open("rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.key_count, self.entry_count, self._post_off_at, self._postings_at,
+         self._key_blob_at, _key_blob_len, meta_at, meta_len) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a form index (or unsupported version)")
+        meta = json.loads(self._mm[meta_at:meta_at + meta_len])
+        self.sources: List[str] = meta["sources"]
+        self.entries = [EntryRef(self.sources[s], off, key, base, pos) for s, off, key, base, pos in meta["entries"]]
+
+    def close(self) -> None:
+        self._mm.close()
+        self._f.close()
+
+    def __enter__(self) -> "FormIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _key(self, i: int) -> bytes:
+        start, end = struct.unpack_from("<II", self._mm, HEADER.size + i * OFFSET.size)
+        return self._mm[self._key_blob_at + start:self._key_blob_at + end]
+
+    def _find(self, kb: bytes) -> int:
+        lo, hi = 0, self.key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < kb:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.key_count and self._key(lo) == kb else -1
+
+    def lookup(self, word: str) -> List[Hit]:
+        i = self._find(normalize(word).encode("utf-8"))
+        if i < 0:
+            return []
+        start, end = struct.unpack_from("<II", self._mm, self._post_off_at + i * OFFSET.size)
+        hits = []
+        for p in range(start, end):
+            eid, row = POSTING.unpack_from(self._mm, self._postings_at + p * POSTING.size)
+            hits.append(Hit(self.entries[eid], None if row == BASE_FORM_ROW else row))
+        return hits
+
+    def load_entry(self, ref: EntryRef) -> Dict[str, Any]:
+        with (self.root / ref.source).open("rb") as f:
+            f.seek(ref.offset)
+            return loads(f.readline())
+
+    def form_row(self, hit: Hit) -> Optional[Dict[str, Any]]:
+        if hit.row is None:
+            return None
+        return self.load_entry(hit.entry)["forms"][hit.row]
+
+
+def default_inputs(vocab_dir: Path) -> List[Path]:
+    return [vocab_dir / f"{lvl}.jsonl" for lvl in LEVELS if (vocab_dir / f"{lvl}.jsonl").exists()]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Build/query the normalized surface-form -> vocab entry index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Index every forms row of the vocab packs")
+    b.add_argument("inputs", nargs="*", help="Vocab JSONL files (default: <vocab-dir>/<LEVEL>.jsonl)")
+    b.add_argument("--vocab-dir", default=str(DEFAULT_VOCAB_DIR))
+    b.add_argument("--out", default=str(Path(__file__).resolve().parent / "out" / "forms.idx"))
+
+    q = sub.add_parser("lookup", help="Look up surface forms")
+    q.add_argument("words", nargs="+")
+    q.add_argument("--index", default=str(Path(__file__).resolve().parent / "out" / "forms.idx"))
+    q.add_argument("--rows", action="store_true", help="Also print the matching forms rows")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        inputs = [Path(p) for p in args.inputs] or default_inputs(Path(args.vocab_dir))
+        t0 = time.perf_counter()
+        stats = build_index(inputs, Path(args.out), HERMES_DIR)
+        print(f"[DONE] Wrote {args.out}: {stats} in {time.perf_counter() - t0:.2f}s")
+        return 0
+
+    with FormIndex(Path(args.index)) as idx:
+        for word in args.words:
+            t0 = time.perf_counter()
+            hits = idx.lookup(word)
+            us = (time.perf_counter() - t0) * 1e6
+            print(f"{word}: {len(hits)} hit(s) in {us:.0f}us")
+            for h in hits:
+                where = "base_form" if h.row is None else f"forms[{h.row}]"
+                print(f"  {h.entry.base_form} ({h.entry.pos}) {h.entry.source} {where}")
+                if args.rows and h.row is not None:
+                    print(f"    {json.dumps(idx.form_row(h), ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
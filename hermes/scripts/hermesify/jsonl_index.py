@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Offset-index sidecars for pipeline JSONL files.
+
+For `B2.enriched.jsonl` the sidecar `B2.enriched.jsonl.idx` maps each row's
+stable key (same as transform's stable_key / fingerprint.entry_key; seed rows
+use their `word`/`russian`) and normalized lemma to the byte offset and length
+of its line, so one entry can be read with a single seek.
+
+Sidecar format (TSV):
+  #jsonl-index <TAB> 1 <TAB> <source size> <TAB> <source mtime_ns>
+  <key> <TAB> <lemma> <TAB> <offset> <TAB> <length>
+The header pins the source file's size and mtime; a mismatch means the index
+is stale and open_index() rebuilds it (in memory; the read-only `get` and
+`diff` commands only write the sidecar with --save).
+
+Writers produce sidecars with JsonlWriter(..., index=True) (see jsonl_io.py).
+Patching goes through append_rows() (new lines at the end, index extended)
+and patch_rows() (untouched byte ranges copied into a temp file, swapped in
+atomically, offsets shifted rather than re-parsed).
+
+Usage:
+  jsonl_index.py build out/B2.enriched.jsonl
+  jsonl_index.py get out/B2.enriched.jsonl --lemma книга
+  jsonl_index.py diff out/B2.jsonl out/B2.enriched.jsonl --changed
+  jsonl_index.py patch out/B2.enriched.jsonl fixes.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mmap
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from form_index import normalize
+from jsonl_io import dumps_bytes, loads
+
+PathLike = Union[str, Path]
+
+HEADER_TAG = "#jsonl-index"
+FORMAT_VERSION = "1"
+
+
+def sidecar_path(path: PathLike) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".idx")
+
+
+def row_key(row: Any, language_id: int = 1) -> str:
+    """Stable key for Hermes entries (vocab_item.base_form) and seed rows (word / russian)."""
+    if not isinstance(row, dict):
+        return ""
+    vi = row.get("vocab_item")
+    if isinstance(vi, dict):
+        language_id = vi.get("language_id") or language_id
+        base = (vi.get("base_form") or "").strip()
+    else:
+        base = (row.get("word") or row.get("russian") or "").strip()
+    if not base:
+        return ""
+    return hashlib.sha256(f"{language_id}::{base}".encode("utf-8")).hexdigest()[:24]
+
+
+def row_lemma(row: Any) -> str:
+    if not isinstance(row, dict):
+        return ""
+    vi = row.get("vocab_item") if isinstance(row.get("vocab_item"), dict) else {}
+    lemma = vi.get("lookup_form") or vi.get("base_form") or row.get("word") or row.get("russian") or ""
+    return normalize_lemma(str(lemma))
+
+
+def normalize_lemma(text: str) -> str:
+    # Same folding as the surface-form index (stress marks, ё, case).
+    return normalize(text).replace("\t", " ").replace("\n", " ")
+
+
+@dataclass
+class Span:
+    key: str
+    lemma: str
+    offset: int
+    length: int
+
+
+class JsonlIndex:
+    def __init__(self, path: PathLike, spans: Optional[List[Span]] = None):
+        self.path = Path(path)
+        self.spans: List[Span] = []
+        self.by_key: Dict[str, Span] = {}
+        self.by_lemma: Dict[str, List[str]] = {}
+        for s in spans or []:
+            self.add(s)
+
+    def add(self, span: Span) -> None:
+        self.spans.append(span)
+        if span.key:
+            self.by_key[span.key] = span  # a later line with the same key wins
+        if span.lemma:
+            keys = self.by_lemma.setdefault(span.lemma, [])
+            if span.key not in keys:
+                keys.append(span.key)
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.by_key
+
+    def keys(self) -> Iterable[str]:
+        return self.by_key.keys()
+
+    def read_raw(self, key: str) -> Optional[bytes]:
+        span = self.by_key.get(key)
+        if span is None:
+            return None
+        with self.path.open("rb") as f:
+            f.seek(span.offset)
+            return f.read(span.length)
+
+    def read(self, key: str) -> Optional[Any]:
+        raw = self.read_raw(key)
+        return None if raw is None else loads(raw)
+
+    def lookup_lemma(self, lemma: str) -> List[Any]:
+        return [self.read(k) for k in self.by_lemma.get(normalize_lemma(lemma), [])]
+
+    def save(self) -> Path:
+        st = self.path.stat()
+        out = sidecar_path(self.path)
+        tmp = out.with_name(out.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(f"{HEADER_TAG}\t{FORMAT_VERSION}\t{st.st_size}\t{st.st_mtime_ns}\n")
+            for s in self.spans:
+                f.write(f"{s.key}\t{s.lemma}\t{s.offset}\t{s.length}\n")
+        os.replace(tmp, out)
+        return out
+
+
+# ----------------------------
+# Build / load
+# ----------------------------
+
+def scan(path: PathLike, start: int = 0) -> List[Span]:
+    """Parses lines from byte `start` on; lines that don't parse are indexed with an empty key."""
+    spans = []
+    with Path(path).open("rb") as f:
+        f.seek(start)
+        offset = start
+        for raw in f:
+            body = raw.rstrip(b"\r\n")
+            if body.strip():
+                try:
+                    row = loads(body)
+                except ValueError:
+                    row = None
+                spans.append(Span(row_key(row), row_lemma(row), offset, len(body)))
+            offset += len(raw)
+    return spans
+
+
+def build_index(path: PathLike, save: bool = True) -> JsonlIndex:
+    idx = JsonlIndex(path, scan(path))
+    if save:
+        idx.save()
+    return idx
+
+
+def load_sidecar(path: PathLike) -> Optional[JsonlIndex]:
+    """The saved index if it still matches the source file, else None."""
+    path = Path(path)
+    side = sidecar_path(path)
+    if not side.exists() or not path.exists():
+        return None
+    st = path.stat()
+    with side.open("r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\n").split("\t")
+        if header != [HEADER_TAG, FORMAT_VERSION, str(st.st_size), str(st.st_mtime_ns)]:
+            return None
+        spans = []
+        for line in f:
+            key, lemma, offset, length = line.rstrip("\n").split("\t")
+            spans.append(Span(key, lemma, int(offset), int(length)))
+    return JsonlIndex(path, spans)
+
+
+def open_index(path: PathLike, rebuild: bool = True, save: bool = False) -> JsonlIndex:
+    """The current sidecar, else a fresh scan (written to <file>.idx only with save=True)."""
+    idx = load_sidecar(path)
+    if idx is None:
+        if not rebuild:
+            raise FileNotFoundError(f"no current index for {path}")
+        idx = build_index(path, save=save)
+    return idx
+
+
+# ----------------------------
+# Patching
+# ----------------------------
+
+def append_rows(path: PathLike, rows: Iterable[Any]) -> JsonlIndex:
+    """Appends rows and extends the index (a later line with the same key wins lookups)."""
+    path = Path(path)
+    idx = open_index(path) if path.exists() else JsonlIndex(path)
+    size = path.stat().st_size if path.exists() else 0
+    with path.open("ab") as f:
+        if size:
+            # Don't glue onto a final line that lacks its newline.
+            with path.open("rb") as r:
+                r.seek(size - 1)
+                if r.read(1) != b"\n":
+                    f.write(b"\n")
+                    size += 1
+        for row in rows:
+            body = dumps_bytes(row)
+            f.write(body + b"\n")
+            idx.add(Span(row_key(row), row_lemma(row), size, len(body)))
+            size += len(body) + 1
+    idx.save()
+    return idx
+
+
+def patch_rows(path: PathLike, updates: Dict[str, Optional[Any]]) -> Tuple[JsonlIndex, int, int]:
+    """
+    Replaces (or, for None, deletes) the lines of the given keys; keys not in the
+    file are appended. Untouched lines are copied as raw bytes into <path>.tmp,
+    which then replaces the file, so readers never see a half-written file.
+    Returns (new index, replaced/deleted count, appended count).
+    """
+    path = Path(path)
+    idx = open_index(path)
+    pending = dict(updates)
+    tmp = path.with_name(path.name + ".tmp")
+    spans: List[Span] = []
+    changed = 0
+    out_pos = 0
+    with path.open("rb") as f, tmp.open("wb") as dst:
+        size = path.stat().st_size
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            pos = 0
+            for span in sorted(idx.spans, key=lambda s: s.offset):
+                gap = mm[pos:span.offset]
+                dst.write(gap)
+                out_pos += len(gap)
+                pos = span.offset + span.length
+                if span.key not in pending or idx.by_key.get(span.key) is not span:
+                    dst.write(mm[span.offset:pos])
+                    spans.append(Span(span.key, span.lemma, out_pos, span.length))
+                    out_pos += span.length
+                    continue
+                row = pending.pop(span.key)
+                changed += 1
+                if row is None:
+                    if mm[pos:pos + 1] == b"\n":
+                        pos += 1  # drop the line together with its newline
+                    continue
+                body = dumps_bytes(row)
+                dst.write(body)
+                spans.append(Span(row_key(row), row_lemma(row), out_pos, len(body)))
+                out_pos += len(body)
+            rest = mm[pos:size]
+        finally:
+            if size:
+                mm.close()
+        dst.write(rest)
+        out_pos += len(rest)
+        if out_pos:
+            dst.flush()
+            with tmp.open("rb") as check:
+                check.seek(out_pos - 1)
+                if check.read(1) != b"\n":
+                    dst.write(b"\n")
+                    out_pos += 1
+        appended = 0
+        for row in pending.values():
+            if row is None:
+                continue
+            body = dumps_bytes(row)
+            dst.write(body + b"\n")
+            spans.append(Span(row_key(row), row_lemma(row), out_pos, len(body)))
+            out_pos += len(body) + 1
+            appended += 1
+    os.replace(tmp, path)
+    new_idx = JsonlIndex(path, spans)
+    new_idx.save()
+    return new_idx, changed, appended
+
+
+# ----------------------------
+# Diffs
+# ----------------------------
+
+def diff_keys(a: PathLike, b: PathLike, changed: bool = False, save: bool = False) -> Dict[str, List[str]]:
+    """Keys only in a, only in b, and (with changed=True) in both but with different line bytes."""
+    ia, ib = open_index(a, save=save), open_index(b, save=save)
+    ka, kb = set(ia.keys()), set(ib.keys())
+    out = {"removed": sorted(ka - kb), "added": sorted(kb - ka)}
+    if changed:
+        out["changed"] = sorted(k for k in ka & kb if ia.read_raw(k) != ib.read_raw(k))
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Build and use byte-offset sidecar indexes for JSONL files.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="(Re)build <file>.idx")
+    b.add_argument("files", nargs="+")
+    g = sub.add_parser("get", help="Print entries by key or lemma")
+    g.add_argument("file")
+    g.add_argument("keys", nargs="*")
+    g.add_argument("--lemma", action="append", default=[])
+    g.add_argument("--save", action="store_true", help="Write <file>.idx if it had to be rebuilt")
+    d = sub.add_parser("diff", help="Key-set diff between two files")
+    d.add_argument("a")
+    d.add_argument("b")
+    d.add_argument("--changed", action="store_true", help="Also list keys whose line differs")
+    d.add_argument("--list", action="store_true", help="Print the keys, not just counts")
+    d.add_argument("--save", action="store_true", help="Write <file>.idx for inputs that had to be rebuilt")
+    p = sub.add_parser("patch", help="Replace/append entries from a JSONL of new rows (matched by key)")
+    p.add_argument("file")
+    p.add_argument("rows")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        for f in args.files:
+            idx = build_index(f)
+            print(f"[DONE] {sidecar_path(f)}: {len(idx)} keys, {len(idx.by_lemma)} lemmas")
+    elif args.cmd == "get":
+        idx = open_index(args.file, save=args.save)
+        raws = [idx.read_raw(k) for k in args.keys]
+        for lemma in args.lemma:
+            raws.extend(idx.read_raw(k) for k in idx.by_lemma.get(normalize_lemma(lemma), []))
+        missing = sum(1 for r in raws if r is None)
+        for r in raws:
+            if r is not None:
+                sys.stdout.write(r.decode("utf-8") + "\n")
+        if not raws:
+            print("[WARN] no matches", file=sys.stderr)
+            return 1
+        if missing:
+            print(f"[WARN] {missing} key(s) not found", file=sys.stderr)
+            return 1
+    elif args.cmd == "diff":
+        result = diff_keys(args.a, args.b, args.changed, args.save)
+        for name, keys in result.items():
+            print(f"{name}: {len(keys)}")
+            if args.list:
+                for k in keys:
+                    print(f"  {k}")
+    elif args.cmd == "patch":
+        from jsonl_io import iter_jsonl
+
+        updates = {}
+        for row in iter_jsonl(args.rows):
+            k = row_key(row)
+            if not k:
+                raise SystemExit(f"{args.rows}: row without a key: {str(row)[:80]}")
+            updates[k] = row
+        idx, replaced, appended = patch_rows(args.file, updates)
+        print(f"[DONE] {args.file}: replaced {replaced}, appended {appended}; index has {len(idx)} keys")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Shared JSONL reading/writing for the pipeline scripts.
+
+- loads() uses orjson when it is installed and the standard library
+  otherwise. dumps() always uses json.dumps(obj, ensure_ascii=False), the
+  format every pack and pipeline output was written in (", " / ": "
+  separators), so rewriting an unchanged row gives the same bytes and
+  per-entry deltas and fingerprints stay small. orjson can only write the
+  compact form, so it isn't used for writing.
+- JsonlWriter buffers encoded lines and writes them in large chunks; call
+  flush() where a script needs rows on disk before continuing (resume files).
+  With index=True it also writes the <path>.idx offset sidecar on close
+  (see jsonl_index.py).
+- read_jsonl() memory-maps the file, splits it at newline boundaries and, for
+  large files, parses the chunks in worker processes.
+- iter_jsonl() streams objects for scripts that process one row at a time.
+
+Usage (throughput benchmark):
+  jsonl_io.py bench out/*.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+PathLike = Union[str, Path]
+
+WRITE_BUFFER_BYTES = 1 << 20
+# Below this size, spawning workers costs more than parsing in-process.
+PARALLEL_MIN_BYTES = 8 << 20
+CHUNK_BYTES = 4 << 20
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    return dumps_bytes(obj).decode("utf-8")
+
+
+# ----------------------------
+# Writing
+# ----------------------------
+
+class JsonlWriter:
+    """Buffered JSONL writer. Use as a context manager, or call close()."""
+
+    def __init__(self, path: PathLike, mode: str = "w", buffer_bytes: int = WRITE_BUFFER_BYTES, index: bool = False):
+        if mode not in ("w", "a"):
+            raise ValueError(f"mode must be 'w' or 'a', got {mode!r}")
+        self.path = Path(path)
+        self._index = None
+        self._offset = 0
+        if index:
+            import jsonl_index
+
+            # Appending extends a current sidecar; otherwise the file is rescanned on close.
+            existing = jsonl_index.load_sidecar(self.path) if mode == "a" else None
+            if mode == "a" and existing is None and self.path.exists() and self.path.stat().st_size:
+                existing = jsonl_index.build_index(self.path)
+            self._index = existing or jsonl_index.JsonlIndex(self.path)
+            self._offset = self.path.stat().st_size if mode == "a" and self.path.exists() else 0
+        self._f = self.path.open(mode + "b")
+        self._buf: List[bytes] = []
+        self._size = 0
+        self._limit = buffer_bytes
+        self.rows = 0
+
+    def _track(self, obj: Any, length: int) -> None:
+        if self._index is not None:
+            import jsonl_index
+
+            self._index.add(jsonl_index.Span(jsonl_index.row_key(obj), jsonl_index.row_lemma(obj), self._offset, length))
+            self._offset += length + 1
+
+    def write(self, obj: Any) -> None:
+        body = dumps_bytes(obj)
+        self._track(obj, len(body))
+        line = body + b"\n"
+        self._buf.append(line)
+        self._size += len(line)
+        self.rows += 1
+        if self._size >= self._limit:
+            self._drain()
+
+    def write_many(self, objs: Iterable[Any]) -> None:
+        for obj in objs:
+            self.write(obj)
+
+    def write_line(self, line: Union[str, bytes]) -> None:
+        """Writes an already-encoded line as-is (e.g. passing through a line that didn't parse)."""
+        data = line.encode("utf-8") if isinstance(line, str) else line
+        data = data.rstrip(b"\n")
+        if self._index is not None:
+            try:
+                obj = loads(data)
+            except ValueError:
+                obj = None
+            self._track(obj, len(data))
+        self._buf.append(data + b"\n")
+        self._size += len(data) + 1
+        self.rows += 1
+        if self._size >= self._limit:
+            self._drain()
+
+    def _drain(self) -> None:
+        if self._buf:
+            self._f.write(b"".join(self._buf))
+            self._buf.clear()
+            self._size = 0
+
+    def flush(self, fsync: bool = False) -> None:
+        self._drain()
+        self._f.flush()
+        if fsync:
+            try:
+                os.fsync(self._f.fileno())
+            except OSError:
+                pass  # not supported everywhere; the flush still helps
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._drain()
+            self._f.close()
+            if self._index is not None:
+                self._index.save()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def write_jsonl(path: PathLike, rows: Iterable[Any], atomic: bool = True, index: bool = False) -> int:
+    """Writes rows (to <path>.tmp then renames when atomic). Returns the row count."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    target = path.with_name(path.name + ".tmp") if atomic else path
+    with JsonlWriter(target) as w:
+        w.write_many(rows)
+        n = w.rows
+    if atomic:
+        os.replace(target, path)
+    if index:
+        import jsonl_index
+
+        jsonl_index.build_index(path)
+    return n
+
+
+# ----------------------------
+# Reading
+# ----------------------------
+
+def iter_jsonl(path: PathLike, skip_invalid: bool = False) -> Iterator[Any]:
+    """Streams one object per non-blank line."""
+    for _, obj in iter_jsonl_numbered(path, skip_invalid):
+        yield obj
+
+
+def iter_jsonl_numbered(path: PathLike, skip_invalid: bool = False) -> Iterator[Tuple[int, Any]]:
+    """Streams (1-based line number, object); blank lines are skipped but still counted."""
+    with Path(path).open("rb", buffering=WRITE_BUFFER_BYTES) as f:
+        for line_no, raw in enumerate(f, start=1):
+            if not raw.strip():
+                continue
+            try:
+                yield line_no, loads(raw)
+            except ValueError as exc:
+                if skip_invalid:
+                    continue
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({exc})") from exc
+
+
+def _chunk_bounds(mm: mmap.mmap, size: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    bounds = []
+    start = 0
+    while start < size:
+        end = min(size, start + chunk_bytes)
+        if end < size:
+            nl = mm.find(b"\n", end)
+            end = size if nl < 0 else nl + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _parse_span(path: str, start: int, end: int, skip_invalid: bool) -> List[Any]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _parse_bytes(mm[start:end], skip_invalid, path)
+
+
+def _parse_bytes(data: bytes, skip_invalid: bool, path: str = "") -> List[Any]:
+    out = []
+    for raw in data.split(b"\n"):
+        if not raw.strip():
+            continue
+        try:
+            out.append(loads(raw))
+        except ValueError as exc:
+            if not skip_invalid:
+                raise ValueError(f"{path}: invalid JSON line ({exc}): {raw[:80]!r}") from exc
+    return out
+
+
+def read_jsonl(
+    path: PathLike,
+    workers: Optional[int] = None,
+    skip_invalid: bool = False,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> List[Any]:
+    """Loads a whole JSONL file. workers=None picks automatically; 0 or 1 parses in-process."""
+    path = Path(path)
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    if workers is None:
+        workers = min(os.cpu_count() or 1, 8) if size >= PARALLEL_MIN_BYTES else 1
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if workers <= 1:
+            return _parse_bytes(mm[:], skip_invalid, str(path))
+        bounds = _chunk_bounds(mm, size, min(chunk_bytes, max(1 << 16, size // workers)))
+    rows: List[Any] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_parse_span, str(path), s, e, skip_invalid) for s, e in bounds]
+        for fut in futures:
+            rows.extend(fut.result())
+    return rows
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+
+def _stdlib_baseline(path: Path) -> Tuple[List[Any], float]:
+    t0 = time.perf_counter()
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows, time.perf_counter() - t0
+
+
+def bench(paths: List[Path], workers: Optional[int], tmp_dir: Path) -> None:
+    print(f"backend={BACKEND} cpus={os.cpu_count()}")
+    print(f"{'file':<28} {'MB':>6} {'rows':>7} {'stdlib rd':>10} {'read':>8} {'stdlib wr':>10} {'write':>8}  (MB/s)")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    for p in paths:
+        mb = p.stat().st_size / 1e6
+        base_rows, base_read = _stdlib_baseline(p)
+
+        t0 = time.perf_counter()
+        rows = read_jsonl(p, workers=workers)
+        read_s = time.perf_counter() - t0
+        if rows != base_rows:
+            print(f"[WARN] {p}: parsed rows differ from stdlib json", file=sys.stderr)
+
+        t0 = time.perf_counter()
+        with (tmp_dir / "stdlib.jsonl").open("w", encoding="utf-8") as f:
+            for r in base_rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        base_write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        write_jsonl(tmp_dir / "fast.jsonl", rows)
+        write_s = time.perf_counter() - t0
+        if (tmp_dir / "fast.jsonl").read_bytes() != (tmp_dir / "stdlib.jsonl").read_bytes():
+            print(f"[WARN] {p}: written bytes differ from stdlib json", file=sys.stderr)
+
+        def rate(sec: float) -> str:
+            return f"{mb / sec:.0f}" if sec > 0 else "-"
+
+        print(f"{p.name:<28} {mb:>6.1f} {len(rows):>7} {rate(base_read):>10} {rate(read_s):>8} "
+              f"{rate(base_write):>10} {rate(write_s):>8}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="JSONL I/O throughput benchmark.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("bench", help="Compare read/write throughput against line-by-line stdlib json")
+    b.add_argument("inputs", nargs="+")
+    b.add_argument("--workers", type=int, default=None, help="Parser processes (default: auto by file size)")
+    b.add_argument("--tmp-dir", default=str(Path(__file__).resolve().parent / "out" / ".bench"))
+    args = ap.parse_args()
+    bench([Path(p) for p in args.inputs], args.workers, Path(args.tmp_dir))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
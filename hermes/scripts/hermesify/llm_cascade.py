@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Small-model-first cascade for the LLM enrichment scripts.
+
+  cascade = ModelCascade(["qwen2.5:1.5b-instruct", "qwen2.5:7b-instruct"])
+  result, model = cascade.run(attempt, check)
+
+attempt(model) calls the LLM (including any JSON repair round-trips) and
+returns the parsed result, raising when it can't. check(result) returns None
+when the result is good enough, or a short reason ("no_examples", ...). Tiers
+run in order and the first accepted result wins; the last tier is only held
+to attempt() succeeding, i.e. the same bar as running it alone.
+
+summary() reports per-tier acceptance, the escalation rate, real elapsed time
+and model-seconds (per-item call time summed; with concurrent workers this
+exceeds elapsed time). The saving estimate prices every item at the last
+tier's average, which is only measured on escalated (harder) items, so treat
+it as rough.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CYRILLIC_RE = re.compile(r"[\u0400-\u04FF]")
+
+
+def has_cyrillic(text: str) -> bool:
+    return bool(CYRILLIC_RE.search(text or ""))
+
+
+@dataclass
+class TierStats:
+    model: str
+    calls: int = 0          # items that reached this tier
+    accepted: int = 0
+    seconds: float = 0.0    # model-seconds: summed per-item time, not elapsed
+    rejected: Counter = field(default_factory=Counter)  # reason -> count
+
+
+class ModelCascade:
+    """Thread-safe; the transform calls it from several workers."""
+
+    def __init__(self, models: List[str], verbose: bool = True):
+        if not models:
+            raise ValueError("ModelCascade needs at least one model")
+        self.models = list(models)
+        self.verbose = verbose
+        self.tiers = [TierStats(m) for m in self.models]
+        self._lock = threading.Lock()
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+
+    @classmethod
+    def from_args(cls, model: str, small_model: str = "", verbose: bool = True) -> "ModelCascade":
+        return cls([small_model, model] if small_model and small_model != model else [model], verbose=verbose)
+
+    @property
+    def label(self) -> str:
+        """Stable name for fingerprints: the models in order, e.g. "small>large"."""
+        return ">".join(self.models)
+
+    def run(self, attempt: Callable[[str], T], check: Callable[[T], Optional[str]]) -> Tuple[T, str]:
+        last = len(self.models) - 1
+        with self._lock:
+            if self._first_start is None:
+                self._first_start = time.perf_counter()
+        for i, model in enumerate(self.models):
+            t0 = time.perf_counter()
+            try:
+                result = attempt(model)
+                reason = None if i == last else check(result)
+            except Exception as e:
+                if i == last:
+                    self._record(i, time.perf_counter() - t0, "error")
+                    raise
+                result, reason = None, "parse" if isinstance(e, ValueError) else "error"
+            self._record(i, time.perf_counter() - t0, reason)
+            if reason is None:
+                return result, model
+            if self.verbose:
+                print(f"   ↑ {model} rejected ({reason}); escalating to {self.models[i + 1]}")
+        raise AssertionError("unreachable")
+
+    def _record(self, tier: int, seconds: float, reason: Optional[str]) -> None:
+        with self._lock:
+            self._last_end = time.perf_counter()
+            t = self.tiers[tier]
+            t.calls += 1
+            t.seconds += seconds
+            if reason is None:
+                t.accepted += 1
+            else:
+                t.rejected[reason] += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            items = self.tiers[0].calls
+            escalated = items - self.tiers[0].accepted
+            top = self.tiers[-1]
+            # Per-item cost of the last tier, as measured on what reached it (escalated items only).
+            top_avg = top.seconds / top.calls if top.calls else None
+            spent = sum(t.seconds for t in self.tiers)
+            saved = items * top_avg - spent if top_avg is not None else None
+            elapsed = self._last_end - self._first_start if self._first_start is not None and self._last_end else 0.0
+            return {
+                "models": self.models,
+                "items": items,
+                "escalated": escalated,
+                "escalation_rate": escalated / items if items else 0.0,
+                "tiers": [
+                    {"model": t.model, "calls": t.calls, "accepted": t.accepted,
+                     "seconds": round(t.seconds, 1), "rejected": dict(t.rejected)}
+                    for t in self.tiers
+                ],
+                "elapsed_seconds": round(elapsed, 1),
+                "model_seconds": round(spent, 1),
+                "saved_model_seconds": round(saved, 1) if saved is not None else None,
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        if len(self.models) == 1 or not s["items"]:
+            return (f"[CASCADE] single model {self.models[-1]}: {s['items']} items, "
+                    f"{s['elapsed_seconds']}s elapsed, {s['model_seconds']} model-s")
+        lines = [f"[CASCADE] {s['items']} items, escalation rate {s['escalation_rate']:.0%} ({s['escalated']})"]
+        for t in s["tiers"]:
+            reasons = " ".join(f"{k}={v}" for k, v in sorted(t["rejected"].items()))
+            lines.append(f"[CASCADE]   {t['model']}: {t['accepted']}/{t['calls']} accepted, {t['seconds']} model-s"
+                         + (f" (rejected: {reasons})" if reasons else ""))
+        lines.append(f"[CASCADE]   {s['elapsed_seconds']}s elapsed, {s['model_seconds']} model-s "
+                     "(summed per-item time; exceeds elapsed with concurrent workers)")
+        if s["saved_model_seconds"] is None:
+            lines.append(f"[CASCADE]   nothing reached {self.models[-1]}, so no saving estimate")
+        else:
+            lines.append(f"[CASCADE]   rough saving vs {self.models[-1]} only: {s['saved_model_seconds']} model-s "
+                         f"({self.models[-1]} timed on escalated items only)")
+        return "\n".join(lines)
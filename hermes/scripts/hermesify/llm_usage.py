@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Token and timing accounting for Ollama calls.
+
+Ollama reports what each call cost: prompt_eval_count / eval_count (prompt
+and output tokens), prompt_eval_duration / eval_duration / load_duration
+(nanoseconds). The three LLM scripts record them per call:
+
+  usage = UsageLog("llmenrich", args.usage_log)
+  usage.record(model, "usage_notes+examples", stats, wall_s)
+  ...
+  usage.close()
+  print(usage.summary())
+
+HTTP responses (/api/chat) carry the counters as JSON, see api_stats();
+`ollama run --verbose` prints them to stderr, see parse_verbose_stats().
+
+With a log path every call is appended as one JSONL record, so logs from
+several runs and scripts can be compared afterwards:
+
+  llm_usage.py out/usage/*.jsonl
+
+The report breaks calls down by script, model and the fields requested,
+with tokens/sec for prompt processing and generation and the share of time
+spent loading, reading the prompt and generating.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from jsonl_io import JsonlWriter, iter_jsonl
+
+STAT_KEYS = (
+    "prompt_eval_count",
+    "eval_count",
+    "prompt_eval_duration",
+    "eval_duration",
+    "load_duration",
+    "total_duration",
+)
+
+# `ollama run --verbose` labels -> API field names.
+VERBOSE_LABELS = {
+    "total duration": "total_duration",
+    "load duration": "load_duration",
+    "prompt eval count": "prompt_eval_count",
+    "prompt eval duration": "prompt_eval_duration",
+    "eval count": "eval_count",
+    "eval duration": "eval_duration",
+}
+VERBOSE_LINE_RE = re.compile(r"^\s*(total duration|load duration|prompt eval count|prompt eval duration|eval count|eval duration):\s*(.+?)\s*$", re.M)
+COUNT_RE = re.compile(r"(\d+)")
+# Go time.Duration strings: "1m2.5s", "146.2ms", "512µs", "80ns".
+DURATION_PART_RE = re.compile(r"([\d.]+)(ns|us|µs|μs|ms|s|m|h)")
+DURATION_NS = {"ns": 1, "us": 1_000, "µs": 1_000, "μs": 1_000, "ms": 1_000_000, "s": 1_000_000_000,
+               "m": 60_000_000_000, "h": 3_600_000_000_000}
+
+
+def parse_go_duration(text: str) -> Optional[int]:
+    parts = DURATION_PART_RE.findall(text or "")
+    if not parts:
+        return None
+    return int(sum(float(num) * DURATION_NS[unit] for num, unit in parts))
+
+
+def parse_verbose_stats(stderr: str) -> Dict[str, int]:
+    """Counters from `ollama run --verbose` stderr; missing ones are left out."""
+    out: Dict[str, int] = {}
+    for label, value in VERBOSE_LINE_RE.findall(stderr or ""):
+        key = VERBOSE_LABELS[label]
+        if key.endswith("_count"):
+            m = COUNT_RE.search(value)
+            parsed = int(m.group(1)) if m else None
+        else:
+            parsed = parse_go_duration(value)
+        if parsed is not None:
+            out[key] = parsed
+    return out
+
+
+def api_stats(data: Any) -> Dict[str, int]:
+    """Counters from an Ollama /api/chat or /api/generate response body."""
+    if not isinstance(data, dict):
+        return {}
+    return {k: int(data[k]) for k in STAT_KEYS if isinstance(data.get(k), (int, float))}
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    failed: int = 0
+    no_stats: int = 0       # calls Ollama reported nothing for (errors, old CLI)
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    prompt_ns: int = 0
+    eval_ns: int = 0
+    load_ns: int = 0
+    wall_s: float = 0.0
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        self.calls += 1
+        self.failed += 0 if rec.get("ok", True) else 1
+        self.wall_s += float(rec.get("wall_s") or 0.0)
+        if not any(k in rec for k in STAT_KEYS):
+            self.no_stats += 1
+            return
+        self.prompt_tokens += int(rec.get("prompt_eval_count") or 0)
+        self.output_tokens += int(rec.get("eval_count") or 0)
+        self.prompt_ns += int(rec.get("prompt_eval_duration") or 0)
+        self.eval_ns += int(rec.get("eval_duration") or 0)
+        self.load_ns += int(rec.get("load_duration") or 0)
+
+    def line(self) -> str:
+        measured = max(self.calls - self.no_stats, 1)
+        prompt_s, eval_s, load_s = self.prompt_ns / 1e9, self.eval_ns / 1e9, self.load_ns / 1e9
+        busy = prompt_s + eval_s + load_s
+        parts = [
+            f"{self.calls} calls" + (f" ({self.failed} failed)" if self.failed else ""),
+            f"prompt {self.prompt_tokens} tok (avg {self.prompt_tokens / measured:.0f}, {_rate(self.prompt_tokens, prompt_s)})",
+            f"output {self.output_tokens} tok (avg {self.output_tokens / measured:.0f}, {_rate(self.output_tokens, eval_s)})",
+        ]
+        if busy > 0:
+            parts.append(f"time load/prompt/gen {load_s / busy:.0%}/{prompt_s / busy:.0%}/{eval_s / busy:.0%}")
+        parts.append(f"wall {self.wall_s:.1f}s")
+        if self.no_stats:
+            parts.append(f"{self.no_stats} without stats")
+        return ", ".join(parts)
+
+
+def _rate(tokens: int, seconds: float) -> str:
+    return f"{tokens / seconds:.1f} tok/s" if seconds > 0 else "- tok/s"
+
+
+def aggregate(records: Iterable[Dict[str, Any]]) -> "OrderedDict[Tuple[str, str, str], UsageTotals]":
+    """(script, model, field) -> totals, in first-seen order."""
+    totals: "OrderedDict[Tuple[str, str, str], UsageTotals]" = OrderedDict()
+    for rec in records:
+        key = (rec.get("script") or "?", rec.get("model") or "?", rec.get("field") or "?")
+        totals.setdefault(key, UsageTotals()).add(rec)
+    return totals
+
+
+def format_report(totals: "OrderedDict[Tuple[str, str, str], UsageTotals]") -> str:
+    if not totals:
+        return "[USAGE] no LLM calls"
+    lines = []
+    scripts: "OrderedDict[str, List[Tuple[str, str, UsageTotals]]]" = OrderedDict()
+    for (script, model, field), t in totals.items():
+        scripts.setdefault(script, []).append((model, field, t))
+    for script, rows in scripts.items():
+        overall = UsageTotals()
+        for _, _, t in rows:
+            for name in overall.__dataclass_fields__:
+                setattr(overall, name, getattr(overall, name) + getattr(t, name))
+        lines.append(f"[USAGE] {script}: {overall.line()}")
+        for model, field, t in sorted(rows, key=lambda r: (r[0], r[1])):
+            lines.append(f"[USAGE]   {model} {field}: {t.line()}")
+    return "\n".join(lines)
+
+
+class UsageLog:
+    """Per-call records for one script run. Thread-safe; the transform calls it from several workers."""
+
+    def __init__(self, script: str, path: str = ""):
+        self.script = script
+        self.path = path
+        self.totals: "OrderedDict[Tuple[str, str, str], UsageTotals]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._out = JsonlWriter(path, "a") if path else None
+
+    def record(
+        self,
+        model: str,
+        field: str,
+        stats: Dict[str, int],
+        wall_s: float,
+        kind: str = "request",
+        ok: bool = True,
+    ) -> None:
+        """kind separates first requests from JSON repairs and other follow-ups."""
+        rec: Dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "script": self.script,
+            "model": model,
+            "field": field or "-",
+            "kind": kind,
+            "ok": ok,
+            "wall_s": round(wall_s, 3),
+        }
+        rec.update(stats)
+        with self._lock:
+            self.totals.setdefault((self.script, model, rec["field"]), UsageTotals()).add(rec)
+            if self._out is not None:
+                self._out.write(rec)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._out is not None:
+                self._out.close()
+                self._out = None
+
+    def summary(self) -> str:
+        with self._lock:
+            return format_report(self.totals)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Summarize --usage-log files from the LLM scripts.")
+    ap.add_argument("logs", nargs="+", help="Usage JSONL logs (transform, llmenrich, grammar)")
+    args = ap.parse_args()
+
+    records = (r for path in args.logs for r in iter_jsonl(path, skip_invalid=True) if isinstance(r, dict))
+    print(format_report(aggregate(records)))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,14 @@ import os
 import subprocess
 import sys
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from example_check import all_use_lemma, example_text, lemma_checker
+from fingerprint import content_hash, entry_key, matches, set_fingerprint
+from form_index import normalize
+from jsonl_io import JsonlWriter, iter_jsonl, loads
+from llm_cascade import ModelCascade, has_cyrillic
+from llm_usage import UsageLog, parse_verbose_stats
 
 DEFAULT_MODEL = "qwen2.5:7b-instruct"
 OLLAMA_TIMEOUT_SEC = 180
@@ -18,8 +25,14 @@ MAX_SENSES_PER_ENTRY = 50  # safety cap
 
 RETRY_JSON_REPAIRS = 2
 
+# --small-model: longer notes than this send the sense on to --model.
+MAX_NOTE_CHARS = 400
+
 FLUSH_EVERY = 25  # flush output every N written entries
 
+# Bump when build_prompt()/repair_prompt() or the merge rules change.
+ENRICH_PROMPT_VERSION = "1"
+
 
 def is_empty_text(v: Any) -> bool:
     return v is None or (isinstance(v, str) and v.strip() == "")
@@ -39,14 +52,22 @@ def safe_get_str(d: Dict[str, Any], key: str) -> str:
     return v.strip() if isinstance(v, str) else ""
 
 
-def call_ollama_json(model: str, prompt: str, timeout_sec: int = OLLAMA_TIMEOUT_SEC) -> str:
+def call_ollama_json(
+    model: str,
+    prompt: str,
+    timeout_sec: int = OLLAMA_TIMEOUT_SEC,
+    usage: Optional[UsageLog] = None,
+    field: str = "",
+    kind: str = "request",
+) -> str:
     """
-    Calls `ollama run <model>` piping the prompt to stdin.
-    Returns raw stdout.
+    Calls `ollama run --verbose <model>` piping the prompt to stdin.
+    Returns raw stdout; the token/timing stats --verbose prints to stderr go to `usage`.
     """
+    t0 = time.perf_counter()
     try:
         p = subprocess.run(
-            ["ollama", "run", model],
+            ["ollama", "run", "--verbose", model],
             input=prompt.encode("utf-8"),
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -55,10 +76,14 @@ def call_ollama_json(model: str, prompt: str, timeout_sec: int = OLLAMA_TIMEOUT_
     except FileNotFoundError:
         raise RuntimeError("Could not find 'ollama' on PATH. Install Ollama or adjust invocation.")
     except subprocess.TimeoutExpired:
+        if usage is not None:
+            usage.record(model, field, {}, time.perf_counter() - t0, kind, ok=False)
         raise RuntimeError(f"Ollama timed out after {timeout_sec}s (model={model}).")
 
     out = p.stdout.decode("utf-8", errors="replace").strip()
     err = p.stderr.decode("utf-8", errors="replace").strip()
+    if usage is not None:
+        usage.record(model, field, parse_verbose_stats(err), time.perf_counter() - t0, kind, ok=p.returncode == 0)
 
     if p.returncode != 0:
         raise RuntimeError(f"Ollama failed (code={p.returncode}): {err or out}")
@@ -66,7 +91,18 @@ def call_ollama_json(model: str, prompt: str, timeout_sec: int = OLLAMA_TIMEOUT_
     return out
 
 
-def build_prompt(entry: Dict[str, Any], sense: Dict[str, Any]) -> str:
+def missing_fields(sense: Dict[str, Any]) -> List[str]:
+    want_fields = []
+    if is_empty_text(sense.get("usage_notes")):
+        want_fields.append("usage_notes")
+    if is_empty_text(sense.get("grammar_hint")):
+        want_fields.append("grammar_hint")
+    if is_empty_examples(sense.get("examples")):
+        want_fields.append("examples")
+    return want_fields
+
+
+def build_prompt(entry: Dict[str, Any], sense: Dict[str, Any], require_word: bool = False) -> str:
     vocab_item = entry.get("vocab_item") if isinstance(entry.get("vocab_item"), dict) else {}
     source = entry.get("source") if isinstance(entry.get("source"), dict) else {}
 
@@ -82,19 +118,13 @@ def build_prompt(entry: Dict[str, Any], sense: Dict[str, Any]) -> str:
     seed_translation = safe_get_str(source, "seed_translation")
 
     # We only request the things that are missing
-    wants_usage = is_empty_text(sense.get("usage_notes"))
-    wants_grammar = is_empty_text(sense.get("grammar_hint"))
-    wants_examples = is_empty_examples(sense.get("examples"))
-
-    want_fields = []
-    if wants_usage:
-        want_fields.append("usage_notes")
-    if wants_grammar:
-        want_fields.append("grammar_hint")
-    if wants_examples:
-        want_fields.append("examples")
-
+    want_fields = missing_fields(sense)
     want_fields_str = ", ".join(want_fields) if want_fields else "(none)"
+    # Only on the retry after every example missed the word, so first prompts stay as they were.
+    word_rule = (
+        f'\n- Every "ru" example MUST contain the word {base_form or lookup_form} itself (any inflected form).'
+        if require_word else ""
+    )
 
     return f"""
 You are enriching a Russian language-learning dataset entry.
@@ -119,7 +149,7 @@ Output rules:
 - "grammar_hint": 1–2 short sentences in English about usage/grammar (or null).
 - "examples": list of up to {MAX_EXAMPLES_REQUEST} items, each item is:
   {{ "ru": "...", "en": "..." }}
-  Use natural everyday Russian; translations should be fluent English.
+  Use natural everyday Russian; translations should be fluent English.{word_rule}
 - Do not invent bizarre facts; keep it general and safe.
 
 Now return the JSON object.
@@ -187,6 +217,54 @@ def validate_fragment(obj: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]
     )
 
 
+def check_fragment(
+    sense: Dict[str, Any],
+    obj: Dict[str, Any],
+    uses_lemma: Optional[Callable[[str], bool]] = None,
+) -> Optional[str]:
+    """
+    Cheap quality gate for a --small-model fragment: None when it fills what
+    the sense is missing, else the reason to escalate to --model.
+    """
+    usage, grammar, examples = validate_fragment(obj)
+    if is_empty_examples(sense.get("examples")):
+        if not examples:
+            return "no_examples"
+        if any(not has_cyrillic(ex["ru"]) or has_cyrillic(ex["en"]) for ex in examples):
+            return "example_language"
+        if len({ex["ru"] for ex in examples}) < len(examples):
+            return "duplicate_examples"
+        if not all_use_lemma((ex["ru"] for ex in examples), uses_lemma):
+            return "example_missing_lemma"
+    if is_empty_text(sense.get("usage_notes")) and usage is None:
+        return "no_usage_notes"
+    if any(v and len(v) > MAX_NOTE_CHARS for v in (usage, grammar)):
+        return "note_too_long"
+    return None
+
+
+def filter_lemma_examples(
+    examples: List[Dict[str, str]],
+    uses_lemma: Optional[Callable[[str], bool]],
+) -> Tuple[List[Dict[str, str]], int]:
+    """Drop examples that never use the entry's word; returns (kept, dropped)."""
+    if uses_lemma is None:
+        return examples, 0
+    kept = [ex for ex in examples if not example_text(ex) or uses_lemma(example_text(ex))]
+    return kept, len(examples) - len(kept)
+
+
+def strip_lemma_misses(entry: Dict[str, Any]) -> int:
+    """Filter every sense's examples in place (for carried-over output); returns how many went."""
+    uses_lemma = lemma_checker(entry)
+    dropped = 0
+    for sense in entry.get("senses") or []:
+        if isinstance(sense, dict) and isinstance(sense.get("examples"), list):
+            sense["examples"], n = filter_lemma_examples(sense["examples"], uses_lemma)
+            dropped += n
+    return dropped
+
+
 def needs_enrichment(sense: Dict[str, Any]) -> bool:
     return (
         is_empty_text(sense.get("usage_notes"))
@@ -234,6 +312,112 @@ Bad output:
 """.strip()
 
 
+class ReuseIndex:
+    """
+    --reuse-index: enriched sense fields keyed by the normalized
+    (lemma, POS, definition, translation) of the sense, so the same sense in
+    another level file or .extra variant is copied instead of regenerated.
+
+    One JSONL record per enriched sense (later records win):
+
+      {"key", "lemma", "pos", "definition", "translation",
+       "fields": {"usage_notes", "grammar_hint", "examples"},
+       "asked": [fields the LLM was asked for],
+       "origin": {"entry_key", "sense_index", "input", "model", "prompt", "at"}}
+
+    Records from another model or prompt version are ignored on load. A field
+    counts as covered when the record has it, or when the LLM was asked for it
+    and answered null (not applicable).
+    """
+
+    def __init__(self, path: str, model: str, prompt: str, input_path: str, write: bool = True):
+        self.path = path
+        self.model = model
+        self.prompt = prompt
+        self.input_path = input_path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.stale = 0
+        if os.path.exists(path):
+            for rec in iter_jsonl(path, skip_invalid=True):
+                origin = rec.get("origin") or {}
+                if origin.get("model") == model and origin.get("prompt") == prompt:
+                    self.records[rec["key"]] = rec
+                else:
+                    self.stale += 1
+        self._out = JsonlWriter(path, "a") if write else None
+
+    @staticmethod
+    def sense_tuple(entry: Dict[str, Any], sense: Dict[str, Any]) -> Tuple[str, str, str, str]:
+        vocab_item = entry.get("vocab_item") if isinstance(entry.get("vocab_item"), dict) else {}
+        lemma = normalize(safe_get_str(vocab_item, "base_form") or safe_get_str(vocab_item, "lookup_form"))
+        return (
+            lemma,
+            safe_get_str(vocab_item, "part_of_speech").casefold(),
+            " ".join(safe_get_str(sense, "definition").split()).casefold(),
+            " ".join(safe_get_str(sense, "translation").split()).casefold(),
+        )
+
+    @classmethod
+    def key_for(cls, entry: Dict[str, Any], sense: Dict[str, Any]) -> str:
+        return content_hash(list(cls.sense_tuple(entry, sense)))
+
+    def lookup(self, key: str, sense: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rec = self.records.get(key)
+        if rec is None:
+            return None
+        fields = rec.get("fields") or {}
+        asked = set(rec.get("asked") or [])
+        for name in missing_fields(sense):
+            empty = is_empty_examples(fields.get(name)) if name == "examples" else is_empty_text(fields.get(name))
+            if empty and name not in asked:
+                return None
+        return rec
+
+    def add(self, key: str, entry: Dict[str, Any], sense_index: int, sense: Dict[str, Any], asked: List[str]) -> None:
+        lemma, pos, definition, translation = self.sense_tuple(entry, sense)
+        rec = {
+            "key": key,
+            "lemma": lemma,
+            "pos": pos,
+            "definition": definition,
+            "translation": translation,
+            "fields": {k: sense.get(k) for k in ("usage_notes", "grammar_hint", "examples")},
+            "asked": asked,
+            "origin": {
+                "entry_key": entry_key(entry),
+                "sense_index": sense_index,
+                "input": self.input_path,
+                "model": self.model,
+                "prompt": self.prompt,
+                "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+        }
+        self.records[key] = rec
+        if self._out is not None:
+            self._out.write(rec)
+
+    def flush(self) -> None:
+        if self._out is not None:
+            self._out.flush()
+
+    def close(self) -> None:
+        if self._out is not None:
+            self._out.close()
+
+
+def note_reuse(entry: Dict[str, Any], sense_index: int, rec: Dict[str, Any]) -> None:
+    """Tags the entry with where a reused sense came from (source.enrich_reuse), for later invalidation."""
+    source = entry.get("source")
+    if not isinstance(source, dict):
+        source = {}
+        entry["source"] = source
+    tags = source.get("enrich_reuse")
+    if not isinstance(tags, list):
+        tags = []
+        source["enrich_reuse"] = tags
+    tags.append({"sense_index": sense_index, "key": rec["key"], "origin": rec["origin"]})
+
+
 def count_existing_output_lines(output_path: str) -> int:
     """
     Counts valid JSONL lines already written in the output file.
@@ -249,7 +433,7 @@ def count_existing_output_lines(output_path: str) -> int:
             if not s:
                 continue
             try:
-                json.loads(s)
+                loads(s)
                 n += 1
             except Exception:
                 # Stop at first invalid line; resume will rewrite from here onward
@@ -262,15 +446,37 @@ def main() -> None:
     ap.add_argument("--input", "-i", required=True, help="Input JSONL file")
     ap.add_argument("--output", "-o", required=True, help="Output JSONL file")
     ap.add_argument("--model", default=DEFAULT_MODEL, help=f"Ollama model (default: {DEFAULT_MODEL})")
+    ap.add_argument(
+        "--small-model",
+        default="",
+        help="Try this (faster) model first; senses whose fragment fails validation go to --model",
+    )
     ap.add_argument("--limit", type=int, default=0, help="Process at most N NEW entries (0 = no limit)")
     ap.add_argument("--sleep-ms", type=int, default=0, help="Sleep between LLM calls (ms)")
     ap.add_argument("--dry-run", action="store_true", help="Do not write output; just print stats")
     ap.add_argument("--max-senses", type=int, default=0, help="Cap senses processed per entry (0 = default safety cap)")
     ap.add_argument("--resume", action="store_true", help="Append to output and skip entries already written")
     ap.add_argument("--flush-every", type=int, default=FLUSH_EVERY, help=f"Flush output every N entries (default: {FLUSH_EVERY})")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Rewrite output, copying through entries whose input/model/prompt fingerprint is unchanged",
+    )
+    ap.add_argument("--write-index", action="store_true", help="Also write the <output>.idx offset sidecar (jsonl_index.py)")
+    ap.add_argument(
+        "--reuse-index",
+        default="",
+        help="JSONL of enriched senses shared across runs; identical lemma/POS/definition/translation senses are copied",
+    )
+    ap.add_argument("--usage-log", default="", help="Append per-call Ollama token/timing records to this JSONL (llm_usage.py)")
     args = ap.parse_args()
 
+    if args.incremental and args.resume:
+        ap.error("--incremental already reuses finished entries; drop --resume")
+
     max_senses = args.max_senses if args.max_senses > 0 else MAX_SENSES_PER_ENTRY
+    cascade = ModelCascade.from_args(args.model, args.small_model)
+    usage_log = UsageLog("llmenrich", args.usage_log)
 
     # Ensure output directory exists
     out_dir = os.path.dirname(args.output)
@@ -285,6 +491,22 @@ def main() -> None:
         out_mode = "a" if already_done > 0 else "w"
         print(f"[RESUME] Output has {already_done} valid lines; will skip that many input entries.", file=sys.stderr)
 
+    reuse: Optional[ReuseIndex] = None
+    if args.reuse_index:
+        reuse = ReuseIndex(args.reuse_index, cascade.label, ENRICH_PROMPT_VERSION, args.input, write=not args.dry_run)
+        print(f"[REUSE] {len(reuse.records)} enriched senses indexed"
+              + (f", {reuse.stale} from another model/prompt ignored" if reuse.stale else ""), file=sys.stderr)
+
+    # Incremental: index previous output entries by key. The new output goes to
+    # <output>.tmp and replaces the old one only once the run completes, so an
+    # interrupted run leaves the previous entries intact.
+    previous: Dict[str, Dict[str, Any]] = {}
+    if args.incremental and os.path.exists(args.output):
+        for prev in iter_jsonl(args.output, skip_invalid=True):
+            if isinstance(prev, dict):
+                previous[entry_key(prev)] = prev
+        print(f"[INCREMENTAL] {len(previous)} previous entries indexed", file=sys.stderr)
+
     total_entries_seen = 0          # total input lines processed/considered (excluding blank lines)
     total_entries_written = 0       # number of lines written in this run
     changed_entries = 0
@@ -292,14 +514,18 @@ def main() -> None:
     field_updates = 0
     skipped_senses = 0
     failed_senses = 0
+    lemma_dropped = 0
     skipped_due_to_resume = 0
+    reused_entries = 0
+    reused_senses = 0
 
     # Open files once; stream output
-    with open(args.input, "r", encoding="utf-8") as f_in:
+    with open(args.input, "rb") as f_in:
         # If not dry-run, open output for streaming writes
         f_out = None
+        write_path = args.output + ".tmp" if args.incremental else args.output
         if not args.dry_run:
-            f_out = open(args.output, out_mode, encoding="utf-8")
+            f_out = JsonlWriter(write_path, out_mode, index=args.write_index and not args.incremental)
 
         try:
             for line_no, line in enumerate(f_in, start=1):
@@ -319,28 +545,50 @@ def main() -> None:
                     break
 
                 try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
+                    entry = loads(line)
+                except ValueError:
                     print(f"[WARN] Invalid JSON at input line {line_no}; writing unchanged.", file=sys.stderr)
                     if not args.dry_run and f_out is not None:
-                        f_out.write(line + "\n")
+                        f_out.write_line(line)
                         total_entries_written += 1
                     continue
 
                 vocab_item = entry.get("vocab_item", {})
                 word = vocab_item.get("base_form") or vocab_item.get("lookup_form") or "UNKNOWN"
 
+                input_fp = {
+                    "enrich_input": content_hash(entry),
+                    "enrich_model": cascade.label,
+                    "enrich_prompt": ENRICH_PROMPT_VERSION,
+                }
+                prev = previous.get(entry_key(entry)) if isinstance(entry, dict) else None
+                if prev is not None and matches(prev, **input_fp):
+                    dropped = strip_lemma_misses(prev)
+                    if not dropped:
+                        if not args.dry_run and f_out is not None:
+                            f_out.write(prev)
+                            total_entries_written += 1
+                        reused_entries += 1
+                        continue
+                    # Carry the rest over and regenerate only the senses left without examples.
+                    lemma_dropped += dropped
+                    print(f"[INFO] {word}: dropped {dropped} previous example(s) that don't use the word")
+                    entry = prev
+
                 print(f"[{total_entries_seen}] Working on: {word}")
 
                 senses = entry.get("senses")
                 if not isinstance(senses, list) or len(senses) == 0:
+                    set_fingerprint(entry, **input_fp)
                     if not args.dry_run and f_out is not None:
-                        f_out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                        f_out.write(entry)
                         total_entries_written += 1
                     print(f"   ✓ Finished {word} (no senses)")
                     continue
 
                 entry_updated = False
+                entry_failed = False
+                uses_lemma = lemma_checker(entry)
 
                 for s_idx, sense in enumerate(senses[:max_senses]):
                     if not isinstance(sense, dict):
@@ -350,32 +598,74 @@ def main() -> None:
                         skipped_senses += 1
                         continue
 
+                    reuse_key = ReuseIndex.key_for(entry, sense) if reuse is not None else ""
+                    hit = reuse.lookup(reuse_key, sense) if reuse is not None else None
+                    if hit is not None:
+                        f = hit["fields"]
+                        examples, dropped = filter_lemma_examples(
+                            [dict(ex) for ex in f.get("examples") or [] if isinstance(ex, dict)], uses_lemma
+                        )
+                        lemma_dropped += dropped
+                        if dropped and not examples and is_empty_examples(sense.get("examples")):
+                            # Nothing usable to copy; ask the model as if there were no hit.
+                            print(f"   ↺ Sense {s_idx+1}: reused examples from {hit['key']} don't use {word}; not reusing")
+                            hit = None
+                    if hit is not None:
+                        updates = apply_fragment(sense, f.get("usage_notes"), f.get("grammar_hint"), examples)
+                        note_reuse(entry, s_idx + 1, hit)
+                        reused_senses += 1
+                        if updates > 0:
+                            field_updates += updates
+                            entry_updated = True
+                        print(f"   ↺ Sense {s_idx+1}: reused from {hit['origin'].get('input')} ({hit['key']})")
+                        continue
+
                     print(f"   → Sense {s_idx+1}: requesting LLM enrichment...")
 
+                    asked = missing_fields(sense)
                     prompt = build_prompt(entry, sense)
 
-                    raw = ""
-                    try:
-                        raw = call_ollama_json(args.model, prompt)
+                    def request_fragment(model: str, prompt: str = prompt, field: str = "+".join(asked)) -> Dict[str, Any]:
+                        nonlocal llm_calls
+                        raw = call_ollama_json(model, prompt, usage=usage_log, field=field)
                         llm_calls += 1
 
-                        frag_obj = None
                         last_err = None
                         for attempt in range(RETRY_JSON_REPAIRS + 1):
                             try:
-                                frag_obj = coerce_json_object(raw)
-                                break
+                                return coerce_json_object(raw)
                             except Exception as e:
                                 last_err = e
                                 if attempt < RETRY_JSON_REPAIRS:
-                                    raw = call_ollama_json(args.model, repair_prompt(raw))
+                                    raw = call_ollama_json(model, repair_prompt(raw), usage=usage_log, field=field, kind="repair")
                                     llm_calls += 1
+                        raise ValueError(f"JSON parse failed after retries: {last_err}")
 
-                        if frag_obj is None:
-                            raise ValueError(f"JSON parse failed after retries: {last_err}")
+                    try:
+                        frag_obj, _ = cascade.run(request_fragment, lambda obj: check_fragment(sense, obj, uses_lemma))
 
                         usage, grammar, examples = validate_fragment(frag_obj)
+                        examples, dropped = filter_lemma_examples(examples, uses_lemma)
+                        lemma_dropped += dropped
+                        if dropped and not examples:
+                            # Regenerate once, on the last tier, insisting on the word.
+                            print(f"   ↻ Sense {s_idx+1}: no example uses {word}; regenerating examples")
+                            retry_obj = request_fragment(
+                                cascade.models[-1], build_prompt(entry, sense, require_word=True), field="examples"
+                            )
+                            examples, dropped = filter_lemma_examples(validate_fragment(retry_obj)[2], uses_lemma)
+                            lemma_dropped += dropped
+                        missing_lemma = bool(dropped) and not examples
+
                         updates = apply_fragment(sense, usage, grammar, examples)
+                        if missing_lemma:
+                            # Keep the notes, but leave the entry unfingerprinted (and out of
+                            # the reuse index) so the next run asks for this sense's examples again.
+                            failed_senses += 1
+                            entry_failed = True
+                            print(f"[WARN] No example for {word} sense#{s_idx+1} uses the word; will retry next run", file=sys.stderr)
+                        elif reuse is not None:
+                            reuse.add(reuse_key, entry, s_idx + 1, sense, asked)
 
                         if updates > 0:
                             field_updates += updates
@@ -383,11 +673,16 @@ def main() -> None:
 
                     except Exception as e:
                         failed_senses += 1
+                        entry_failed = True
                         print(f"[WARN] Enrichment failed for {word} sense#{s_idx+1}: {e}", file=sys.stderr)
 
                     if args.sleep_ms:
                         time.sleep(args.sleep_ms / 1000.0)
 
+                # Only fingerprint complete entries so failed senses are retried next run.
+                if not entry_failed:
+                    set_fingerprint(entry, **input_fp)
+
                 if entry_updated:
                     changed_entries += 1
                     print(f"   ✓ Finished {word} (updated)")
@@ -396,31 +691,48 @@ def main() -> None:
 
                 # Stream write the updated entry immediately
                 if not args.dry_run and f_out is not None:
-                    f_out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    f_out.write(entry)
                     total_entries_written += 1
 
                     if args.flush_every > 0 and (total_entries_written % args.flush_every == 0):
-                        f_out.flush()
-                        try:
-                            os.fsync(f_out.fileno())
-                        except OSError:
-                            # Some environments/filesystems don't support fsync; flush is still helpful
-                            pass
+                        f_out.flush(fsync=True)
+                        if reuse is not None:
+                            reuse.flush()
 
         finally:
             if f_out is not None:
-                f_out.flush()
                 f_out.close()
+            if reuse is not None:
+                reuse.close()
+            usage_log.close()
+
+    if args.incremental and not args.dry_run:
+        os.replace(write_path, args.output)
+        if args.write_index:
+            from jsonl_index import build_index
+
+            build_index(args.output)
 
     print(f"[DONE] Input entries seen (non-blank): {total_entries_seen}")
     if args.resume:
         print(f"[DONE] Skipped due to resume: {skipped_due_to_resume}")
+    if args.incremental:
+        print(f"[DONE] Reused unchanged entries: {reused_entries}")
     print(f"[DONE] Output entries written this run: {total_entries_written}")
     print(f"[DONE] Entries changed this run: {changed_entries}")
     print(f"[DONE] LLM calls (incl repairs): {llm_calls}")
     print(f"[DONE] Field updates applied: {field_updates}")
     print(f"[DONE] Senses skipped (already complete): {skipped_senses}")
     print(f"[DONE] Senses failed: {failed_senses}")
+    print(f"[DONE] Examples dropped for not using their word: {lemma_dropped}")
+    if reuse is not None:
+        print(f"[DONE] Senses reused from {args.reuse_index}: {reused_senses}")
+    if args.small_model:
+        print(cascade.summary())
+    if llm_calls:
+        print(usage_log.summary())
+    if args.usage_log:
+        print(f"[DONE] Per-call usage log: {args.usage_log}")
 
     if args.dry_run:
         print("[DRY RUN] Not writing output.")
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Compact binary encoding for Hermes vocab packs (.hpk).
+
+Most of a vocab JSONL is repeated keys and nulls, so the encoder:
+  - stores each distinct dict key tuple once ("shapes") and writes records as
+    shape id + bitmask of non-null fields + the non-null values only,
+  - interns every string value in one table ordered by frequency, so common
+    strings cost a one-byte varint,
+  - codes grammatical fields (case, number, tense, ...) against small per-field
+    enum tables,
+  - optionally stores forms as stem + paradigm template (see paradigms.py),
+  - groups entries into blocks compressed independently (zstd if `zstandard`
+    is installed, zlib otherwise), so reading one entry decompresses one block.
+
+Layout:
+  header   HEADER struct (magic, version, codec, block size, counts, offsets)
+  blocks   compressed; each is varint entry lengths followed by entry bodies
+  meta     compressed JSON: strings, shapes, enums, entry keys[, paradigm templates]
+  index    per block: (offset, compressed length, raw length)
+
+Usage:
+  pack_codec.py encode A1.jsonl A1.hpk
+  pack_codec.py decode A1.hpk A1.jsonl
+  pack_codec.py verify A1.jsonl A1.hpk
+  pack_codec.py bench src/assets/packs/ru/vocab/*.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fingerprint import entry_key
+from jsonl_io import JsonlWriter, read_jsonl
+from paradigms import TemplateTable, decode_entry, encode_entries
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover
+    zstandard = None
+
+MAGIC = b"HPK\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBHIIQQQQ")
+INDEX_ROW = struct.Struct("<QII")
+
+CODEC_NONE, CODEC_ZLIB, CODEC_ZSTD = 0, 1, 2
+CODEC_NAMES = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+# Value tags
+T_NULL, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_REC, T_ENUM = range(9)
+
+# String fields whose values come from a small closed set.
+ENUM_FIELDS = ("tense", "mood", "number", "gender", "case", "aspect", "degree", "part_of_speech", "media_type")
+
+F64 = struct.Struct("<d")
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def compress(codec: int, raw: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd codec needs the `zstandard` package")
+        return zstandard.ZstdCompressor(level=19).compress(raw)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(raw, 9)
+    return raw
+
+
+def decompress(codec: int, data: bytes, raw_len: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("this pack is zstd-compressed; install `zstandard` to read it")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=raw_len)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    return bytes(data)
+
+
+# ----------------------------
+# Varints
+# ----------------------------
+
+def put_uvarint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def get_uvarint(buf: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def zigzag(n: int) -> int:
+    return (n << 1) if n >= 0 else ((-n << 1) - 1)
+
+
+def unzigzag(n: int) -> int:
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+
+# ----------------------------
+# Tables
+# ----------------------------
+
+class Tables:
+    """String, shape and enum tables shared by every entry in a pack."""
+
+    def __init__(self, strings: List[str], shapes: List[List[str]], enums: Dict[str, List[str]]):
+        self.strings = strings
+        self.shapes = [tuple(s) for s in shapes]
+        self.enums = enums
+        self.string_ids = {s: i for i, s in enumerate(strings)}
+        self.shape_ids = {s: i for i, s in enumerate(self.shapes)}
+        self.enum_ids = {k: {v: i for i, v in enumerate(vals)} for k, vals in enums.items()}
+
+    @classmethod
+    def build(cls, entries: Iterable[Any]) -> "Tables":
+        strings: Counter = Counter()
+        shapes: Counter = Counter()
+        enums: Dict[str, Counter] = {k: Counter() for k in ENUM_FIELDS}
+
+        def walk(v: Any, key: Optional[str] = None) -> None:
+            if isinstance(v, str):
+                if key in enums:
+                    enums[key][v] += 1
+                else:
+                    strings[v] += 1
+            elif isinstance(v, dict):
+                shapes[tuple(v.keys())] += 1
+                for k, x in v.items():
+                    walk(x, k)
+            elif isinstance(v, list):
+                for x in v:
+                    walk(x)
+
+        for e in entries:
+            walk(e)
+        return cls(
+            strings=[s for s, _ in strings.most_common()],
+            shapes=[list(s) for s, _ in shapes.most_common()],
+            enums={k: [v for v, _ in c.most_common()] for k, c in enums.items() if c},
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"strings": self.strings, "shapes": [list(s) for s in self.shapes], "enums": self.enums}
+
+
+# ----------------------------
+# Entry codec
+# ----------------------------
+
+def encode_value(out: bytearray, v: Any, t: Tables, key: Optional[str] = None) -> None:
+    if v is None:
+        out.append(T_NULL)
+    elif v is True:
+        out.append(T_TRUE)
+    elif v is False:
+        out.append(T_FALSE)
+    elif isinstance(v, int):
+        out.append(T_INT)
+        put_uvarint(out, zigzag(v))
+    elif isinstance(v, float):
+        out.append(T_FLOAT)
+        out += F64.pack(v)
+    elif isinstance(v, str):
+        codes = t.enum_ids.get(key) if key else None
+        if codes is not None and v in codes:
+            out.append(T_ENUM)
+            put_uvarint(out, codes[v])
+        else:
+            out.append(T_STR)
+            put_uvarint(out, t.string_ids[v])
+    elif isinstance(v, list):
+        out.append(T_LIST)
+        put_uvarint(out, len(v))
+        for x in v:
+            encode_value(out, x, t)
+    elif isinstance(v, dict):
+        keys = tuple(v.keys())
+        out.append(T_REC)
+        put_uvarint(out, t.shape_ids[keys])
+        mask = 0
+        for i, k in enumerate(keys):
+            if v[k] is not None:
+                mask |= 1 << i
+        put_uvarint(out, mask)
+        for k in keys:
+            if v[k] is not None:
+                encode_value(out, v[k], t, k)
+    else:
+        raise TypeError(f"cannot encode {type(v).__name__}")
+
+
+def decode_value(buf: bytes, pos: int, t: Tables, key: Optional[str] = None) -> Tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+    if tag == T_REC:
+        shape_id, pos = get_uvarint(buf, pos)
+        mask, pos = get_uvarint(buf, pos)
+        out: Dict[str, Any] = {}
+        for i, k in enumerate(t.shapes[shape_id]):
+            if mask >> i & 1:
+                out[k], pos = decode_value(buf, pos, t, k)
+            else:
+                out[k] = None
+        return out, pos
+    if tag == T_STR:
+        i, pos = get_uvarint(buf, pos)
+        return t.strings[i], pos
+    if tag == T_ENUM:
+        i, pos = get_uvarint(buf, pos)
+        return t.enums[key][i], pos
+    if tag == T_LIST:
+        n, pos = get_uvarint(buf, pos)
+        items = []
+        for _ in range(n):
+            x, pos = decode_value(buf, pos, t)
+            items.append(x)
+        return items, pos
+    if tag == T_INT:
+        n, pos = get_uvarint(buf, pos)
+        return unzigzag(n), pos
+    if tag == T_NULL:
+        return None, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_FALSE:
+        return False, pos
+    if tag == T_FLOAT:
+        return F64.unpack_from(buf, pos)[0], pos + F64.size
+    raise ValueError(f"bad tag {tag} at {pos - 1}")
+
+
+# ----------------------------
+# Writer / reader
+# ----------------------------
+
+def write_pack(
+    entries: List[Dict[str, Any]],
+    path: Path,
+    codec: str = "",
+    block_size: int = 16,
+    paradigms: bool = False,
+) -> Dict[str, int]:
+    codec_id = CODEC_NAMES[codec or default_codec()]
+    keys = [entry_key(e) for e in entries]
+    templates: Optional[TemplateTable] = None
+    if paradigms:
+        entries, templates = encode_entries(entries)
+    tables = Tables.build(entries)
+
+    blocks: List[Tuple[bytes, int]] = []
+    for start in range(0, len(entries), block_size):
+        bodies = []
+        for e in entries[start:start + block_size]:
+            body = bytearray()
+            encode_value(body, e, tables)
+            bodies.append(bytes(body))
+        raw = bytearray()
+        for b in bodies:
+            put_uvarint(raw, len(b))
+        for b in bodies:
+            raw += b
+        blocks.append((compress(codec_id, bytes(raw)), len(raw)))
+
+    meta = dict(tables.to_json(), keys=keys)
+    if templates is not None:
+        meta["paradigms"] = templates.to_json()
+    meta_raw = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    meta_blob = compress(codec_id, meta_raw)
+
+    index = bytearray()
+    offset = HEADER.size
+    for blob, raw_len in blocks:
+        index += INDEX_ROW.pack(offset, len(blob), raw_len)
+        offset += len(blob)
+    meta_off = offset
+    index_off = meta_off + len(meta_blob)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, codec_id, block_size, len(entries), len(blocks),
+                            meta_off, len(meta_raw), index_off, len(index)))
+        for blob, _ in blocks:
+            f.write(blob)
+        f.write(meta_blob)
+        f.write(index)
+    tmp.replace(path)
+    return {"entries": len(entries), "blocks": len(blocks), "strings": len(tables.strings),
+            "shapes": len(tables.shapes), "bytes": path.stat().st_size}
+
+
+class PackReader:
+    """Random access over an .hpk file: reader[i], reader.get(entry_key), iteration."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._f = self.path.open("rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.codec, self.block_size, self.count, block_count,
+         meta_off, meta_raw_len, index_off, index_len) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a Hermes pack")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported pack version {version}")
+        self._index = [INDEX_ROW.unpack_from(self._mm, index_off + i * INDEX_ROW.size) for i in range(block_count)]
+        meta = json.loads(decompress(self.codec, self._mm[meta_off:index_off], meta_raw_len))
+        self.tables = Tables(meta["strings"], meta["shapes"], meta["enums"])
+        self.keys: List[str] = meta["keys"]
+        self.paradigms = TemplateTable.from_json(meta["paradigms"]) if "paradigms" in meta else None
+        self._ordinal = {k: i for i, k in enumerate(self.keys)}
+        self._cached: Optional[Tuple[int, bytes, List[int]]] = None
+
+    def close(self) -> None:
+        self._mm.close()
+        self._f.close()
+
+    def __enter__(self) -> "PackReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _block(self, b: int) -> Tuple[bytes, List[int]]:
+        if self._cached is not None and self._cached[0] == b:
+            return self._cached[1], self._cached[2]
+        offset, comp_len, raw_len = self._index[b]
+        raw = decompress(self.codec, self._mm[offset:offset + comp_len], raw_len)
+        n = min(self.block_size, self.count - b * self.block_size)
+        starts = []
+        pos = 0
+        lengths = []
+        for _ in range(n):
+            ln, pos = get_uvarint(raw, pos)
+            lengths.append(ln)
+        for ln in lengths:
+            starts.append(pos)
+            pos += ln
+        self._cached = (b, raw, starts)
+        return raw, starts
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        raw, starts = self._block(i // self.block_size)
+        value, _ = decode_value(raw, starts[i % self.block_size], self.tables)
+        if self.paradigms is not None:
+            value = decode_entry(value, self.paradigms)
+        return value
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        i = self._ordinal.get(key)
+        return None if i is None else self[i]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self.count):
+            yield self[i]
+
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def verify(jsonl: Path, hpk: Path) -> int:
+    """Entry-by-entry comparison, including key order and bool/int distinctions."""
+    src = read_jsonl(jsonl)
+    bad = 0
+    with PackReader(hpk) as r:
+        if len(r) != len(src):
+            print(f"[FAIL] {hpk}: {len(r)} entries, expected {len(src)}", file=sys.stderr)
+            return 1
+        for i, e in enumerate(src):
+            a = json.dumps(e, ensure_ascii=False)
+            b = json.dumps(r[i], ensure_ascii=False)
+            if a != b or r.get(entry_key(e)) is None:
+                bad += 1
+                if bad <= 5:
+                    print(f"[FAIL] entry {i} differs", file=sys.stderr)
+    print(f"[{'OK' if not bad else 'FAIL'}] {hpk}: {len(src) - bad}/{len(src)} entries round-trip")
+    return 1 if bad else 0
+
+
+def bench(paths: List[Path], codec: str, block_size: int, outdir: Path, paradigms: bool = False) -> None:
+    print(f"{'file':<12} {'jsonl':>10} {'hpk':>10} {'ratio':>6} {'json ms':>8} {'hpk ms':>8} {'1 entry us':>10}")
+    for p in paths:
+        t0 = time.perf_counter()
+        entries = read_jsonl(p)
+        json_ms = (time.perf_counter() - t0) * 1000
+        out = outdir / (p.stem + ".hpk")
+        write_pack(entries, out, codec, block_size, paradigms)
+        with PackReader(out) as r:
+            t0 = time.perf_counter()
+            for _ in r:
+                pass
+            hpk_ms = (time.perf_counter() - t0) * 1000
+            keys = r.keys[:: max(1, len(r.keys) // 200)]
+            t0 = time.perf_counter()
+            for k in keys:
+                r._cached = None
+                r.get(k)
+            one_us = (time.perf_counter() - t0) * 1e6 / max(1, len(keys))
+        src_size = p.stat().st_size
+        size = out.stat().st_size
+        print(f"{p.name:<12} {src_size:>10} {size:>10} {src_size / size:>5.1f}x {json_ms:>8.1f} {hpk_ms:>8.1f} {one_us:>10.0f}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Encode/decode Hermes vocab packs in the compact .hpk format.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    enc = sub.add_parser("encode", help="JSONL -> .hpk")
+    enc.add_argument("input")
+    enc.add_argument("output")
+    dec = sub.add_parser("decode", help=".hpk -> JSONL")
+    dec.add_argument("input")
+    dec.add_argument("output")
+    ver = sub.add_parser("verify", help="Check an .hpk round-trips to its JSONL exactly")
+    ver.add_argument("jsonl")
+    ver.add_argument("hpk")
+    ben = sub.add_parser("bench", help="Size and decode time per level")
+    ben.add_argument("inputs", nargs="+")
+    ben.add_argument("--outdir", default="out/hpk")
+    for p in (enc, ben):
+        p.add_argument("--codec", choices=sorted(CODEC_NAMES), default="", help=f"default: {default_codec()}")
+        p.add_argument("--block-size", type=int, default=16, help="Entries per compressed block")
+        p.add_argument("--paradigms", action="store_true", help="Store forms as stem + shared paradigm template")
+    args = ap.parse_args()
+
+    if args.cmd == "encode":
+        stats = write_pack(read_jsonl(Path(args.input)), Path(args.output), args.codec, args.block_size, args.paradigms)
+        print(f"[DONE] Wrote {args.output}: {stats}")
+    elif args.cmd == "decode":
+        with PackReader(Path(args.input)) as r, JsonlWriter(args.output) as w:
+            w.write_many(r)
+        print(f"[DONE] Wrote {args.output}")
+    elif args.cmd == "verify":
+        return verify(Path(args.jsonl), Path(args.hpk))
+    elif args.cmd == "bench":
+        bench([Path(p) for p in args.inputs], args.codec, args.block_size, Path(args.outdir), args.paradigms)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
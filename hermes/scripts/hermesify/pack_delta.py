@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Entry-level deltas between two builds of a language pack.
+
+A build is a pack directory (src/assets/packs/ru, or a copy of an older one)
+with vocab/*.jsonl and grammar/*.json. Entries are identified by key:
+
+  vocab    stable key of vocab_item.base_form (fingerprint.entry_key)
+  grammar  "<list>:<slug>" for sections / grammar_points, "<list>:<name>" for
+           tags; any other top-level value (meta, ...) is one entry under its
+           own name
+
+Every entry gets a content hash (fingerprint.content_hash). The manifest hash
+of a build is sha256 over each file's path and its (key, hash) pairs in file
+order, so it changes with any content, key or order change.
+
+A delta lists, per file, the added/changed entries (with their content) and
+the removed keys, plus the final key order when appending added entries
+wouldn't reproduce it. `apply` checks the pack against the delta's base hash,
+rebuilds the touched files in memory, checks the result against the target
+hash and only then swaps the files in. Unchanged vocab lines are copied as-is
+and added/changed ones come from the target's line text in the delta; grammar
+files are small, so a delta carries the target's file text for them. Each
+touched file's sha256 is in the delta too, so apply only writes files that
+are byte-identical to the target build.
+
+Usage:
+  pack_delta.py manifest ../../src/assets/packs/ru
+  pack_delta.py diff /tmp/ru-old ../../src/assets/packs/ru --out out/ru.delta.json.gz
+  pack_delta.py apply /tmp/ru-old out/ru.delta.json.gz
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fingerprint import content_hash, entry_key
+from jsonl_io import dumps_bytes, loads
+
+HERMES_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_PACK_DIR = HERMES_DIR / "src" / "assets" / "packs" / "ru"
+DELTA_FORMAT = 2
+
+# Lists of grammar objects keyed by one of their fields.
+GRAMMAR_ID_FIELDS = ("slug", "name")
+
+
+@dataclass
+class PackFile:
+    kind: str  # "vocab" | "grammar"
+    keys: List[str] = field(default_factory=list)
+    hashes: Dict[str, str] = field(default_factory=dict)
+    values: Dict[str, Any] = field(default_factory=dict)
+    raw: Dict[str, bytes] = field(default_factory=dict)  # vocab: original line bytes
+    text: Optional[bytes] = None  # grammar: the whole file as built
+
+    def add(self, key: str, value: Any, raw: Optional[bytes] = None) -> None:
+        if key in self.hashes:
+            raise ValueError(f"duplicate entry key {key!r}")
+        self.keys.append(key)
+        self.hashes[key] = content_hash(value)
+        self.values[key] = value
+        if raw is not None:
+            self.raw[key] = raw
+
+
+# ----------------------------
+# Loading / writing builds
+# ----------------------------
+
+def _grammar_list_id(items: Any) -> Optional[str]:
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        return None
+    for fld in GRAMMAR_ID_FIELDS:
+        ids = [i.get(fld) for i in items]
+        if all(isinstance(x, str) and x for x in ids) and len(set(ids)) == len(ids):
+            return fld
+    return None
+
+
+def load_vocab(path: Path) -> PackFile:
+    pf = PackFile("vocab")
+    with path.open("rb") as f:
+        for line_no, raw in enumerate(f, start=1):
+            body = raw.rstrip(b"\r\n")
+            if not body.strip():
+                continue
+            entry = loads(body)
+            try:
+                pf.add(entry_key(entry), entry, body)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: {exc}") from exc
+    return pf
+
+
+def load_grammar(path: Path) -> PackFile:
+    return grammar_from_bytes(path.read_bytes())
+
+
+def grammar_from_bytes(text: bytes) -> PackFile:
+    pf = PackFile("grammar", text=text)
+    data = json.loads(text.decode("utf-8"))
+    for top, value in data.items():
+        fld = _grammar_list_id(value)
+        if fld is None:
+            pf.add(top, value)
+            continue
+        for item in value:
+            pf.add(f"{top}:{item[fld]}", item)
+    return pf
+
+
+def load_build(root: Path) -> Dict[str, PackFile]:
+    files: Dict[str, PackFile] = {}
+    for p in sorted((root / "vocab").glob("*.jsonl")):
+        files[f"vocab/{p.name}"] = load_vocab(p)
+    for p in sorted((root / "grammar").glob("*.json")):
+        files[f"grammar/{p.name}"] = load_grammar(p)
+    return files
+
+
+def render(pf: PackFile) -> bytes:
+    if pf.kind == "vocab":
+        # New lines in the pipeline writers' style (jsonl_io), so files stay diffable.
+        return b"".join((pf.raw.get(k) or dumps_bytes(pf.values[k])) + b"\n" for k in pf.keys)
+    if pf.text is not None:
+        return pf.text
+    data: Dict[str, Any] = {}
+    for k in pf.keys:
+        top, sep, _ = k.partition(":")
+        if sep:
+            data.setdefault(top, []).append(pf.values[k])
+        else:
+            data[k] = pf.values[k]
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+# ----------------------------
+# Manifests
+# ----------------------------
+
+def file_hash(pf: PackFile) -> str:
+    h = hashlib.sha256()
+    for k in pf.keys:
+        h.update(f"{k}\t{pf.hashes[k]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def build_hash(files: Dict[str, PackFile]) -> str:
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"{name}\t{file_hash(files[name])}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def manifest(files: Dict[str, PackFile]) -> Dict[str, Any]:
+    return {
+        "hash": build_hash(files),
+        "files": {
+            name: {"kind": pf.kind, "entries": len(pf.keys), "hash": file_hash(pf)}
+            for name, pf in sorted(files.items())
+        },
+    }
+
+
+# ----------------------------
+# Diff / apply
+# ----------------------------
+
+def _default_order(base_keys: List[str], removed: set, added: List[str]) -> List[str]:
+    return [k for k in base_keys if k not in removed] + added
+
+
+def _entry_record(pf: PackFile, key: str) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {"key": key, "hash": pf.hashes[key]}
+    if key in pf.raw:
+        # Vocab: the target's line text, so apply writes the same bytes.
+        rec["line"] = pf.raw[key].decode("utf-8")
+    else:
+        rec["value"] = pf.values[key]
+    return rec
+
+
+def diff_builds(old: Dict[str, PackFile], new: Dict[str, PackFile]) -> Dict[str, Any]:
+    files: Dict[str, Any] = {}
+    for name in sorted(set(old) | set(new)):
+        a, b = old.get(name), new.get(name)
+        if b is None:
+            files[name] = {"deleted": True}
+            continue
+        if a is None:
+            a = PackFile(b.kind)
+        elif a.kind != b.kind:
+            raise ValueError(f"{name}: kind changed from {a.kind} to {b.kind}")
+        added = [k for k in b.keys if k not in a.hashes]
+        removed = [k for k in a.keys if k not in b.hashes]
+        # Same content in a different line format counts as changed, so apply reproduces the bytes.
+        changed = [k for k in b.keys if k in a.hashes and (a.hashes[k] != b.hashes[k] or a.raw.get(k) != b.raw.get(k))]
+        if a.keys == b.keys and not changed and a.text == b.text:
+            continue
+        fd: Dict[str, Any] = {
+            "kind": b.kind,
+            "added": [_entry_record(b, k) for k in added],
+            "changed": [{"old_hash": a.hashes[k], **_entry_record(b, k)} for k in changed],
+            "removed": [{"key": k, "hash": a.hashes[k]} for k in removed],
+            "sha256": hashlib.sha256(render(b)).hexdigest(),
+        }
+        if _default_order(a.keys, set(removed), added) != b.keys:
+            fd["order"] = b.keys
+        if b.kind == "grammar" and b.text is not None:
+            # Grammar files are small; shipping the target's bytes keeps apply byte-identical.
+            fd["text"] = b.text.decode("utf-8")
+        files[name] = fd
+    return {"format": DELTA_FORMAT, "base": build_hash(old), "target": build_hash(new), "files": files}
+
+
+def apply_delta(files: Dict[str, PackFile], delta: Dict[str, Any]) -> Tuple[Dict[str, PackFile], List[str]]:
+    """Returns (new build, names of files to rewrite or delete). Raises ValueError on any mismatch."""
+    if delta.get("format") != DELTA_FORMAT:
+        raise ValueError(f"unsupported delta format {delta.get('format')!r}")
+    if build_hash(files) != delta["base"]:
+        raise ValueError("pack does not match the delta's base build")
+
+    out = dict(files)
+    touched = []
+    for name, fd in delta["files"].items():
+        touched.append(name)
+        if fd.get("deleted"):
+            out.pop(name, None)
+            continue
+        cur = files.get(name) or PackFile(fd["kind"])
+        for r in fd["changed"] + fd["removed"]:
+            want = r.get("old_hash", r["hash"])
+            if cur.hashes.get(r["key"]) != want:
+                raise ValueError(f"{name}: entry {r['key']} differs from the delta's base")
+        removed = {r["key"] for r in fd["removed"]}
+        updates = {
+            r["key"]: (loads(r["line"]), r["line"].encode("utf-8")) if "line" in r else (r["value"], None)
+            for r in fd["changed"] + fd["added"]
+        }
+        added = [r["key"] for r in fd["added"]]
+
+        pf = PackFile(cur.kind)
+        for k in fd.get("order") or _default_order(cur.keys, removed, added):
+            if k in updates:
+                pf.add(k, *updates[k])
+            else:
+                pf.add(k, cur.values[k], cur.raw.get(k))
+        for r in fd["changed"] + fd["added"]:
+            if pf.hashes.get(r["key"]) != r["hash"]:
+                raise ValueError(f"{name}: entry {r['key']} does not hash to the delta's value")
+        if fd.get("text") is not None:
+            text = grammar_from_bytes(fd["text"].encode("utf-8"))
+            if file_hash(text) != file_hash(pf):
+                raise ValueError(f"{name}: the delta's file text does not match its entries")
+            pf.text = text.text
+        if hashlib.sha256(render(pf)).hexdigest() != fd["sha256"]:
+            raise ValueError(f"{name}: rebuilt file is not byte-identical to the target")
+        out[name] = pf
+
+    if build_hash(out) != delta["target"]:
+        raise ValueError("applied pack does not match the delta's target build")
+    return out, touched
+
+
+def write_files(root: Path, files: Dict[str, PackFile], names: List[str]) -> None:
+    # Render everything first so a failure leaves the pack untouched.
+    staged = []
+    for name in names:
+        path = root / name
+        if name not in files:
+            staged.append((path, None))
+            continue
+        tmp = path.with_name(path.name + ".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(render(files[name]))
+        staged.append((path, tmp))
+    for path, tmp in staged:
+        if tmp is None:
+            if path.exists():
+                path.unlink()
+        else:
+            os.replace(tmp, path)
+
+
+def read_delta(path: Path) -> Dict[str, Any]:
+    data = path.read_bytes()
+    if path.suffix == ".gz":
+        data = gzip.decompress(data)
+    return loads(data)
+
+
+def write_delta(path: Path, delta: Dict[str, Any]) -> int:
+    data = dumps_bytes(delta)
+    if path.suffix == ".gz":
+        data = gzip.compress(data, mtime=0)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return len(data)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compute, inspect and apply entry-level pack deltas.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("manifest", help="Print per-file and whole-build hashes")
+    m.add_argument("pack", nargs="?", default=str(DEFAULT_PACK_DIR))
+    m.add_argument("--out", default="", help="Write the manifest JSON here instead of stdout")
+    d = sub.add_parser("diff", help="Delta from OLD to NEW (.gz output is gzip-compressed)")
+    d.add_argument("old")
+    d.add_argument("new")
+    d.add_argument("--out", required=True)
+    a = sub.add_parser("apply", help="Apply a delta to a pack directory in place")
+    a.add_argument("pack")
+    a.add_argument("delta")
+    a.add_argument("--check", action="store_true", help="Verify only; don't write")
+    args = ap.parse_args()
+
+    if args.cmd == "manifest":
+        text = json.dumps(manifest(load_build(Path(args.pack))), ensure_ascii=False, indent=2)
+        if args.out:
+            Path(args.out).write_text(text + "\n", encoding="utf-8")
+            print(f"[DONE] Wrote {args.out}")
+        else:
+            print(text)
+    elif args.cmd == "diff":
+        new_root = Path(args.new)
+        delta = diff_builds(load_build(Path(args.old)), load_build(new_root))
+        size = write_delta(Path(args.out), delta)
+        full = sum(p.stat().st_size for p in new_root.glob("*/*") if p.suffix in (".json", ".jsonl"))
+        for name, fd in delta["files"].items():
+            if fd.get("deleted"):
+                print(f"  {name}: deleted")
+            else:
+                print(f"  {name}: +{len(fd['added'])} ~{len(fd['changed'])} -{len(fd['removed'])}"
+                      + (" (reordered)" if "order" in fd else ""))
+        print(f"[DONE] Wrote {args.out}: {len(delta['files'])} file(s) changed, {size} bytes (full pack {full} bytes)")
+    elif args.cmd == "apply":
+        root = Path(args.pack)
+        try:
+            files, touched = apply_delta(load_build(root), read_delta(Path(args.delta)))
+        except ValueError as exc:
+            raise SystemExit(f"[ERROR] {exc}")
+        if args.check:
+            print(f"[DONE] Delta applies cleanly ({len(touched)} file(s))")
+            return 0
+        write_files(root, files, touched)
+        print(f"[DONE] Applied {args.delta} to {root}: {len(touched)} file(s), build {build_hash(files)[:16]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
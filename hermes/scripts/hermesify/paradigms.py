@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Paradigm-template compression for generated `forms`.
+
+generate_forms() emits up to ~60 rows per word, but regular words inflect
+along a handful of patterns. Each entry's forms are factored into
+
+  {"stem": "книг", "template": 12, "exceptions": [[3, "книжек"]]}
+
+where template 12 in the pack's shared table holds the row keys plus, per
+row, the ending to append to the stem and the remaining field values. Rows
+whose surface form doesn't start with the stem are listed as exceptions
+(index, full surface form). expand() rebuilds the original list
+exactly, key order included.
+
+Packed JSONL entries carry `forms_paradigm` instead of `forms`; the template
+table is written next to the pack as <name>.paradigms.json. pack_codec.py
+can also store forms this way inside .hpk files (--paradigms).
+
+Usage:
+  paradigms.py encode A1.jsonl A1.packed.jsonl
+  paradigms.py decode A1.packed.jsonl A1.jsonl
+  paradigms.py stats src/assets/packs/ru/vocab/*.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jsonl_io import read_jsonl, write_jsonl
+
+# A stem must cover at least this share of an entry's forms; the rest become exceptions.
+STEM_COVERAGE = 0.75
+
+Template = Tuple[Tuple[str, ...], Tuple[Tuple[Any, ...], ...]]
+
+
+def _freeze(v: Any) -> Any:
+    # Templates must be hashable (morph_features can be a dict/list) and must not
+    # merge values that compare equal across types (True == 1 == 1.0), so every
+    # value but a string or None is keyed by its JSON text.
+    if v is None or isinstance(v, str):
+        return v
+    return ("__json__", json.dumps(v, ensure_ascii=False, sort_keys=False))
+
+
+def _thaw(v: Any) -> Any:
+    if isinstance(v, (tuple, list)) and len(v) == 2 and v[0] == "__json__":
+        return json.loads(v[1])
+    return v
+
+
+def choose_stem(surfaces: List[str]) -> str:
+    """Longest prefix of the first form shared by at least STEM_COVERAGE of all forms."""
+    need = math.ceil(len(surfaces) * STEM_COVERAGE)
+    first = surfaces[0]
+    for n in range(len(first), 0, -1):
+        prefix = first[:n]
+        if sum(1 for s in surfaces if s.startswith(prefix)) >= need:
+            return prefix
+    return ""
+
+
+def factor(forms: List[Dict[str, Any]]) -> Optional[Tuple[str, Template, List[List[Any]]]]:
+    """Split a forms list into (stem, template, exceptions), or None if it can't be templated."""
+    if not forms:
+        return None
+    keys = tuple(forms[0].keys())
+    if "surface_form" not in keys:
+        return None
+    for f in forms:
+        if tuple(f.keys()) != keys or not isinstance(f.get("surface_form"), str):
+            return None
+
+    surfaces = [f["surface_form"] for f in forms]
+    stem = choose_stem(surfaces)
+    rows = []
+    exceptions: List[List[Any]] = []
+    for i, f in enumerate(forms):
+        s = f["surface_form"]
+        if s.startswith(stem):
+            ending: Optional[str] = s[len(stem):]
+        else:
+            ending = None
+            exceptions.append([i, s])
+        rows.append((ending,) + tuple(_freeze(f[k]) for k in keys if k != "surface_form"))
+    return stem, (keys, tuple(rows)), exceptions
+
+
+def expand(stem: str, template: Template, exceptions: List[List[Any]]) -> List[Dict[str, Any]]:
+    keys, rows = template
+    overrides = {i: s for i, s in exceptions}
+    out = []
+    for i, row in enumerate(rows):
+        values = iter(row[1:])
+        form = {}
+        for k in keys:
+            if k == "surface_form":
+                form[k] = overrides[i] if row[0] is None else stem + row[0]
+            else:
+                form[k] = _thaw(next(values))
+        out.append(form)
+    return out
+
+
+class TemplateTable:
+    def __init__(self, templates: Optional[List[Template]] = None):
+        self.templates: List[Template] = list(templates or [])
+        self.ids: Dict[Template, int] = {t: i for i, t in enumerate(self.templates)}
+
+    def add(self, template: Template) -> int:
+        tid = self.ids.get(template)
+        if tid is None:
+            tid = len(self.templates)
+            self.templates.append(template)
+            self.ids[template] = tid
+        return tid
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        return [{"keys": list(keys), "rows": [[_dump(v) for v in r] for r in rows]} for keys, rows in self.templates]
+
+    @classmethod
+    def from_json(cls, data: List[Dict[str, Any]]) -> "TemplateTable":
+        return cls([
+            (tuple(t["keys"]), tuple(tuple(_freeze_loaded(v) for v in r) for r in t["rows"]))
+            for t in data
+        ])
+
+
+def _dump(v: Any) -> Any:
+    # Scalars keep their JSON type in the file, so only dicts/lists need the tagged form there.
+    thawed = _thaw(v)
+    return thawed if isinstance(thawed, (bool, int, float)) else v
+
+
+def _freeze_loaded(v: Any) -> Any:
+    # JSON turns the ("__json__", ...) tuples into lists.
+    if isinstance(v, list):
+        return tuple(v)
+    return _freeze(v)
+
+
+def encode_entries(entries: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], TemplateTable]:
+    """Replace `forms` with `forms_paradigm` wherever the forms can be templated."""
+    factored = [factor(e.get("forms") or []) if isinstance(e.get("forms"), list) else None for e in entries]
+
+    # Number templates by use so the common ones get small ids.
+    usage = Counter(f[1] for f in factored if f is not None)
+    table = TemplateTable([t for t, _ in usage.most_common()])
+
+    out = []
+    for e, f in zip(entries, factored):
+        if f is None:
+            out.append(e)
+            continue
+        stem, template, exceptions = f
+        packed = {}
+        for k, v in e.items():
+            if k == "forms":
+                packed["forms_paradigm"] = {"stem": stem, "template": table.ids[template], "exceptions": exceptions}
+            else:
+                packed[k] = v
+        out.append(packed)
+    return out, table
+
+
+def decode_entry(entry: Dict[str, Any], table: TemplateTable) -> Dict[str, Any]:
+    fp = entry.get("forms_paradigm")
+    if not isinstance(fp, dict):
+        return entry
+    out = {}
+    for k, v in entry.items():
+        if k == "forms_paradigm":
+            out["forms"] = expand(fp["stem"], table.templates[fp["template"]], fp.get("exceptions") or [])
+        else:
+            out[k] = v
+    return out
+
+
+def templates_path(packed_jsonl: Path) -> Path:
+    name = packed_jsonl.name
+    for suffix in (".jsonl", ".json"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return packed_jsonl.with_name(name + ".paradigms.json")
+
+
+def stats(paths: List[Path]) -> None:
+    print(f"{'file':<12} {'form rows':>10} {'templates':>10} {'exceptions':>10} {'forms bytes':>12} {'packed':>10} {'ratio':>6}")
+    for p in paths:
+        entries = read_jsonl(p)
+        packed, table = encode_entries(entries)
+        for e, pe in zip(entries, packed):
+            # json.dumps, not ==: it sees key order and bool/int/float differences.
+            if json.dumps(decode_entry(pe, table), ensure_ascii=False) != json.dumps(e, ensure_ascii=False):
+                raise SystemExit(f"{p}: round-trip mismatch for {e.get('vocab_item', {}).get('base_form')!r}")
+        rows = sum(len(e.get("forms") or []) for e in entries)
+        exc = sum(len(pe["forms_paradigm"]["exceptions"]) for pe in packed if "forms_paradigm" in pe)
+        before = sum(len(json.dumps(e.get("forms") or [], ensure_ascii=False).encode("utf-8")) for e in entries)
+        after = sum(
+            len(json.dumps(pe.get("forms_paradigm", pe.get("forms")), ensure_ascii=False).encode("utf-8"))
+            for pe in packed
+        ) + len(json.dumps(table.to_json(), ensure_ascii=False).encode("utf-8"))
+        print(f"{p.name:<12} {rows:>10} {len(table.templates):>10} {exc:>10} {before:>12} {after:>10} {before / max(1, after):>5.1f}x")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Factor vocab forms into stem + shared paradigm templates.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    enc = sub.add_parser("encode", help="JSONL -> packed JSONL + <name>.paradigms.json")
+    enc.add_argument("input")
+    enc.add_argument("output")
+    dec = sub.add_parser("decode", help="packed JSONL (+ its .paradigms.json) -> JSONL")
+    dec.add_argument("input")
+    dec.add_argument("output")
+    st = sub.add_parser("stats", help="Row/byte savings per level (also checks the round trip)")
+    st.add_argument("inputs", nargs="+")
+    args = ap.parse_args()
+
+    if args.cmd == "encode":
+        packed, table = encode_entries(read_jsonl(Path(args.input)))
+        out = Path(args.output)
+        write_jsonl(out, packed)
+        templates_path(out).write_text(json.dumps(table.to_json(), ensure_ascii=False), encoding="utf-8")
+        print(f"[DONE] Wrote {out} and {templates_path(out)} ({len(table.templates)} templates)")
+    elif args.cmd == "decode":
+        src = Path(args.input)
+        table = TemplateTable.from_json(json.loads(templates_path(src).read_text(encoding="utf-8")))
+        write_jsonl(Path(args.output), [decode_entry(e, table) for e in read_jsonl(src)])
+        print(f"[DONE] Wrote {args.output}")
+    elif args.cmd == "stats":
+        stats([Path(p) for p in args.inputs])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,18 +8,26 @@ import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import quote
 
 import requests
 from bs4 import BeautifulSoup
 
+from example_check import all_use_lemma, lemma_checker
+from fingerprint import content_hash, forms_fingerprint, matches, strip_stress
+from jsonl_io import JsonlWriter, dumps, iter_jsonl
+from llm_cascade import ModelCascade, has_cyrillic
+from llm_usage import UsageLog, api_stats
+
 try:
     import pymorphy2
 except Exception:  # pragma: no cover
     pymorphy2 = None
 
-STRESS_RE = re.compile(r"\u0301")  # combining acute accent
+# Bump when llm_enrich()'s prompt or the way its output is merged changes.
+TRANSFORM_PROMPT_VERSION = "1"
 
 # ----------------------------
 # Helpers
@@ -28,9 +36,6 @@ STRESS_RE = re.compile(r"\u0301")  # combining acute accent
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
-def strip_stress(text: str) -> str:
-    return STRESS_RE.sub("", text)
-
 def norm_ws(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip())
 
@@ -52,10 +57,6 @@ class WikiSense:
 WIKTIONARY_API = "https://en.wiktionary.org/w/api.php"
 USER_AGENT = "HermesLangPackBot/0.2"
 
-# Global throttle for Wikimedia API requests (shared across threads)
-_wiki_lock = threading.Lock()
-_wiki_last_request_at = 0.0
-
 _thread_local = threading.local()
 
 def thread_session() -> requests.Session:
@@ -66,26 +67,114 @@ def thread_session() -> requests.Session:
         setattr(_thread_local, "session", sess)
     return sess
 
-def _wiki_throttle(min_interval_s: float) -> None:
-    global _wiki_last_request_at
-    if min_interval_s <= 0:
-        return
-    with _wiki_lock:
-        now = time.time()
-        wait = (_wiki_last_request_at + min_interval_s) - now
-        if wait > 0:
-            time.sleep(wait)
-        _wiki_last_request_at = time.time()
+class WikiThrottled(RuntimeError):
+    """Server asked us to slow down (429/503 or a maxlag error)."""
+
+    def __init__(self, message: str, retry_after_s: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except Exception:
+        return None
+
+class WikiRateLimiter:
+    """
+    Global limiter for Wikimedia API requests (shared across threads).
+
+    AIMD: the request rate grows additively after fast successes and halves on
+    throttling responses or slow replies. Retry-After pauses every thread until
+    the server says it's OK to continue. With adaptive=False this is the old
+    fixed min-interval throttle.
+    """
+
+    def __init__(
+        self,
+        min_interval_s: float,
+        adaptive: bool = True,
+        min_rate: float = 0.5,
+        max_rate: float = 20.0,
+        increase: float = 0.25,
+        decrease: float = 0.5,
+        slow_latency_s: float = 2.0,
+    ):
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_latency_s = slow_latency_s
+        self.rate = (1.0 / min_interval_s) if min_interval_s > 0 else max_rate
+        self._lock = threading.Lock()
+        self._last_request_at = 0.0
+        self._blocked_until = 0.0
+        self.stats = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0, "retry_after_waits": 0, "latency_s": 0.0}
+
+    def acquire(self) -> None:
+        # Reserve the next slot under the lock, then sleep outside it so
+        # feedback from in-flight requests isn't blocked behind waiters.
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._blocked_until, self._last_request_at + 1.0 / self.rate)
+            self._last_request_at = slot
+            self.stats["requests"] += 1
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self, latency_s: float) -> None:
+        with self._lock:
+            self.stats["ok"] += 1
+            self.stats["latency_s"] += latency_s
+            if not self.adaptive:
+                return
+            if latency_s > self.slow_latency_s:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after_s: Optional[float]) -> None:
+        with self._lock:
+            self.stats["throttled"] += 1
+            if retry_after_s:
+                self.stats["retry_after_waits"] += 1
+                self._blocked_until = max(self._blocked_until, time.time() + retry_after_s)
+            if self.adaptive:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def on_error(self) -> None:
+        with self._lock:
+            self.stats["errors"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.stats)
+            out["effective_rate"] = round(self.rate, 3)
+            out["avg_latency_s"] = round(out["latency_s"] / out["ok"], 3) if out["ok"] else None
+            out["latency_s"] = round(out["latency_s"], 3)
+            return out
 
 def fetch_wiktionary_html_via_api(
     session: requests.Session,
     title: str,
+    limiter: WikiRateLimiter,
     timeout_s: int = 25,
     retries: int = 3,
     backoff_s: float = 0.8,
-    min_interval_s: float = 0.15,
-) -> str:
-    """Fetch *parsed content HTML only* via MediaWiki API (faster than full page HTML)."""
+    maxlag_s: int = 5,
+) -> Tuple[str, Optional[int]]:
+    """
+    Fetch *parsed content HTML only* via MediaWiki API (faster than full page HTML).
+    Returns (html, revid).
+    """
     params = {
         "action": "parse",
         "format": "json",
@@ -94,20 +183,28 @@ def fetch_wiktionary_html_via_api(
         "prop": "text|revid",
         "redirects": 1,
     }
+    if maxlag_s > 0:
+        params["maxlag"] = maxlag_s
 
     last_err = None
     for attempt in range(retries + 1):
         try:
-            _wiki_throttle(min_interval_s)
+            limiter.acquire()
+            started = time.time()
             resp = session.get(
                 WIKTIONARY_API,
                 params=params,
                 timeout=timeout_s,
                 headers={"User-Agent": USER_AGENT},
             )
+            retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+            if resp.status_code in (429, 503):
+                raise WikiThrottled(f"HTTP {resp.status_code}", retry_after)
             resp.raise_for_status()
             data = resp.json()
             if "error" in data:
+                if data["error"].get("code") == "maxlag":
+                    raise WikiThrottled("maxlag", retry_after or float(maxlag_s))
                 raise RuntimeError(data["error"].get("info") or "Wiktionary API error")
             parse = data.get("parse")
             if not parse or not isinstance(parse, dict):
@@ -115,15 +212,107 @@ def fetch_wiktionary_html_via_api(
             html = parse.get("text")
             if not html:
                 raise RuntimeError("Empty Wiktionary parse text")
-            return html
+            limiter.on_success(time.time() - started)
+            return html, parse.get("revid")
+        except WikiThrottled as e:
+            last_err = e
+            limiter.on_throttle(e.retry_after_s)
+            if attempt >= retries:
+                break
+            if not e.retry_after_s:
+                time.sleep(backoff_s * (2 ** attempt))
         except Exception as e:
             last_err = e
+            limiter.on_error()
             if attempt >= retries:
                 break
             time.sleep(backoff_s * (2 ** attempt))
 
     raise last_err  # type: ignore[misc]
 
+def fetch_latest_revids(
+    session: requests.Session,
+    titles: List[str],
+    limiter: WikiRateLimiter,
+    timeout_s: int = 25,
+    maxlag_s: int = 5,
+    batch_size: int = 50,
+    retries: int = 3,
+    backoff_s: float = 0.8,
+) -> Dict[str, Optional[int]]:
+    """
+    Latest revision id per title, 50 titles per API request. Throttled or
+    failed batches are retried like page fetches. Missing pages map to None;
+    titles whose batch still failed are left out (callers treat them as stale).
+    """
+    out: Dict[str, Optional[int]] = {}
+    failed_batches = 0
+    for i in range(0, len(titles), batch_size):
+        batch = titles[i : i + batch_size]
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "revisions",
+            "rvprop": "ids",
+            "titles": "|".join(batch),
+            "redirects": 1,
+        }
+        if maxlag_s > 0:
+            params["maxlag"] = maxlag_s
+        query: Optional[Dict[str, Any]] = None
+        for attempt in range(retries + 1):
+            try:
+                limiter.acquire()
+                started = time.time()
+                resp = session.get(WIKTIONARY_API, params=params, timeout=timeout_s, headers={"User-Agent": USER_AGENT})
+                retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                if resp.status_code in (429, 503):
+                    raise WikiThrottled(f"HTTP {resp.status_code}", retry_after)
+                resp.raise_for_status()
+                data = resp.json()
+                if "error" in data:
+                    if data["error"].get("code") == "maxlag":
+                        raise WikiThrottled("maxlag", retry_after or float(maxlag_s))
+                    raise RuntimeError(data["error"].get("info") or "Wiktionary API error")
+                query = data.get("query") or {}
+                limiter.on_success(time.time() - started)
+                break
+            except WikiThrottled as e:
+                limiter.on_throttle(e.retry_after_s)
+                if attempt >= retries:
+                    break
+                if not e.retry_after_s:
+                    time.sleep(backoff_s * (2 ** attempt))
+            except Exception:
+                limiter.on_error()
+                if attempt >= retries:
+                    break
+                time.sleep(backoff_s * (2 ** attempt))
+        if query is None:
+            failed_batches += 1
+            continue
+
+        # Follow normalization/redirect hops back to the titles we asked for.
+        hops: Dict[str, str] = {}
+        for step in (query.get("normalized") or []) + (query.get("redirects") or []):
+            hops[step.get("from")] = step.get("to")
+        by_title: Dict[str, Optional[int]] = {}
+        for page in query.get("pages") or []:
+            revs = page.get("revisions") or []
+            by_title[page.get("title")] = revs[0].get("revid") if revs and not page.get("missing") else None
+        for title in batch:
+            resolved = title
+            for _ in range(3):
+                if resolved not in hops:
+                    break
+                resolved = hops[resolved]
+            if resolved in by_title:
+                out[title] = by_title[resolved]
+    if failed_batches:
+        print(f"[WIKI] revision check failed for {failed_batches} batch(es) after retries; their entries will be recomputed")
+    return out
+
 def extract_russian_section_senses(html: str) -> Tuple[Optional[str], List[WikiSense]]:
     """
     Extract senses for Russian section, best-effort:
@@ -418,15 +607,32 @@ def dedupe_forms(forms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 # Ollama helpers
 # ----------------------------
 
-def ollama_chat(model: str, messages: List[Dict[str, str]], timeout_s: int = 90) -> str:
+# llm_enrich() always asks for the whole entry; the usage log's "field".
+LLM_ENRICH_FIELDS = "usage_notes+grammar_hint+tags+examples"
+
+def ollama_chat(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout_s: int = 90,
+    usage: Optional[UsageLog] = None,
+    field: str = "",
+) -> str:
     """
-    Calls local Ollama chat endpoint.
+    Calls local Ollama chat endpoint. The response's token/timing counters go to `usage`.
     """
     url = "http://localhost:11434/api/chat"
     payload = {"model": model, "messages": messages, "stream": False}
-    resp = requests.post(url, json=payload, timeout=timeout_s)
-    resp.raise_for_status()
-    data = resp.json()
+    t0 = time.perf_counter()
+    try:
+        resp = requests.post(url, json=payload, timeout=timeout_s)
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception:
+        if usage is not None:
+            usage.record(model, field, {}, time.perf_counter() - t0, ok=False)
+        raise
+    if usage is not None:
+        usage.record(model, field, api_stats(data), time.perf_counter() - t0)
     return data["message"]["content"]
 
 def llm_enrich(
@@ -437,6 +643,7 @@ def llm_enrich(
     wik_senses: List[WikiSense],
     seed_translations: List[str],
     seed_extra_ru: Optional[str] = None,
+    usage: Optional[UsageLog] = None,
 ) -> Dict[str, Any]:
     """
     Ask LLM for:
@@ -494,7 +701,7 @@ def llm_enrich(
     text = ollama_chat(model, messages=[
         {"role": "system", "content": system},
         {"role": "user", "content": json.dumps(user, ensure_ascii=False)},
-    ])
+    ], usage=usage, field=LLM_ENRICH_FIELDS)
 
     # Best-effort JSON parse
     try:
@@ -503,24 +710,42 @@ def llm_enrich(
         # salvage: find first {...} block
         m = re.search(r"\{.*\}", text, flags=re.S)
         if not m:
-            return {}
-        try:
-            return json.loads(m.group(0))
-        except Exception:
-            return {}
+            raise ValueError("LLM output contained no JSON object")
+        return json.loads(m.group(0))
+
+def check_enrichment(
+    enrich: Any,
+    wik_senses: List[WikiSense],
+    uses_lemma: Optional[Callable[[str], bool]] = None,
+) -> Optional[str]:
+    """
+    Cheap quality gate for a --small-model answer: every Wiktionary sense sent
+    (up to 6) needs a Russian example with an English translation, and (when
+    the entry's forms allow checking) every example must use the word itself.
+    """
+    if not isinstance(enrich, dict):
+        return "not_object"
+    if enrich.get("tags") is not None and not isinstance(enrich.get("tags"), list):
+        return "tags_format"
+    senses = enrich.get("senses") if isinstance(enrich.get("senses"), list) else []
+    by_index = {x.get("sense_index"): x for x in senses if isinstance(x, dict)}
+    for i in range(1, min(len(wik_senses), 6) + 1):
+        exs = (by_index.get(i) or {}).get("examples") or []
+        if not any(
+            isinstance(ex, dict) and has_cyrillic(norm_ws(ex.get("ru"))) and norm_ws(ex.get("en"))
+            and not has_cyrillic(norm_ws(ex.get("en")))
+            for ex in exs
+        ):
+            return "missing_examples"
+        texts = [norm_ws(ex.get("ru")) for ex in exs if isinstance(ex, dict)]
+        if not all_use_lemma((t for t in texts if t), uses_lemma):
+            return "example_missing_lemma"
+    return None
 
 # ----------------------------
 # Main pipeline
 # ----------------------------
 
-def load_jsonl(path: str):
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            yield json.loads(line)
-
 def save_progress(path: str, done_keys: set):
     out_dir = os.path.dirname(path)
     if out_dir:
@@ -538,27 +763,158 @@ def load_progress(path: str) -> set:
     return set(data.get("done_keys", []))
 
 
+# ----------------------------
+# Dead-letter ledger
+# ----------------------------
+
+class RowError(Exception):
+    """A row failure tagged with the pipeline stage it happened in."""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+class DeadLetterLedger:
+    """
+    Append-only JSONL of failed rows, one record per failure:
+    {"key", "stage", "error", "attempts", "failed_at", "next_retry_at", "row"}
+
+    The latest record per key wins. `compact()` rewrites the file with only the
+    keys that are still failing.
+    """
+
+    def __init__(self, path: str, backoff_s: float):
+        self.path = path
+        self.backoff_s = backoff_s
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            for rec in iter_jsonl(path):
+                if isinstance(rec, dict) and rec.get("key"):
+                    self.records[rec["key"]] = rec
+
+    def record(self, key: str, row: Dict[str, Any], stage: str, error: str) -> Dict[str, Any]:
+        with self._lock:
+            prev = self.records.get(key)
+            attempts = (prev.get("attempts") or 0) + 1 if prev else 1
+            now = time.time()
+            rec = {
+                "key": key,
+                "stage": stage,
+                "error": error,
+                "attempts": attempts,
+                "failed_at": now_iso(),
+                "next_retry_at": now + self.backoff_s * (2 ** (attempts - 1)),
+                "row": row,
+            }
+            self.records[key] = rec
+            out_dir = os.path.dirname(self.path)
+            if out_dir:
+                os.makedirs(out_dir, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(dumps(rec) + "\n")
+            return rec
+
+    def resolve(self, key: str) -> None:
+        with self._lock:
+            self.records.pop(key, None)
+
+    def retryable(self, max_attempts: int) -> Tuple[List[Dict[str, Any]], int, int]:
+        """Returns (rows due for retry, count still backing off, count exhausted)."""
+        now = time.time()
+        due: List[Dict[str, Any]] = []
+        waiting = 0
+        exhausted = 0
+        for rec in self.records.values():
+            if max_attempts > 0 and (rec.get("attempts") or 0) >= max_attempts:
+                exhausted += 1
+            elif (rec.get("next_retry_at") or 0) > now:
+                waiting += 1
+            else:
+                due.append(rec["row"])
+        return due, waiting, exhausted
+
+    def compact(self) -> None:
+        with self._lock:
+            if not self.records and not os.path.exists(self.path):
+                return
+            tmp = self.path + ".tmp"
+            with JsonlWriter(tmp) as w:
+                w.write_many(self.records.values())
+            os.replace(tmp, self.path)
+
+
+def load_details(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    OpenRussian details sidecar, keyed by the stressed word. The stress-stripped
+    form is a key too, but only when a single stressed word has it: homographs
+    (за́мок / замо́к) are matched on their stress or not at all.
+    """
+    by_word: Dict[str, Dict[str, Any]] = {}
+    by_plain: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for rec in iter_jsonl(path, skip_invalid=True):
+        word = (rec.get("word") or "").strip()
+        if word:
+            by_word.setdefault(word, rec)
+            by_plain.setdefault(strip_stress(word), {}).setdefault(word, rec)
+    for plain, recs in by_plain.items():
+        if len(recs) == 1 and plain not in by_word:
+            by_word[plain] = next(iter(recs.values()))
+    return by_word
+
+
+def details_for(details: Dict[str, Dict[str, Any]], base_form: str) -> Optional[Dict[str, Any]]:
+    rec = details.get(base_form)
+    if rec is not None:
+        return rec
+    plain = strip_stress(base_form)
+    rec = details.get(plain)
+    # A stressed word never takes a record stressed differently (замо́к is not за́мок).
+    if rec is not None and base_form != plain and (rec.get("word") or "").strip() != plain:
+        return None
+    return rec
+
+
+def details_hash(rec: Dict[str, Any]) -> str:
+    return content_hash({k: v for k, v in rec.items() if k != "fetched_at"})
+
+
+def transform_model_for(no_llm: bool, cascade: ModelCascade, use_details: bool) -> str:
+    if use_details:
+        return "details"
+    return "none" if no_llm else cascade.label
+
+
 def _process_one_row(
     row: Dict[str, Any],
     language_id: int,
-    ollama_model: str,
+    cascade: ModelCascade,
     no_llm: bool,
     wiki_timeout_s: int,
     wiki_retries: int,
     wiki_backoff_s: float,
-    wiki_min_interval_s: float,
+    wiki_limiter: WikiRateLimiter,
+    wiki_maxlag_s: int,
     llm_semaphore: threading.Semaphore,
+    details: Optional[Dict[str, Any]] = None,
+    usage: Optional[UsageLog] = None,
 ) -> Tuple[str, Dict[str, Any]]:
-    """Build one Hermes JSON object for a source row. Raises on fatal errors."""
+    """
+    Build one Hermes JSON object for a source row. Raises on fatal errors.
+
+    With an OpenRussian details record (crawl_openrussian_details.py) that has
+    translations, senses/examples/POS come from it and Wiktionary + LLM are skipped.
+    """
 
     # Expected input JSONL (ros-edu): {"level":"A1","word":"а́дрес","translation":"address",...}
     base_form = (row.get("word") or "").strip()  # KEEP STRESS
     if not base_form:
-        raise ValueError("missing word")
+        raise RowError("input", "missing word")
 
     translation_text = (row.get("translation") or "").strip()
     if not translation_text:
-        raise ValueError("missing translation")
+        raise RowError("input", "missing translation")
 
     level = (row.get("level") or "").strip().upper() or None
     seed_extra_ru = (row.get("extra") or "").strip() or None
@@ -578,45 +934,64 @@ def _process_one_row(
 
     created = now_iso()
     lookup_form = strip_stress(base_form)
+    use_details = bool(details and details.get("translations"))
 
     # Fetch Wiktionary content HTML via MediaWiki API (faster + smaller than full page)
     wik_pos = None
     wik_senses: List[WikiSense] = []
-    try:
-        sess = thread_session()
-        html = fetch_wiktionary_html_via_api(
-            sess,
-            title=lookup_form,
-            timeout_s=wiki_timeout_s,
-            retries=wiki_retries,
-            backoff_s=wiki_backoff_s,
-            min_interval_s=wiki_min_interval_s,
-        )
-        wik_pos, wik_senses = extract_russian_section_senses(html)
-    except Exception:
-        wik_pos, wik_senses = None, []
+    wiki_revid: Optional[int] = None
+    if not use_details:
+        try:
+            sess = thread_session()
+            html, wiki_revid = fetch_wiktionary_html_via_api(
+                sess,
+                title=lookup_form,
+                limiter=wiki_limiter,
+                timeout_s=wiki_timeout_s,
+                retries=wiki_retries,
+                backoff_s=wiki_backoff_s,
+                maxlag_s=wiki_maxlag_s,
+            )
+            wik_pos, wik_senses = extract_russian_section_senses(html)
+        except Exception:
+            wik_pos, wik_senses, wiki_revid = None, [], None
 
     # pymorphy2 forms + POS guess
-    _, morph_pos, forms = generate_forms(base_form)
+    try:
+        _, morph_pos, forms = generate_forms(base_form)
+    except Exception as e:
+        raise RowError("forms", f"{type(e).__name__}: {e}") from e
 
-    # Choose POS priority: wiktionary > morph
-    pos = (wik_pos or morph_pos or "other")
+    # Choose POS priority: details > wiktionary > morph
+    pos = ((details or {}).get("part_of_speech") if use_details else None) or wik_pos or morph_pos or "other"
     if pos == "proper_noun":
         pos = "proper_noun"
 
+    # LLM examples must use the word; None when the forms are too sparse to tell.
+    uses_lemma = lemma_checker({"vocab_item": {"base_form": base_form, "part_of_speech": pos}, "forms": forms})
+
     # LLM enrichment (bounded concurrency via semaphore)
     enrich: Dict[str, Any] = {}
-    if not no_llm:
+    if not no_llm and not use_details:
         with llm_semaphore:
-            enrich = llm_enrich(
-                model=ollama_model,
-                base_form_stressed=base_form,
-                lookup_form=lookup_form,
-                pos=pos,
-                wik_senses=wik_senses,
-                seed_translations=translations,
-                seed_extra_ru=seed_extra_ru,
-            ) or {}
+            try:
+                enrich, _ = cascade.run(
+                    lambda model: llm_enrich(
+                        model=model,
+                        base_form_stressed=base_form,
+                        lookup_form=lookup_form,
+                        pos=pos,
+                        wik_senses=wik_senses,
+                        seed_translations=translations,
+                        seed_extra_ru=seed_extra_ru,
+                        usage=usage,
+                    ) or {},
+                    lambda e: check_enrichment(e, wik_senses, uses_lemma),
+                )
+            except ValueError as e:
+                raise RowError("llm_parse", str(e)) from e
+            except Exception as e:
+                raise RowError("llm", f"{type(e).__name__}: {e}") from e
 
     item_usage = norm_ws(enrich.get("usage_notes")) if isinstance(enrich, dict) else None
     item_ghint = norm_ws(enrich.get("grammar_hint")) if isinstance(enrich, dict) else None
@@ -630,7 +1005,22 @@ def _process_one_row(
 
     # Build senses (prefer wiktionary definitions; fallback to seed translations)
     senses_out = []
-    if wik_senses:
+    if use_details:
+        detail_examples = []
+        for ex in (details.get("examples") or [])[:2]:
+            ru = norm_ws((ex or {}).get("ru"))
+            if ru:
+                detail_examples.append({"example_text": ru, "translation_text": norm_ws(ex.get("en")) or None})
+        for i, tl in enumerate(details["translations"][:8], start=1):
+            senses_out.append({
+                "sense_index": i,
+                "definition": tl,
+                "translation": tl,
+                "usage_notes": None,
+                "grammar_hint": item_ghint,
+                "examples": detail_examples if i == 1 else [],
+            })
+    elif wik_senses:
         for i, s in enumerate(wik_senses[:8], start=1):
             s_usage = None
             s_hint = None
@@ -642,11 +1032,14 @@ def _process_one_row(
                     s_usage = norm_ws(match.get("usage_notes")) or None
                     s_hint = norm_ws(match.get("grammar_hint")) or None
                     exs = match.get("examples") or []
-                    for ex in exs[:2]:
+                    for ex in exs:
                         ru = norm_ws((ex or {}).get("ru"))
                         en = norm_ws((ex or {}).get("en"))
-                        if ru and en:
+                        # Examples that miss the word are dropped; a sense left empty
+                        # gets fresh ones from llmenrich.py, which only fills gaps.
+                        if ru and en and (uses_lemma is None or uses_lemma(ru)):
                             s_examples.append({"example_text": ru, "translation_text": en})
+                    s_examples = s_examples[:2]
 
             if not s_examples and s.examples_ru:
                 for ru in s.examples_ru[:2]:
@@ -680,6 +1073,13 @@ def _process_one_row(
             "seed_level": level,
             "seed_translation": translation_text,
             "seed_extra_ru": seed_extra_ru,
+            "fingerprint": {
+                "seed": content_hash(row),
+                "wiki_revid": wiki_revid,
+                "forms": forms_fingerprint(),
+                "transform_model": transform_model_for(no_llm, cascade, use_details),
+                "transform_prompt": TRANSFORM_PROMPT_VERSION,
+            },
         },
         "vocab_item": {
             "language_id": language_id,
@@ -696,6 +1096,9 @@ def _process_one_row(
         "forms": forms,
         "tags": [{"name": t, "description": None} for t in tag_names],
     }
+    if use_details:
+        hermes["source"]["details_url"] = details.get("url")
+        hermes["source"]["fingerprint"]["details"] = details_hash(details)
 
     return key, hermes
 
@@ -706,6 +1109,11 @@ def main():
     ap.add_argument("--progress", default="progress.json", help="Progress file")
     ap.add_argument("--language-id", type=int, default=1)
     ap.add_argument("--ollama-model", default="gemma3:4b")
+    ap.add_argument(
+        "--small-model",
+        default="",
+        help="Try this (faster) model first; rows whose answer fails validation go to --ollama-model",
+    )
     ap.add_argument("--sleep", type=float, default=0.0, help="Extra sleep after each completed item")
     ap.add_argument("--no-llm", action="store_true")
     ap.add_argument("--workers", type=int, default=8, help="Parallel worker threads (network-bound)")
@@ -714,86 +1122,227 @@ def main():
     ap.add_argument("--wiki-timeout", type=int, default=25)
     ap.add_argument("--wiki-retries", type=int, default=2)
     ap.add_argument("--wiki-backoff", type=float, default=0.8)
-    ap.add_argument("--wiki-min-interval", type=float, default=0.12, help="Min seconds between Wikimedia API requests")
+    ap.add_argument("--wiki-min-interval", type=float, default=0.12, help="Starting seconds between Wikimedia API requests")
+    ap.add_argument("--wiki-fixed-rate", action="store_true", help="Keep --wiki-min-interval fixed (disable AIMD rate control)")
+    ap.add_argument("--wiki-max-rate", type=float, default=20.0, help="Upper bound on Wikimedia requests/sec")
+    ap.add_argument("--wiki-min-rate", type=float, default=0.5, help="Lower bound on Wikimedia requests/sec")
+    ap.add_argument("--wiki-maxlag", type=int, default=5, help="MediaWiki maxlag parameter in seconds (0 = don't send)")
+    ap.add_argument("--dead-letter", default="", help="Failed-row ledger JSONL (default: <out>.failed.jsonl)")
+    ap.add_argument("--retry-failed", action="store_true", help="Reprocess only rows from the dead-letter ledger")
+    ap.add_argument("--max-attempts", type=int, default=5, help="Give up on a row after N failed attempts (0 = never)")
+    ap.add_argument("--retry-backoff", type=float, default=60.0, help="Base seconds before a failed row is retried (doubles per attempt)")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Rewrite --out, copying through previous entries whose source fingerprint still matches",
+    )
+    ap.add_argument("--reuse", nargs="*", default=None, help="Previous outputs to reuse entries from (default: --out)")
+    ap.add_argument("--write-index", action="store_true", help="Also write the <out>.idx offset sidecar (jsonl_index.py)")
+    ap.add_argument(
+        "--details",
+        default="",
+        help="OpenRussian details sidecar (crawl_openrussian_details.py); matched words skip Wiktionary and the LLM",
+    )
+    ap.add_argument(
+        "--check-wiki-revisions",
+        action="store_true",
+        help="With --incremental, also recompute entries whose Wiktionary page has a newer revision",
+    )
+    ap.add_argument("--usage-log", default="", help="Append per-call Ollama token/timing records to this JSONL (llm_usage.py)")
     args = ap.parse_args()
 
+    if args.incremental and args.retry_failed:
+        ap.error("--incremental and --retry-failed are separate passes; run them one after the other")
+
     done = load_progress(args.progress)
+    ledger = DeadLetterLedger(args.dead_letter or f"{args.out}.failed.jsonl", backoff_s=args.retry_backoff)
+    for k in list(ledger.records):
+        if k in done:
+            ledger.resolve(k)
+    failed = 0
 
     out_dir = os.path.dirname(args.out)
     if out_dir:
         os.makedirs(out_dir, exist_ok=True)
 
     llm_sem = threading.Semaphore(max(1, args.llm_workers))
+    wiki_limiter = WikiRateLimiter(
+        args.wiki_min_interval,
+        adaptive=not args.wiki_fixed_rate,
+        min_rate=args.wiki_min_rate,
+        max_rate=args.wiki_max_rate,
+    )
 
-    out_f = open(args.out, "a", encoding="utf-8")
+    # Incremental: index previous entries, then rewrite --out from scratch into
+    # <out>.tmp, which replaces --out only once the run completes.
+    previous: Dict[str, Dict[str, Any]] = {}
+    revids: Optional[Dict[str, Optional[int]]] = None
+    reused = 0
+    if args.incremental:
+        for path in args.reuse if args.reuse is not None else [args.out]:
+            if os.path.exists(path):
+                for entry in iter_jsonl(path):
+                    base = ((entry.get("vocab_item") or {}).get("base_form") or "").strip()
+                    if base:
+                        previous[stable_key(args.language_id, base)] = entry
+        done = set()
+        if args.check_wiki_revisions and previous:
+            titles = sorted({(e.get("vocab_item") or {}).get("lookup_form") or "" for e in previous.values()} - {""})
+            revids = fetch_latest_revids(
+                thread_session(), titles, wiki_limiter, timeout_s=args.wiki_timeout, maxlag_s=args.wiki_maxlag,
+                retries=args.wiki_retries, backoff_s=args.wiki_backoff,
+            )
+        print(f"[INCREMENTAL] {len(previous)} previous entries indexed")
+
+    cascade = ModelCascade.from_args(args.ollama_model, args.small_model)
+    usage_log = UsageLog("transform", args.usage_log)
+    details: Dict[str, Dict[str, Any]] = load_details(args.details) if args.details else {}
+    if args.details:
+        print(f"[DETAILS] {len(details)} keys from {args.details}")
+
+    def row_details(r: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rec = details_for(details, (r.get("word") or "").strip()) if details else None
+        return rec if rec and rec.get("translations") else None
+
+    def still_current(entry: Dict[str, Any], r: Dict[str, Any]) -> bool:
+        d = row_details(r)
+        expected = {
+            "seed": content_hash(r),
+            "forms": forms_fingerprint(),
+            "transform_model": transform_model_for(args.no_llm, cascade, d is not None),
+            "transform_prompt": TRANSFORM_PROMPT_VERSION,
+            "details": details_hash(d) if d is not None else None,
+        }
+        lookup = (entry.get("vocab_item") or {}).get("lookup_form")
+        if revids is not None and lookup:
+            if lookup not in revids:
+                return False  # revision couldn't be checked; don't assume it's unchanged
+            expected["wiki_revid"] = revids[lookup]
+        return matches(entry, **expected)
+
+    write_path = args.out + ".tmp" if args.incremental else args.out
+    out_f = JsonlWriter(write_path, "w" if args.incremental else "a", index=args.write_index and not args.incremental)
+    completed = False
     try:
         def should_skip(r: Dict[str, Any]) -> Optional[str]:
             base_form = (r.get("word") or "").strip()
             if not base_form:
-                return ""
+                # Still submitted: _process_one_row raises RowError("input") and the
+                # row lands in the dead-letter ledger under this content key.
+                return f"noword:{content_hash(r)}"
             return stable_key(args.language_id, base_form)
 
         with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
             inflight = {}
 
-            def submit(r: Dict[str, Any]) -> None:
+            def submit(r: Dict[str, Any]) -> bool:
+                nonlocal reused
                 k = should_skip(r)
                 if not k or k in done:
-                    return
+                    return False
+                prev = previous.get(k)
+                if prev is not None and still_current(prev, r):
+                    out_f.write(prev)
+                    done.add(k)
+                    reused += 1
+                    return False
                 fut = ex.submit(
                     _process_one_row,
                     r,
                     args.language_id,
-                    args.ollama_model,
+                    cascade,
                     args.no_llm,
                     args.wiki_timeout,
                     args.wiki_retries,
                     args.wiki_backoff,
-                    args.wiki_min_interval,
+                    wiki_limiter,
+                    args.wiki_maxlag,
                     llm_sem,
+                    row_details(r),
+                    usage_log,
                 )
-                inflight[fut] = k
-
-            rows_iter = load_jsonl(args.input)
+                inflight[fut] = (k, r)
+                return True
+
+            def submit_next() -> bool:
+                # Skipped/reused rows don't occupy a slot; keep pulling until one is queued.
+                for r in rows_iter:
+                    if submit(r):
+                        return True
+                return False
+
+            if args.retry_failed:
+                due, waiting, exhausted = ledger.retryable(args.max_attempts)
+                print(f"[RETRY] {len(due)} rows due, {waiting} backing off, {exhausted} exhausted ({ledger.path})")
+                rows_iter = iter(due)
+            else:
+                rows_iter = iter_jsonl(args.input)
 
             # Prime the queue
             for _ in range(max(1, args.max_inflight)):
-                try:
-                    submit(next(rows_iter))
-                except StopIteration:
+                if not submit_next():
                     break
 
             processed_since_save = 0
             while inflight:
                 # Process one completed future, then submit one more
                 for fut in as_completed(list(inflight.keys()), timeout=None):
-                    inflight.pop(fut, None)
+                    row_key, row = inflight.pop(fut)
                     try:
                         key, hermes = fut.result()
-                    except Exception:
-                        # Skip failures; you can add logging here if you want
+                    except Exception as e:
+                        stage = getattr(e, "stage", "process")
+                        failed += 1
                         key, hermes = None, None  # type: ignore[assignment]
+                        rec = ledger.record(row_key, row, stage, str(e))
+                        prev = previous.get(row_key)
+                        if prev is not None:
+                            # A failed recompute keeps the last good entry in the output, but the
+                            # row stays in the ledger and out of `done` until a recompute succeeds.
+                            out_f.write(prev)
+                        print(f"[FAIL] {row.get('word')} stage={stage} attempt={rec['attempts']}: {e}"
+                              + (" (kept previous entry)" if prev is not None else ""))
 
                     if key and hermes:
-                        out_f.write(json.dumps(hermes, ensure_ascii=False) + "\n")
-                        out_f.flush()
+                        out_f.write(hermes)
                         done.add(key)
+                        ledger.resolve(key)
                         processed_since_save += 1
-                        if processed_since_save >= 50:
+                        if processed_since_save >= 50 and not args.incremental:
+                            # Rows must be on disk before their keys are marked done.
+                            out_f.flush()
                             save_progress(args.progress, done)
                             processed_since_save = 0
                         if args.sleep and args.sleep > 0:
                             time.sleep(args.sleep)
 
-                    try:
-                        submit(next(rows_iter))
-                    except StopIteration:
-                        pass
+                    submit_next()
                     break
 
+        if args.incremental:
+            print(f"[INCREMENTAL] reused {reused} unchanged entries")
+        if failed:
+            print(f"[DONE] {failed} rows failed; see {ledger.path} (rerun with --retry-failed)")
+        completed = True
+
     finally:
-        save_progress(args.progress, done)
         out_f.close()
+        if args.incremental and completed:
+            os.replace(write_path, args.out)
+            if args.write_index:
+                from jsonl_index import build_index
+
+                build_index(args.out)
+        # An interrupted --incremental run leaves --out untouched, so its keys aren't done yet.
+        if completed or not args.incremental:
+            save_progress(args.progress, done)
+        ledger.compact()
+        print(f"[WIKI] {json.dumps(wiki_limiter.snapshot())}")
+        if args.small_model and not args.no_llm:
+            print(cascade.summary())
+        usage_log.close()
+        if not args.no_llm:
+            print(usage_log.summary())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Offline check of parse_detail_page() (crawl_openrussian_details.py), whose
+selectors the transform trusts: a details record with translations replaces
+both the Wiktionary lookup and the LLM for that word.
+
+fixtures/detail_<name>.html pairs with fixtures/detail_<name>.expected.json,
+the exact parse_detail_page() output. The committed detail_synthetic_* pages
+are hand-written after OpenRussian's word-page markup, not saved pages.
+
+  check_detail_parser.py                    # fixtures vs their expected output
+  check_detail_parser.py openrussian_detail_cache/*.html
+      # crawled pages (no expected file): flag pages the selectors get nothing from
+  check_detail_parser.py --update           # (re)write fixtures' expected output
+
+On crawled pages a missing part of speech or no translations means the
+site's markup has moved away from the selectors; fix them and re-run the
+crawler with --refresh (cached pages are reused).
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from crawl_openrussian_details import parse_detail_page
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def compare(label: str, want: Dict[str, Any], got: Dict[str, Any]) -> List[str]:
+    problems = []
+    for key in sorted(set(want) | set(got)):
+        if want.get(key) != got.get(key):
+            problems.append(f"{label}: {key}: {json.dumps(got.get(key), ensure_ascii=False)}"
+                            f" != {json.dumps(want.get(key), ensure_ascii=False)}")
+    return problems
+
+
+def drift(label: str, got: Dict[str, Any]) -> List[str]:
+    missing = [k for k in ("part_of_speech", "translations") if not got.get(k)]
+    return [f"{label}: no {' / '.join(missing)} parsed (selectors may be stale)"] if missing else []
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check parse_detail_page against saved OpenRussian word pages.")
+    ap.add_argument("pages", nargs="*", help=f"HTML pages (default: {FIXTURES_DIR}/detail_*.html)")
+    ap.add_argument("--update", action="store_true", help="Write each page's expected output from the current parser")
+    args = ap.parse_args()
+
+    paths = [Path(p) for p in args.pages] or sorted(FIXTURES_DIR.glob("detail_*.html"))
+    if not paths:
+        raise SystemExit("no pages to check")
+
+    problems: List[str] = []
+    stats = {"examples": 0, "inflections": 0}
+    for path in paths:
+        got = parse_detail_page(path.read_text(encoding="utf-8"))
+        stats["examples"] += len(got["examples"])
+        stats["inflections"] += len(got["inflections"])
+        expected = path.with_name(path.stem + ".expected.json")
+        if args.update:
+            expected.write_text(json.dumps(got, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            print(f"[INFO] {expected.name}: rewritten")
+            continue
+        if not expected.exists():
+            problems += drift(path.name, got)
+            continue
+        problems += compare(path.name, json.loads(expected.read_text(encoding="utf-8")), got)
+
+    for p in problems:
+        print(f"[FAIL] {p}", file=sys.stderr)
+    print(f"[DONE] {len(paths)} page(s) checked, {len(problems)} problem(s) "
+          f"({stats['examples']} examples, {stats['inflections']} inflected forms)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
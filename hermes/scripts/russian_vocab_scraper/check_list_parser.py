@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Offline check of the browserless list-page parser (parse_list_page, used by
+scrape_openrussian_vocab.py --http) against saved pages.
+
+fixtures/list_<name>.html pairs with fixtures/list_<name>.expected.json:
+  {"level": "C1", "page_url": "...", "total": 1493, "rows": [VocabRow, ...]}
+
+The committed list_synthetic_* pages are hand-written after OpenRussian's
+list markup, not saved pages; the _loose one drops <tbody> and the optional
+</p>, </td>, </tr> the way real servers may. Pages saved with --html-dir are
+the real thing: check them with --browser, or copy one in as a fixture and
+generate its expected rows with --browser --update.
+
+  check_list_parser.py                      # fixtures vs their expected rows
+  check_list_parser.py --browser            # also run ROWS_JS on each page in Chromium
+  check_list_parser.py --browser html/*.html
+      # parity on pages saved by --html-dir (named <LEVEL>_<start>.html)
+  check_list_parser.py --browser --update   # regenerate expected rows from ROWS_JS
+
+--browser loads each page with set_content() (no network) and compares what
+ROWS_JS + _rows_from_raw() and the paging span give against parse_list_page().
+"""
+import argparse
+import json
+import re
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from scrape_openrussian_vocab import (
+    ROWS_JS, _get_total_expected, _rows_from_raw, level_page_url, parse_list_page, sync_playwright,
+)
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+CACHE_NAME_RE = re.compile(r"^([A-Z]\d)_(\d+)$")
+
+Result = Tuple[List[Dict[str, Any]], Optional[int]]
+
+
+def page_context(path: Path) -> Tuple[str, str, Optional[Path]]:
+    """(level, page_url, expected path or None) for a fixture or an --html-dir page."""
+    expected = path.with_name(path.stem + ".expected.json")
+    if expected.exists():
+        meta = json.loads(expected.read_text(encoding="utf-8"))
+        return meta["level"], meta["page_url"], expected
+    m = CACHE_NAME_RE.match(path.stem)
+    if not m:
+        raise SystemExit(f"{path}: no {expected.name} and not named <LEVEL>_<start>.html")
+    return m.group(1), level_page_url(m.group(1), int(m.group(2))), None
+
+
+def parsed(html: str, level: str, page_url: str) -> Result:
+    rows, total = parse_list_page(html, level, page_url)
+    return [asdict(r) for r in rows], total
+
+
+def rendered(page, html: str, level: str, page_url: str) -> Result:
+    page.set_content(html)
+    raw = page.eval_on_selector_all("table.wordlist tbody tr", ROWS_JS)
+    return [asdict(r) for r in _rows_from_raw(raw, level, page_url)], _get_total_expected(page)
+
+
+def compare(label: str, want: Result, got: Result) -> List[str]:
+    problems = []
+    if want[1] != got[1]:
+        problems.append(f"{label}: total {got[1]} != {want[1]}")
+    if len(want[0]) != len(got[0]):
+        problems.append(f"{label}: {len(got[0])} rows != {len(want[0])}")
+    for a, b in zip(want[0], got[0]):
+        if a != b:
+            problems.append(f"{label}: rank {a.get('rank')}: {json.dumps(b, ensure_ascii=False)}"
+                            f" != {json.dumps(a, ensure_ascii=False)}")
+            break
+    return problems
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Check parse_list_page against saved OpenRussian list pages.")
+    ap.add_argument("pages", nargs="*", help=f"HTML pages (default: {FIXTURES_DIR}/list_*.html)")
+    ap.add_argument("--browser", action="store_true", help="Also compare with ROWS_JS run in Chromium (needs playwright)")
+    ap.add_argument("--update", action="store_true", help="With --browser: rewrite fixtures' expected rows from ROWS_JS")
+    args = ap.parse_args()
+
+    if args.update and not args.browser:
+        ap.error("--update takes its rows from the browser; add --browser")
+    if args.browser and sync_playwright is None:
+        raise SystemExit("playwright is not installed (pip install playwright && playwright install chromium)")
+
+    paths = [Path(p) for p in args.pages] or sorted(FIXTURES_DIR.glob("list_*.html"))
+    if not paths:
+        raise SystemExit("no pages to check")
+
+    problems: List[str] = []
+    pw = browser = page = None
+    if args.browser:
+        pw = sync_playwright().start()
+        browser = pw.chromium.launch(headless=True)
+        page = browser.new_page()
+    try:
+        for path in paths:
+            level, page_url, expected = page_context(path)
+            html = path.read_text(encoding="utf-8")
+            got = parsed(html, level, page_url)
+            if page is not None:
+                js = rendered(page, html, level, page_url)
+                if args.update and expected is not None:
+                    expected.write_text(json.dumps(
+                        {"level": level, "page_url": page_url, "total": js[1], "rows": js[0]},
+                        ensure_ascii=False, indent=2,
+                    ) + "\n", encoding="utf-8")
+                    print(f"[INFO] {expected.name}: {len(js[0])} rows from ROWS_JS")
+                problems += compare(f"{path.name} (ROWS_JS)", js, got)
+            if expected is not None:
+                meta = json.loads(expected.read_text(encoding="utf-8"))
+                problems += compare(f"{path.name} (expected)", (meta["rows"], meta["total"]), got)
+    finally:
+        if browser is not None:
+            browser.close()
+        if pw is not None:
+            pw.stop()
+
+    for p in problems:
+        print(f"[FAIL] {p}", file=sys.stderr)
+    print(f"[DONE] {len(paths)} page(s) checked, {len(problems)} mismatch(es)"
+          + ("" if args.browser else " (parser vs expected only; --browser adds the ROWS_JS comparison)"))
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
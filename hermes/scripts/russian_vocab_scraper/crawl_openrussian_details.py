@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Crawl OpenRussian word pages (VocabRow.detail_path) into a sidecar JSONL.
+
+One record per word:
+
+  {"word": "удиви́тельный", "level": "C1", "detail_path": "/ru/...", "url": "...",
+   "part_of_speech": "adjective", "translations": ["amazing", "surprising"],
+   "examples": [{"ru": "...", "en": "..."}],
+   "inflections": [{"table": "Declension", "row": "Nominative", "column": "Singular", "form": "..."}],
+   "fetched_at": "..."}
+
+Pages are fetched over plain HTTP with bounded concurrency and cached as HTML
+under --cache-dir, so re-running (or fixing the parser) doesn't refetch.
+Words already in --out are skipped unless --refresh, which rebuilds --out in
+a temp file (keeping records it didn't re-crawl) and swaps it in at the end.
+The transform reads the sidecar with --details.
+
+The selectors below follow openrussian.org's word-page markup; if the site
+changes, adjust them and re-run from the cache. check_detail_parser.py checks
+them against fixtures/detail_*.html, or flags cached pages they get nothing from.
+
+Usage:
+  crawl_openrussian_details.py out/openrussian_vocab_C1.jsonl out/openrussian_vocab_C2.jsonl \
+      --out out/openrussian_details.jsonl --workers 4
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Shared pipeline helpers live next door in hermesify/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "hermesify"))
+import jsonl_io
+from scrape_common import HostRateLimiter, HtmlNode, parse_html
+from scrape_openrussian_vocab import BASE_URL, fetch_page
+
+POS_SELECTOR = "div.overview p"
+TRANSLATIONS_SELECTOR = "div.translations p.tl"
+EXAMPLES_SELECTOR = "ul.sentences li"
+EXAMPLE_RU_SELECTOR = "span.ru"
+EXAMPLE_EN_SELECTOR = "span.tl"
+TABLES_SELECTOR = "table"
+# The word list itself is also a table; inflection tables are the ones inside these.
+INFLECTION_CONTAINERS = ("div.declension", "div.conjugation", "div.table-container", "div.shorts")
+
+POS_WORDS = {
+    "noun": "noun",
+    "verb": "verb",
+    "adjective": "adjective",
+    "adverb": "adverb",
+    "pronoun": "pronoun",
+    "preposition": "preposition",
+    "conjunction": "conjunction",
+    "particle": "particle",
+    "numeral": "numeral",
+    "interjection": "interjection",
+}
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def cache_name(detail_path: str) -> str:
+    return hashlib.sha1(detail_path.encode("utf-8")).hexdigest()[:20]
+
+
+def _table_title(table: HtmlNode) -> str:
+    cap = table.select_one("caption")
+    if cap is not None:
+        return _norm(cap.text())
+    # Otherwise the nearest heading before the table's container.
+    node: Optional[HtmlNode] = table
+    while node is not None and node.parent is not None:
+        siblings = [c for c in node.parent.children if isinstance(c, HtmlNode)]
+        for sib in reversed(siblings[:siblings.index(node)]):
+            if sib.tag in ("h2", "h3", "h4"):
+                return _norm(sib.text())
+        node = node.parent
+    return ""
+
+
+def _parse_table(table: HtmlNode) -> List[Dict[str, str]]:
+    """Flatten a labelled grid: first row = column labels, first cell of each row = row label."""
+    rows = table.select("tr")
+    if len(rows) < 2:
+        return []
+    title = _table_title(table)
+    header = [_norm(c.text()) for c in rows[0].children if isinstance(c, HtmlNode) and c.tag in ("th", "td")]
+    out = []
+    for tr in rows[1:]:
+        cells = [c for c in tr.children if isinstance(c, HtmlNode) and c.tag in ("th", "td")]
+        if len(cells) < 2:
+            continue
+        label = _norm(cells[0].text())
+        for i, cell in enumerate(cells[1:], start=1):
+            form = _norm(cell.text())
+            if form and form not in ("-", "—"):
+                out.append({
+                    "table": title,
+                    "row": label,
+                    "column": header[i] if i < len(header) else "",
+                    "form": form,
+                })
+    return out
+
+
+def parse_detail_page(html: str) -> Dict[str, Any]:
+    doc = parse_html(html)
+
+    pos = None
+    for p in doc.select(POS_SELECTOR):
+        words = _norm(p.text()).lower().replace(",", " ").split()
+        pos = next((POS_WORDS[w] for w in words if w in POS_WORDS), None)
+        if pos:
+            break
+
+    translations = []
+    for p in doc.select(TRANSLATIONS_SELECTOR):
+        t = _norm(p.text())
+        if t and t not in translations:
+            translations.append(t)
+
+    examples = []
+    for li in doc.select(EXAMPLES_SELECTOR):
+        ru = li.select_one(EXAMPLE_RU_SELECTOR)
+        en = li.select_one(EXAMPLE_EN_SELECTOR)
+        if ru is not None and _norm(ru.text()):
+            examples.append({"ru": _norm(ru.text()), "en": _norm(en.text()) if en is not None else None})
+
+    inflections: List[Dict[str, str]] = []
+    seen_tables = set()
+    for container in INFLECTION_CONTAINERS:
+        for box in doc.select(container):
+            for table in box.select(TABLES_SELECTOR):
+                if id(table) in seen_tables:
+                    continue
+                seen_tables.add(id(table))
+                inflections.extend(_parse_table(table))
+
+    return {
+        "part_of_speech": pos,
+        "translations": translations,
+        "examples": examples,
+        "inflections": inflections,
+    }
+
+
+def load_words(paths: List[str]) -> List[Dict[str, Any]]:
+    """Unique (by detail_path) OpenRussian rows that have a detail page."""
+    seen = set()
+    rows = []
+    for path in paths:
+        for r in jsonl_io.iter_jsonl(path):
+            dp = r.get("detail_path")
+            if dp and dp not in seen:
+                seen.add(dp)
+                rows.append(r)
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Crawl OpenRussian word pages into a details sidecar JSONL.")
+    ap.add_argument("inputs", nargs="+", help="openrussian_vocab_<LEVEL>.jsonl exports")
+    ap.add_argument("--out", default="openrussian_details.jsonl")
+    ap.add_argument("--cache-dir", default="openrussian_detail_cache", help="Fetched pages (<sha1>.html)")
+    ap.add_argument("--workers", type=int, default=4, help="Concurrent requests")
+    ap.add_argument("--sleep", type=float, default=0.2, help="Minimum seconds between requests to the host")
+    ap.add_argument("--limit", type=int, default=0, help="Crawl at most N new words (0 = all)")
+    ap.add_argument("--refresh", action="store_true", help="Re-parse every word (cached pages are still used)")
+    args = ap.parse_args()
+
+    out = Path(args.out)
+    cache_dir = Path(args.cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    done = set()
+    if out.exists() and not args.refresh:
+        done = {r.get("detail_path") for r in jsonl_io.iter_jsonl(out, skip_invalid=True)}
+    todo = [r for r in load_words(args.inputs) if r["detail_path"] not in done]
+    if args.limit > 0:
+        todo = todo[:args.limit]
+    print(f"[INFO] {len(todo)} words to crawl ({len(done)} already in {out})")
+
+    limiter = HostRateLimiter(args.sleep)
+
+    def crawl(row: Dict[str, Any]) -> Dict[str, Any]:
+        url = BASE_URL + row["detail_path"]
+        html, final_url, _ = fetch_page(url, limiter, cache_dir, cache_name(row["detail_path"]))
+        rec = {
+            "word": row.get("russian"),
+            "level": row.get("level"),
+            "detail_path": row["detail_path"],
+            "url": final_url,
+        }
+        rec.update(parse_detail_page(html or ""))
+        rec["fetched_at"] = datetime.now(timezone.utc).isoformat()
+        return rec
+
+    t0 = time.perf_counter()
+    ok = failed = empty = 0
+    crawled = set()
+    # --refresh writes next to --out and swaps at the end, so an interrupted run keeps the old sidecar.
+    write_path = out.with_name(out.name + ".tmp") if args.refresh else out
+    with jsonl_io.JsonlWriter(write_path, "w" if args.refresh else "a") as w, ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(crawl, r): r for r in todo}
+        for fut in as_completed(futures):
+            row = futures[fut]
+            try:
+                rec = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] {row.get('russian')}: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            if not rec["translations"]:
+                empty += 1
+            w.write(rec)
+            crawled.add(rec["detail_path"])
+            ok += 1
+            if ok % 50 == 0:
+                w.flush()
+                print(f"[INFO] {ok}/{len(todo)} words")
+        if args.refresh and out.exists():
+            # Failed or --limit-ed words keep their previous record.
+            for r in jsonl_io.iter_jsonl(out, skip_invalid=True):
+                if r.get("detail_path") not in crawled:
+                    w.write(r)
+    if args.refresh:
+        os.replace(write_path, out)
+
+    elapsed = time.perf_counter() - t0
+    if empty:
+        print(f"[WARN] {empty}/{ok} pages parsed with no translations; "
+              f"run check_detail_parser.py {cache_dir}/*.html to see if the selectors are stale", file=sys.stderr)
+    print(f"[DONE] {ok} words -> {out}, {failed} failed, {elapsed:.1f}s ({ok / max(elapsed, 1e-9):.1f} words/s)")
+
+
+if __name__ == "__main__":
+    main()
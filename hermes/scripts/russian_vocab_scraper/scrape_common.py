@@ -0,0 +1,586 @@
+"""
+Helpers shared by the scrapers in this directory.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+
+@dataclass
+class _HostState:
+    sem: asyncio.Semaphore
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    next_at: float = 0.0
+
+
+class HostThrottle:
+    """
+    Per-host politeness for the async (--parallel) scrapers: at most
+    `concurrency` requests in flight per host, and request starts on the same
+    host spaced at least `interval_s` apart, however many browser contexts
+    are running.
+    """
+
+    def __init__(self, concurrency: int = 2, interval_s: float = 0.2):
+        self.concurrency = max(1, concurrency)
+        self.interval_s = max(0.0, interval_s)
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host(self, url: str) -> _HostState:
+        host = urlsplit(url).netloc
+        st = self._hosts.get(host)
+        if st is None:
+            st = self._hosts[host] = _HostState(asyncio.Semaphore(self.concurrency))
+        return st
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        st = self._host(url)
+        async with st.sem:
+            async with st.lock:
+                loop = asyncio.get_running_loop()
+                wait = st.next_at - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                st.next_at = loop.time() + self.interval_s
+            yield
+
+
+class HostRateLimiter:
+    """Thread-safe counterpart of HostThrottle's spacing for the requests-based modes."""
+
+    def __init__(self, interval_s: float = 0.2):
+        self.interval_s = max(0.0, interval_s)
+        self._lock = threading.Lock()
+        self._next_at: Dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at.get(host, 0.0))
+            self._next_at[host] = at + self.interval_s
+        if at > now:
+            time.sleep(at - now)
+
+
+# ----------------------------
+# --record / --replay
+# ----------------------------
+
+# The body is stored decoded, so these no longer describe it.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class HttpArchive:
+    """
+    Record/replay store for the Playwright scrapers, attached through request
+    routing. Entries are keyed by method + URL + request body:
+
+      <dir>/<key>.json   url, method, status, headers
+      <dir>/<key>.body   response body
+
+    record: requests of RECORD_TYPES go to the network and are saved; other
+            requests pass on to the next route handler (e.g. resource blocking).
+    replay: recorded responses are served locally; everything else is aborted,
+            so a replay never touches the network.
+    """
+
+    # Scripts too: ros-edu builds its catalog client-side.
+    RECORD_TYPES = {"document", "xhr", "fetch", "script"}
+
+    def __init__(self, root: Path, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', got {mode!r}")
+        self.root = Path(root)
+        self.mode = mode
+        if mode == "record":
+            self.root.mkdir(parents=True, exist_ok=True)
+        elif not self.root.is_dir():
+            raise SystemExit(f"--replay: {self.root} does not exist")
+        self.saved = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(method: str, url: str, body: Optional[bytes]) -> str:
+        h = hashlib.sha256()
+        for part in (method.upper().encode("utf-8"), url.encode("utf-8"), body or b""):
+            h.update(part)
+            h.update(b"\0")
+        return h.hexdigest()[:32]
+
+    def _request_key(self, request: Any) -> str:
+        return self.key(request.method, request.url, request.post_data_buffer)
+
+    def load(self, request: Any) -> Optional[Dict[str, Any]]:
+        k = self._request_key(request)
+        meta_path = self.root / f"{k}.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta["body"] = (self.root / f"{k}.body").read_bytes()
+        return meta
+
+    def save(self, request: Any, status: int, headers: Dict[str, str], body: bytes) -> None:
+        k = self._request_key(request)
+        (self.root / f"{k}.body").write_bytes(body)
+        meta = {
+            "url": request.url,
+            "method": request.method,
+            "status": status,
+            "headers": {n: v for n, v in headers.items() if n.lower() not in _DROP_HEADERS},
+        }
+        (self.root / f"{k}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        self.saved += 1
+
+    def _miss(self, request: Any) -> None:
+        self.misses += 1
+        print(f"[WARN] replay miss: {request.method} {request.url}", file=sys.stderr)
+
+    def handle(self, route: Any) -> None:
+        """Route handler for the sync API: page.route("**/*", archive.handle)."""
+        req = route.request
+        if req.resource_type not in self.RECORD_TYPES:
+            if self.mode == "replay":
+                route.abort()
+            else:
+                route.fallback()
+            return
+        if self.mode == "replay":
+            hit = self.load(req)
+            if hit is None:
+                self._miss(req)
+                route.abort()
+                return
+            self.hits += 1
+            route.fulfill(status=hit["status"], headers=hit["headers"], body=hit["body"])
+            return
+        resp = route.fetch()
+        body = resp.body()
+        self.save(req, resp.status, resp.headers, body)
+        route.fulfill(response=resp, body=body)
+
+    async def handle_async(self, route: Any) -> None:
+        """Route handler for the async API."""
+        req = route.request
+        if req.resource_type not in self.RECORD_TYPES:
+            if self.mode == "replay":
+                await route.abort()
+            else:
+                await route.fallback()
+            return
+        if self.mode == "replay":
+            hit = self.load(req)
+            if hit is None:
+                self._miss(req)
+                await route.abort()
+                return
+            self.hits += 1
+            await route.fulfill(status=hit["status"], headers=hit["headers"], body=hit["body"])
+            return
+        resp = await route.fetch()
+        body = await resp.body()
+        self.save(req, resp.status, resp.headers, body)
+        await route.fulfill(response=resp, body=body)
+
+    def summary(self) -> str:
+        if self.mode == "record":
+            return f"[{self.mode}] saved {self.saved} responses to {self.root}"
+        return f"[{self.mode}] served {self.hits} responses from {self.root}, {self.misses} misses"
+
+
+def archive_from_args(record: str, replay: str) -> Optional[HttpArchive]:
+    if record and replay:
+        raise SystemExit("--record and --replay are mutually exclusive")
+    if record:
+        return HttpArchive(Path(record), "record")
+    if replay:
+        return HttpArchive(Path(replay), "replay")
+    return None
+
+
+# ----------------------------
+# --incremental
+# ----------------------------
+
+def rows_hash(rows: Iterable[Dict[str, Any]]) -> str:
+    h = hashlib.sha256()
+    for r in rows:
+        h.update(json.dumps(r, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()[:16]
+
+
+class ScrapeState:
+    """
+    --incremental bookkeeping, stored as <outdir>/scrape_state.json:
+
+      {level: {"hash": <all rows>, "rows": N,
+               "pages": {page: {"hash": ..., "etag": ..., "last_modified": ...}}}}
+
+    Pages are keyed by URL where the site has one per page, else by page number.
+    Thread-safe; the --http mode records pages from worker threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.levels: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            self.levels = json.loads(self.path.read_text(encoding="utf-8"))
+        self._pages: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def page_validators(self, level: str, page: str) -> Dict[str, str]:
+        """Previous ETag / Last-Modified of a page, for a conditional request."""
+        prev = self.levels.get(level, {}).get("pages", {}).get(page, {})
+        return {k: prev[k] for k in ("etag", "last_modified") if prev.get(k)}
+
+    def record_page(self, level: str, page: str, rows: Sequence[Dict[str, Any]],
+                    etag: Optional[str] = None, last_modified: Optional[str] = None) -> bool:
+        """Returns True when the page's rows differ from the previous run."""
+        entry = {"hash": rows_hash(rows), "rows": len(rows)}
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+        with self._lock:
+            self._pages.setdefault(level, {})[page] = entry
+            prev = self.levels.get(level, {}).get("pages", {}).get(page)
+        return prev is None or prev.get("hash") != entry["hash"]
+
+    def finish_level(self, level: str, rows: Sequence[Dict[str, Any]]) -> bool:
+        """Stores this run's pages for the level; returns True when its rows changed."""
+        digest = rows_hash(rows)
+        with self._lock:
+            changed = self.levels.get(level, {}).get("hash") != digest
+            self.levels[level] = {"hash": digest, "rows": len(rows), "pages": self._pages.pop(level, {})}
+        return changed
+
+    def save(self) -> None:
+        with self._lock:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.levels, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.path)
+
+
+def diff_rows(
+    old: Sequence[Dict[str, Any]],
+    new: Sequence[Dict[str, Any]],
+    key_fields: Tuple[str, ...],
+    ignore_fields: Tuple[str, ...] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Changelog records {"op": added|removed|modified, "key", "row", "previous"}.
+    Rows match on key_fields; ignore_fields (e.g. rank, page_url, which shift
+    whenever a word is inserted above) don't count as a modification.
+    """
+    def keyed(rows: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Homographs repeat a key within a level; number the repeats in order.
+        out: Dict[str, Dict[str, Any]] = {}
+        seen: Dict[str, int] = {}
+        for r in rows:
+            k = " | ".join(str(r.get(f, "")) for f in key_fields)
+            seen[k] = seen.get(k, 0) + 1
+            out[k if seen[k] == 1 else f"{k} #{seen[k]}"] = r
+        return out
+
+    def content(r: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in r.items() if k not in ignore_fields}
+
+    before = keyed(old)
+    after = keyed(new)
+    changes: List[Dict[str, Any]] = []
+    for k, r in after.items():
+        prev = before.get(k)
+        if prev is None:
+            changes.append({"op": "added", "key": k, "row": r})
+        elif content(prev) != content(r):
+            changes.append({"op": "modified", "key": k, "row": r, "previous": prev})
+    for k, r in before.items():
+        if k not in after:
+            changes.append({"op": "removed", "key": k, "row": r})
+    return changes
+
+
+def write_changelog(base: Path, changes: List[Dict[str, Any]]) -> Tuple[Path, Path]:
+    """
+    <base>.changes.jsonl  every change record
+    <base>.changed.jsonl  added + modified rows in the export's own schema,
+                          ready to feed to the transform instead of the full level
+    """
+    import jsonl_io
+
+    changes_path = base.with_name(base.name + ".changes.jsonl")
+    changed_path = base.with_name(base.name + ".changed.jsonl")
+    jsonl_io.write_jsonl(changes_path, changes)
+    jsonl_io.write_jsonl(changed_path, (c["row"] for c in changes if c["op"] != "removed"))
+    return changes_path, changed_path
+
+
+def summarize_changes(changes: List[Dict[str, Any]]) -> str:
+    counts = {op: sum(1 for c in changes if c["op"] == op) for op in ("added", "modified", "removed")}
+    return " ".join(f"{op}={n}" for op, n in counts.items())
+
+
+# ----------------------------
+# Page checkpoints (--resume)
+# ----------------------------
+
+class PageCheckpoint:
+    """
+    Streams a level's rows to <base>.partial.jsonl as each page is parsed and
+    records progress in <base>.checkpoint.json after the page is on disk:
+
+      {"level": ..., "last": <last page of the unbroken run from the first>,
+       "done": [every completed page], "rows": N, "bytes": <partial size>, "meta": {...}}
+
+    Pages are ros-edu page numbers (first=1, step=1) or OpenRussian start=
+    offsets (first=0, step=PAGE_SIZE); concurrent modes may finish pages out
+    of order, hence "done" next to "last".
+
+    With resume=True an existing checkpoint is loaded: the partial file is
+    cut back to the recorded size (dropping a torn last write) and its rows
+    are in `rows`. Otherwise any old checkpoint is discarded. finish()
+    removes both files once the level's real outputs are written.
+    """
+
+    def __init__(self, base: Path, level: str, resume: bool = False, first: int = 0, step: int = 1):
+        import jsonl_io
+
+        self.partial_path = base.with_name(base.name + ".partial.jsonl")
+        self.path = base.with_name(base.name + ".checkpoint.json")
+        self.level = level
+        self.first = first
+        self.step = step
+        self.last: Optional[int] = None
+        self.done: set = set()
+        self.meta: Dict[str, Any] = {}
+        self.rows: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists() and self.partial_path.exists():
+            cp = json.loads(self.path.read_text(encoding="utf-8"))
+            with self.partial_path.open("r+b") as f:
+                f.truncate(cp["bytes"])
+            self.rows = list(jsonl_io.iter_jsonl(self.partial_path))
+            self.last = cp.get("last")
+            self.done = set(cp.get("done") or [])
+            self.meta = cp.get("meta") or {}
+        else:
+            for p in (self.partial_path, self.path):
+                if p.exists():
+                    p.unlink()
+        self._writer = jsonl_io.JsonlWriter(self.partial_path, "a")
+
+    @property
+    def next_page(self) -> int:
+        """First page after the unbroken run of completed pages."""
+        return self.first if self.last is None else self.last + self.step
+
+    def set_meta(self, **meta: Any) -> None:
+        with self._lock:
+            self.meta.update(meta)
+            self._save()
+
+    def add_page(self, page: int, rows: Sequence[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._writer.write_many(rows)
+            self._writer.flush()
+            self.done.add(page)
+            while self.next_page in self.done:
+                self.last = self.next_page
+            self._save()
+
+    def _save(self) -> None:
+        cp = {
+            "level": self.level,
+            "last": self.last,
+            "done": sorted(self.done),
+            "rows": self._writer.rows + len(self.rows),
+            "bytes": self.partial_path.stat().st_size,
+            "meta": self.meta,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(cp, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def close(self) -> None:
+        """Keeps the partial file and checkpoint (for --resume)."""
+        self._writer.close()
+
+    def finish(self) -> None:
+        self._writer.close()
+        for p in (self.partial_path, self.path):
+            if p.exists():
+                p.unlink()
+
+
+# ----------------------------
+# Minimal HTML tree + selectors
+# ----------------------------
+
+# Elements that never have an end tag.
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Start tags that implicitly close an open <p> (HTML's optional end tag rules).
+P_CLOSING_START_TAGS = {
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "menu",
+    "nav", "ol", "p", "pre", "section", "table", "ul", "li", "td", "th", "tr", "tbody", "thead", "tfoot",
+}
+# End tags of elements an open <p> can't outlive.
+P_CLOSING_END_TAGS = {"td", "th", "tr", "tbody", "thead", "tfoot", "table", "div", "li", "ul", "ol", "body"}
+# An implied end tag never reaches past these (the element lives in a different cell/list/table).
+_P_SCOPE = {"td", "th", "table", "caption", "button", "li", "html"}
+_TABLE_SECTIONS = ("thead", "tbody", "tfoot")
+# Never rendered, so never part of innerText.
+_HIDDEN_TAGS = {"script", "style", "template", "head"}
+
+
+@dataclass
+class HtmlNode:
+    tag: str
+    attrs: Dict[str, str] = field(default_factory=dict)
+    children: List[Any] = field(default_factory=list)  # HtmlNode or str
+    parent: Optional["HtmlNode"] = None
+
+    @property
+    def classes(self) -> List[str]:
+        return (self.attrs.get("class") or "").split()
+
+    def text(self) -> str:
+        """textContent, trimmed."""
+        parts: List[str] = []
+        stack: List[Any] = [self]
+        while stack:
+            n = stack.pop()
+            if isinstance(n, str):
+                parts.append(n)
+            else:
+                stack.extend(reversed(n.children))
+        return "".join(parts).strip()
+
+    def inner_text(self) -> str:
+        """Roughly innerText, trimmed: unlike text(), <br> and block elements separate words."""
+        parts: List[str] = []
+        stack: List[Any] = [self]
+        while stack:
+            n = stack.pop()
+            if isinstance(n, str):
+                parts.append(n)
+            elif n.tag == "br":
+                parts.append("\n")
+            elif n.tag in _HIDDEN_TAGS:
+                continue
+            elif n.tag in P_CLOSING_START_TAGS:
+                stack.extend(["\n", *reversed(n.children), "\n"])
+            else:
+                stack.extend(reversed(n.children))
+        return "".join(parts).strip()
+
+    def iter(self):
+        for c in self.children:
+            if isinstance(c, HtmlNode):
+                yield c
+                yield from c.iter()
+
+    def select(self, selector: str) -> List["HtmlNode"]:
+        """Descendant selectors of tag / .class / tag.class steps, e.g. "div.translations p.tl"."""
+        steps = [_parse_step(s) for s in selector.split()]
+        return [n for n in self.iter() if _matches_path(n, steps, self)]
+
+    def select_one(self, selector: str) -> Optional["HtmlNode"]:
+        found = self.select(selector)
+        return found[0] if found else None
+
+
+def _parse_step(step: str) -> Tuple[str, Tuple[str, ...]]:
+    tag, *classes = step.split(".")
+    return tag, tuple(classes)
+
+
+def _step_matches(node: HtmlNode, step: Tuple[str, Tuple[str, ...]]) -> bool:
+    tag, classes = step
+    if tag and node.tag != tag:
+        return False
+    have = node.classes
+    return all(c in have for c in classes)
+
+
+def _matches_path(node: HtmlNode, steps: List[Tuple[str, Tuple[str, ...]]], root: HtmlNode) -> bool:
+    if not _step_matches(node, steps[-1]):
+        return False
+    i = len(steps) - 2
+    cur = node.parent
+    while i >= 0 and cur is not None and cur is not root:
+        if _step_matches(cur, steps[i]):
+            i -= 1
+        cur = cur.parent
+    return i < 0
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = HtmlNode("#document")
+        self._cur = self.root
+
+    def _close_open(self, tag: str, scope: Iterable[str]) -> None:
+        """Implied end tag: close the nearest open `tag`, unless a `scope` element comes first."""
+        n = self._cur
+        while n is not self.root and n.tag not in scope:
+            if n.tag == tag:
+                self._cur = n.parent
+                return
+            n = n.parent
+
+    def handle_starttag(self, tag, attrs):
+        if tag in P_CLOSING_START_TAGS:
+            self._close_open("p", _P_SCOPE)
+        if tag == "li":
+            self._close_open("li", ("ul", "ol", "table"))
+        elif tag in ("td", "th"):
+            self._close_open("td", ("tr", "table"))
+            self._close_open("th", ("tr", "table"))
+        elif tag == "tr":
+            self._close_open("tr", _TABLE_SECTIONS + ("table",))
+        elif tag in _TABLE_SECTIONS:
+            for section in _TABLE_SECTIONS:
+                self._close_open(section, ("table",))
+        node = HtmlNode(tag, {k: v or "" for k, v in attrs}, parent=self._cur)
+        self._cur.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._cur = node
+
+    def handle_startendtag(self, tag, attrs):
+        self._cur.children.append(HtmlNode(tag, {k: v or "" for k, v in attrs}, parent=self._cur))
+
+    def handle_endtag(self, tag):
+        # Close up to the nearest open element of this tag; ignore strays.
+        n = self._cur
+        while n is not self.root and n.tag != tag:
+            n = n.parent
+        if n is not self.root:
+            self._cur = n.parent
+
+    def handle_data(self, data):
+        self._cur.children.append(data)
+
+
+def parse_html(html: str) -> HtmlNode:
+    b = _TreeBuilder()
+    b.feed(html)
+    b.close()
+    return b.root
@@ -1,16 +1,59 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import csv
-import json
+import os
 import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Tuple
-
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Shared pipeline helpers live next door in hermesify/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "hermesify"))
+import jsonl_io
+from scrape_common import (
+    P_CLOSING_END_TAGS, P_CLOSING_START_TAGS, HostRateLimiter, HostThrottle, HttpArchive, PageCheckpoint,
+    ScrapeState, archive_from_args, diff_rows, summarize_changes, write_changelog,
+)
+
+# Browser modes need playwright, --http needs requests; neither needs the other.
+try:
+    from playwright.async_api import async_playwright
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+except Exception:  # pragma: no cover
+    async_playwright = None
+    sync_playwright = None
+    PlaywrightTimeoutError = TimeoutError
+
+try:
+    import requests
+except Exception:  # pragma: no cover
+    requests = None
 
 
 BASE_URL = "https://en.openrussian.org"
+PAGE_SIZE = 50  # rows per /vocab/<level>?start=N page
+
+# Pull everything in one go inside the browser context.
+# This avoids per-row locator waits (which is what timed out for you).
+ROWS_JS = """(trs) => trs.map(tr => {
+    const rankEl = tr.querySelector("span.rank");
+    const a = tr.querySelector("a.native");
+    const tlEls = Array.from(tr.querySelectorAll("td p.tl"));
+
+    return {
+      rank: rankEl ? rankEl.textContent.trim() : null,
+      russian: a ? a.textContent.trim() : null,
+      detail_path: a ? a.getAttribute("href") : null,
+      translations: tlEls.map(p => (p.textContent || "").trim()).filter(Boolean),
+    };
+})"""
 
 
 @dataclass
@@ -54,26 +97,11 @@ def _parse_total_from_paging_text(text: str) -> Optional[int]:
 def _extract_rows_on_page(page, level: str):
     page.wait_for_selector("table.wordlist tbody tr", timeout=30_000)
 
-    page_url = page.url
-
-    # Pull everything in one go inside the browser context.
-    # This avoids per-row locator waits (which is what timed out for you).
-    raw_rows = page.eval_on_selector_all(
-        "table.wordlist tbody tr",
-        """(trs) => trs.map(tr => {
-            const rankEl = tr.querySelector("span.rank");
-            const a = tr.querySelector("a.native");
-            const tlEls = Array.from(tr.querySelectorAll("td p.tl"));
-
-            return {
-              rank: rankEl ? rankEl.textContent.trim() : null,
-              russian: a ? a.textContent.trim() : null,
-              detail_path: a ? a.getAttribute("href") : null,
-              translations: tlEls.map(p => (p.textContent || "").trim()).filter(Boolean),
-            };
-        })"""
-    )
+    raw_rows = page.eval_on_selector_all("table.wordlist tbody tr", ROWS_JS)
+    return _rows_from_raw(raw_rows, level, page.url)
 
+
+def _rows_from_raw(raw_rows, level: str, page_url: str) -> List[VocabRow]:
     rows = []
     for rr in raw_rows:
         if not rr.get("rank") or not rr.get("russian"):
@@ -134,19 +162,61 @@ def _click_next_if_available(page) -> bool:
     return True
 
 
-def scrape_level(page, level: str, sleep_s: float, verbose: bool) -> Tuple[List[VocabRow], Optional[int]]:
+def level_page_url(level: str, start: int = 0) -> str:
     url = f"{BASE_URL}/vocab/{level}"
+    return f"{url}?start={start}" if start else url
+
+
+def page_start(url: str) -> int:
+    """The ?start= offset of a list page URL (0 for the first page)."""
+    try:
+        return int(parse_qs(urlsplit(url).query).get("start", ["0"])[0])
+    except ValueError:
+        return 0
+
+
+def level_checkpoint(outdir: str, level: str, resume: bool) -> PageCheckpoint:
+    return PageCheckpoint(Path(outdir) / f"openrussian_vocab_{level}", level, resume=resume, first=0, step=PAGE_SIZE)
+
+
+def _checkpoint_rows(checkpoint: Optional[PageCheckpoint]) -> List[VocabRow]:
+    return [VocabRow(**d) for d in checkpoint.rows] if checkpoint is not None else []
+
+
+def _finish_level(rows: List[VocabRow], total_expected: Optional[int]) -> List[VocabRow]:
+    # Dedup by rank in case the site repeats a page (safety), then rank order.
+    by_rank = {}
+    for r in rows:
+        by_rank.setdefault(r.rank, r)
+    out = sorted(by_rank.values(), key=lambda r: r.rank)
+    if total_expected is not None:
+        out = out[:total_expected]
+    return out
+
+
+def scrape_level(page, level: str, sleep_s: float, verbose: bool,
+                 state: Optional[ScrapeState] = None,
+                 checkpoint: Optional[PageCheckpoint] = None) -> Tuple[List[VocabRow], Optional[int]]:
+    """With a checkpoint, rows are streamed to it per page and a resumed level starts at its next offset."""
+    all_rows = _checkpoint_rows(checkpoint)
+    start = checkpoint.next_page if checkpoint is not None else 0
+    if start:
+        print(f"[{level}] resuming at start={start} ({len(all_rows)} rows from checkpoint)")
+    url = level_page_url(level, start)
     page.goto(url, wait_until="domcontentloaded")
     _accept_cookies_if_present(page)
 
     total_expected = _get_total_expected(page)
-    all_rows: List[VocabRow] = []
-    seen_ranks = set()
+    seen_ranks = {r.rank for r in all_rows}
 
     page_idx = 0
     while True:
         page_idx += 1
         rows = _extract_rows_on_page(page, level)
+        if checkpoint is not None:
+            checkpoint.add_page(page_start(page.url), [asdict(r) for r in rows])
+        if state is not None:
+            state.record_page(level, page.url, [asdict(r) for r in rows])
 
         # Dedup in case the site repeats a page (safety)
         new_rows = []
@@ -172,11 +242,7 @@ def scrape_level(page, level: str, sleep_s: float, verbose: bool) -> Tuple[List[
         if sleep_s > 0:
             time.sleep(sleep_s)
 
-    all_rows.sort(key=lambda r: r.rank)
-    if total_expected is not None:
-        all_rows = all_rows[:total_expected]
-
-    return all_rows, total_expected
+    return _finish_level(all_rows, total_expected), total_expected
 
 
 def write_outputs(rows: List[VocabRow], outdir: str, level: str) -> Tuple[str, str]:
@@ -197,13 +263,453 @@ def write_outputs(rows: List[VocabRow], outdir: str, level: str) -> Tuple[str, s
                 r.page_url,
             ])
 
-    with open(jsonl_path, "w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(asdict(r), ensure_ascii=False) + "\n")
+    jsonl_io.write_jsonl(jsonl_path, (asdict(r) for r in rows))
 
     return csv_path, jsonl_path
 
 
+def emit_level(rows: List[VocabRow], outdir: str, level: str, total_expected: Optional[int],
+               state: Optional[ScrapeState] = None) -> None:
+    """
+    Writes a finished level. With --incremental, also writes the changelog
+    against the previous export and leaves the files alone if nothing changed.
+    """
+    if state is not None:
+        jsonl_path = f"{outdir}/openrussian_vocab_{level}.jsonl"
+        new = [asdict(r) for r in rows]
+        old = list(jsonl_io.iter_jsonl(jsonl_path)) if os.path.exists(jsonl_path) else []
+        changed = state.finish_level(level, new)
+        # Ranks/page URLs shift whenever a word is inserted above; not a content change.
+        changes = diff_rows(old, new, key_fields=("russian", "detail_path"), ignore_fields=("rank", "page_url"))
+        changes_path, changed_path = write_changelog(Path(outdir) / f"openrussian_vocab_{level}", changes)
+        state.save()
+        print(f"[{level}] changes: {summarize_changes(changes)} -> {changed_path}")
+        if old and not changed:
+            print(f"[{level}] unchanged since last run; kept {jsonl_path}")
+            return
+
+    csv_path, jsonl_path = write_outputs(rows, outdir, level)
+    print(f"[{level}] DONE: wrote {len(rows)} rows" + (f" (expected ~{total_expected})" if total_expected else ""))
+    print(f"  - {csv_path}")
+    print(f"  - {jsonl_path}")
+
+
+# ----------------------------
+# --http: list pages without a browser
+# ----------------------------
+
+USER_AGENT = "HermesLangPackBot/0.2"
+HTTP_RETRIES = 3
+
+_thread_local = threading.local()
+
+
+def _classes(attrs) -> List[str]:
+    return (dict(attrs).get("class") or "").split()
+
+
+class WordlistParser(HTMLParser):
+    """
+    Streams a /vocab/<level> page and collects the same per-row dicts as ROWS_JS
+    (rank, russian, detail_path, translations) from `table.wordlist tbody tr`,
+    plus the first `div.paging span` text for the total.
+
+    Rows are read the way the browser builds the DOM: a `tr` directly inside
+    the table (no literal <tbody>) is in its implied tbody, `thead`/`tfoot`
+    rows are not, and an unclosed <p>/<td>/<tr> ends where the next one starts.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[Dict[str, Any]] = []
+        self.paging_text: Optional[str] = None
+        self._table_depth = 0    # >0 inside table.wordlist (counts nested tables)
+        self._section: Optional[str] = None  # open thead/tbody/tfoot of table.wordlist
+        self._td_depth = 0
+        self._row: Optional[Dict[str, Any]] = None
+        self._paging_depth = 0   # >0 inside div.paging (counts nested divs)
+        # Open text captures: [tag, nesting depth, field, text parts]
+        self._captures: List[List[Any]] = []
+
+    def _capture(self, tag: str, name: str) -> None:
+        self._captures.append([tag, 1, name, []])
+
+    def _finish(self, c: List[Any]) -> None:
+        self._captures.remove(c)
+        text = "".join(c[3]).strip()
+        if c[2] == "paging":
+            self.paging_text = text
+        elif self._row is not None:
+            if c[2] == "tl":
+                if text:
+                    self._row["translations"].append(text)
+            else:
+                self._row[c[2]] = text
+
+    def _close_p(self) -> None:
+        # <p> has an optional end tag: block starts and the end of its cell close it.
+        for c in [c for c in self._captures if c[0] == "p"]:
+            self._finish(c)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in P_CLOSING_START_TAGS:
+            self._close_p()
+        for c in self._captures:
+            if c[0] == tag:
+                c[1] += 1
+        cls = _classes(attrs)
+
+        if tag == "div":
+            if self._paging_depth:
+                self._paging_depth += 1
+            elif "paging" in cls and self.paging_text is None:
+                self._paging_depth = 1
+        elif tag == "span" and self._paging_depth and self.paging_text is None \
+                and not any(c[2] == "paging" for c in self._captures):
+            self._capture("span", "paging")
+
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif "wordlist" in cls:
+                self._table_depth = 1
+            return
+        if not self._table_depth:
+            return
+        if tag in ("thead", "tbody", "tfoot") and self._table_depth == 1:
+            self._section = tag
+            self._row = None
+        elif tag == "tr" and self._table_depth == 1:
+            self._td_depth = 0
+            if self._section in (None, "tbody"):
+                self._row = {"rank": None, "russian": None, "detail_path": None, "translations": []}
+                self.rows.append(self._row)
+            else:
+                self._row = None
+        elif self._row is None:
+            return
+        elif tag in ("td", "th"):
+            self._td_depth += 1
+        elif tag == "span" and "rank" in cls and self._row["rank"] is None \
+                and not any(c[2] == "rank" for c in self._captures):
+            self._capture("span", "rank")
+        elif tag == "a" and "native" in cls and self._row["russian"] is None \
+                and not any(c[2] == "russian" for c in self._captures):
+            self._row["detail_path"] = dict(attrs).get("href")
+            self._capture("a", "russian")
+        elif tag == "p" and "tl" in cls and self._td_depth:
+            self._capture("p", "tl")
+
+    def handle_data(self, data):
+        for c in self._captures:
+            c[3].append(data)
+
+    def handle_endtag(self, tag):
+        if tag in P_CLOSING_END_TAGS:
+            self._close_p()
+        for c in list(self._captures):
+            if c[0] != tag:
+                continue
+            c[1] -= 1
+            if not c[1]:
+                self._finish(c)
+
+        if tag == "div" and self._paging_depth:
+            self._paging_depth -= 1
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._section = None
+                self._row = None
+        elif tag in ("thead", "tbody", "tfoot") and self._table_depth == 1:
+            self._section = None
+            self._row = None
+        elif tag == "tr" and self._table_depth == 1:
+            self._row = None
+            self._td_depth = 0
+        elif tag in ("td", "th") and self._td_depth:
+            self._td_depth -= 1
+
+
+def parse_list_page(html: str, level: str, page_url: str) -> Tuple[List[VocabRow], Optional[int]]:
+    parser = WordlistParser()
+    parser.feed(html)
+    parser.close()
+    total = _parse_total_from_paging_text(parser.paging_text) if parser.paging_text else None
+    rows = _rows_from_raw(parser.rows, level, page_url)
+    if total and not rows:
+        # A page inside the paging range always lists words; an empty parse means the markup changed.
+        raise ValueError(f"{page_url}: paging reports {total} words but no rows were parsed")
+    return rows, total
+
+
+def _http_session():
+    sess = getattr(_thread_local, "session", None)
+    if sess is None:
+        sess = requests.Session()
+        sess.headers["User-Agent"] = USER_AGENT
+        _thread_local.session = sess
+    return sess
+
+
+def fetch_page(url: str, limiter: HostRateLimiter, html_dir: Optional[Path], name: str,
+               timeout_s: float = 30.0,
+               validators: Optional[Dict[str, str]] = None) -> Tuple[Optional[str], str, Dict[str, str]]:
+    """
+    GET one openrussian.org page (list pages here, word pages in crawl_openrussian_details.py).
+    Returns (html, final url, {"etag", "last_modified"} from the response).
+    With validators (previous ETag / Last-Modified) the request is conditional
+    and html is None when the server answers 304 Not Modified.
+    With html_dir, a saved <name>.html is used instead of the network (offline
+    runs / fixtures) and fetched pages are saved there.
+    """
+    cached = html_dir / f"{name}.html" if html_dir else None
+    if cached is not None and cached.exists():
+        return cached.read_text(encoding="utf-8"), url, {}
+    if requests is None:
+        raise SystemExit("--http needs the requests package (pip install requests)")
+
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(HTTP_RETRIES):
+        limiter.wait(url)
+        try:
+            resp = _http_session().get(url, timeout=timeout_s, headers=headers)
+        except requests.RequestException:
+            if attempt == HTTP_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+            continue
+        if resp.status_code in (429, 500, 502, 503, 504) and attempt < HTTP_RETRIES - 1:
+            time.sleep(2 ** attempt)
+            continue
+        got = {k: v for k, v in (("etag", resp.headers.get("ETag")),
+                                 ("last_modified", resp.headers.get("Last-Modified"))) if v}
+        if resp.status_code == 304:
+            return None, url, got or dict(validators or {})
+        resp.raise_for_status()
+        resp.encoding = resp.encoding or "utf-8"
+        html = resp.text
+        if cached is not None:
+            cached.write_text(html, encoding="utf-8")
+        return html, resp.url, got
+    raise RuntimeError(f"unreachable: {url}")
+
+
+def _previous_rows_by_page(outdir: str, level: str) -> Dict[str, List[VocabRow]]:
+    path = f"{outdir}/openrussian_vocab_{level}.jsonl"
+    by_page: Dict[str, List[VocabRow]] = {}
+    if os.path.exists(path):
+        for r in jsonl_io.iter_jsonl(path):
+            by_page.setdefault(r.get("page_url") or "", []).append(VocabRow(**r))
+    return by_page
+
+
+def scrape_http(levels: List[str], outdir: str, workers: int, sleep_s: float,
+                html_dir: Optional[Path], verbose: bool, state: Optional[ScrapeState] = None,
+                resume: bool = False) -> None:
+    """
+    Fetches every level's first page for the totals, then all remaining
+    ?start=N offsets at once over a thread pool. A level's files are written
+    as soon as its last page is parsed.
+
+    With state (--incremental), pages after the first are requested
+    conditionally; on 304 the page's rows are taken from the previous export.
+
+    Each page's rows go to the level's checkpoint as they arrive; with resume,
+    offsets the checkpoint already holds are not fetched again.
+    """
+    limiter = HostRateLimiter(sleep_s)
+    if html_dir is not None:
+        html_dir.mkdir(parents=True, exist_ok=True)
+    previous = {lvl: _previous_rows_by_page(outdir, lvl) for lvl in levels} if state is not None else {}
+    not_modified = 0
+
+    def job(level: str, start: int) -> Tuple[List[VocabRow], Optional[int]]:
+        nonlocal not_modified
+        url = level_page_url(level, start)
+        # The first page carries the total, so it is always fetched in full.
+        validators = None
+        if state is not None and start and previous[level].get(url):
+            validators = state.page_validators(level, url)
+        html, final_url, got = fetch_page(url, limiter, html_dir, f"{level}_{start}", validators=validators)
+        if html is None:
+            rows, total = list(previous[level][url]), None
+            not_modified += 1
+        else:
+            rows, total = parse_list_page(html, level, final_url)
+        if state is not None:
+            state.record_page(level, url, [asdict(r) for r in rows], got.get("etag"), got.get("last_modified"))
+        if verbose:
+            print(f"[{level}] start={start}: " + ("not modified" if html is None else f"parsed={len(rows)}"))
+        return rows, total
+
+    checkpoints = {lvl: level_checkpoint(outdir, lvl, resume) for lvl in levels}
+
+    def keep(lvl: str, start: int, rows: List[VocabRow]) -> None:
+        if start not in checkpoints[lvl].done:
+            checkpoints[lvl].add_page(start, [asdict(r) for r in rows])
+            rows_by_level[lvl].extend(rows)
+
+    t0 = time.perf_counter()
+    pages = 0
+    rows_by_level: Dict[str, List[VocabRow]] = {lvl: _checkpoint_rows(cp) for lvl, cp in checkpoints.items()}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            # The first page carries the total, so it is fetched even when resuming.
+            firsts = {lvl: pool.submit(job, lvl, 0) for lvl in levels}
+            totals: Dict[str, Optional[int]] = {}
+            pending: Dict[str, int] = {}
+            futures = {}
+            for lvl, fut in firsts.items():
+                done = checkpoints[lvl].done
+                if done:
+                    print(f"[{lvl}] resuming: {len(done)} pages ({len(rows_by_level[lvl])} rows) from checkpoint")
+                first_rows, totals[lvl] = fut.result()
+                keep(lvl, 0, first_rows)
+                pages += 1
+                if totals[lvl] is None:
+                    # No total to plan with: walk ?start= until a page comes back empty.
+                    start, page_rows = PAGE_SIZE, first_rows
+                    while page_rows:
+                        if start not in done:
+                            page_rows, _ = job(lvl, start)
+                            keep(lvl, start, page_rows)
+                            pages += 1
+                        start += PAGE_SIZE
+                    starts = []
+                else:
+                    starts = [st for st in range(PAGE_SIZE, totals[lvl], PAGE_SIZE) if st not in done]
+                pending[lvl] = len(starts)
+                for st in starts:
+                    futures[pool.submit(job, lvl, st)] = (lvl, st)
+
+            def finish(lvl: str) -> None:
+                emit_level(_finish_level(rows_by_level[lvl], totals[lvl]), outdir, lvl, totals[lvl], state)
+                checkpoints[lvl].finish()
+
+            for lvl in levels:
+                if pending[lvl] == 0:
+                    finish(lvl)
+            for fut in as_completed(futures):
+                lvl, st = futures[fut]
+                keep(lvl, st, fut.result()[0])
+                pages += 1
+                pending[lvl] -= 1
+                if pending[lvl] == 0:
+                    finish(lvl)
+    finally:
+        for cp in checkpoints.values():
+            cp.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"[DONE] {pages} pages in {elapsed:.1f}s ({pages / max(elapsed, 1e-9):.2f} pages/s)"
+          + (f", {not_modified} not modified" if state is not None else ""))
+
+
+# ----------------------------
+# --parallel: page ranges across browser contexts (async Playwright)
+# ----------------------------
+
+async def _fetch_page_async(context, throttle: HostThrottle, level: str, start: int) -> Tuple[List[VocabRow], Optional[int]]:
+    url = level_page_url(level, start)
+    page = await context.new_page()
+    try:
+        async with throttle.slot(url):
+            await page.goto(url, wait_until="domcontentloaded")
+        await page.wait_for_selector("table.wordlist tbody tr", timeout=30_000)
+        raw_rows = await page.eval_on_selector_all("table.wordlist tbody tr", ROWS_JS)
+        total = None
+        if start == 0:
+            try:
+                total = _parse_total_from_paging_text(
+                    (await page.locator("div.paging span").first.inner_text(timeout=5000)).strip()
+                )
+            except PlaywrightTimeoutError:
+                pass
+        return _rows_from_raw(raw_rows, level, page.url), total
+    finally:
+        await page.close()
+
+
+async def scrape_parallel(levels: List[str], outdir: str, parallel: int, per_host: int,
+                          sleep_s: float, headless: bool, verbose: bool,
+                          archive: Optional[HttpArchive] = None, state: Optional[ScrapeState] = None,
+                          resume: bool = False) -> None:
+    """
+    Every level's first page gives its total; the remaining ?start=N pages of all
+    levels then share `parallel` browser contexts. A level's files are written
+    as soon as its last page is in; until then its pages stream to a checkpoint.
+    """
+    throttle = HostThrottle(per_host, sleep_s)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        contexts: asyncio.Queue = asyncio.Queue()
+        for _ in range(max(1, parallel)):
+            context = await browser.new_context()
+            if archive is not None:
+                await context.route("**/*", archive.handle_async)
+            contexts.put_nowait(context)
+
+        checkpoints = {lvl: level_checkpoint(outdir, lvl, resume) for lvl in levels}
+
+        async def fetch(level: str, start: int) -> Tuple[List[VocabRow], Optional[int]]:
+            context = await contexts.get()
+            try:
+                rows, total = await _fetch_page_async(context, throttle, level, start)
+            finally:
+                contexts.put_nowait(context)
+            if start not in checkpoints[level].done:
+                checkpoints[level].add_page(start, [asdict(r) for r in rows])
+            if state is not None:
+                state.record_page(level, level_page_url(level, start), [asdict(r) for r in rows])
+            if verbose:
+                print(f"[{level}] start={start}: parsed={len(rows)}")
+            return rows, total
+
+        async def run_level(level: str) -> None:
+            checkpoint = checkpoints[level]
+            done = set(checkpoint.done)
+            # Resumed rows; _finish_level drops the first page's repeat by rank.
+            all_rows = _checkpoint_rows(checkpoint)
+            if done:
+                print(f"[{level}] resuming: {len(done)} pages ({len(all_rows)} rows) from checkpoint")
+            first_rows, total_expected = await fetch(level, 0)
+            all_rows.extend(first_rows)
+            if total_expected is not None:
+                starts = [s for s in range(PAGE_SIZE, total_expected, PAGE_SIZE) if s not in done]
+                pages = await asyncio.gather(*(fetch(level, s) for s in starts))
+                for rows, _ in pages:
+                    all_rows.extend(rows)
+            else:
+                # No total to plan with: walk ?start= until a page comes back empty.
+                start, page_rows = PAGE_SIZE, first_rows
+                while page_rows:
+                    if start not in done:
+                        page_rows, _ = await fetch(level, start)
+                        all_rows.extend(page_rows)
+                    start += PAGE_SIZE
+            emit_level(_finish_level(all_rows, total_expected), outdir, level, total_expected, state)
+            checkpoint.finish()
+
+        try:
+            await asyncio.gather(*(run_level(lvl) for lvl in levels))
+        finally:
+            for cp in checkpoints.values():
+                cp.close()
+            while not contexts.empty():
+                await contexts.get_nowait().close()
+            await browser.close()
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--levels", nargs="+", default=["C1", "C2"])
@@ -211,27 +717,77 @@ def main():
     ap.add_argument("--sleep", type=float, default=0.2)
     ap.add_argument("--headless", action="store_true", help="Run without showing the browser UI")
     ap.add_argument("--quiet", action="store_true")
+    ap.add_argument("--parallel", type=int, default=0, help="Fetch pages of all levels over N browser contexts at once")
+    ap.add_argument("--per-host", type=int, default=2, help="With --parallel: max requests in flight per host")
+    ap.add_argument("--http", action="store_true", help="Fetch list pages over plain HTTP (no browser)")
+    ap.add_argument("--workers", type=int, default=4, help="With --http: concurrent requests")
+    ap.add_argument(
+        "--html-dir",
+        default="",
+        help="With --http: read <LEVEL>_<start>.html from here when present, save fetched pages here",
+    )
+    ap.add_argument("--record", default="", help="Browser modes: save every document/XHR response to DIR")
+    ap.add_argument("--replay", default="", help="Browser modes: serve responses from a --record DIR; no network")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Track per-page hashes in <outdir>/scrape_state.json, keep unchanged levels, write changelogs",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue each level from its <level>.checkpoint.json instead of page one",
+    )
     args = ap.parse_args()
 
     levels = [x.upper() for x in args.levels]
     verbose = not args.quiet
+    if args.http and (args.record or args.replay):
+        ap.error("--record/--replay apply to the browser modes; --http has --html-dir")
+    archive = archive_from_args(args.record, args.replay)
+    if args.replay:
+        args.sleep = 0.0  # nothing to be polite to
+    state = ScrapeState(Path(args.outdir) / "scrape_state.json") if args.incremental else None
+
+    if args.http:
+        # --sleep is the minimum spacing between requests to the host.
+        scrape_http(levels, args.outdir, args.workers, args.sleep,
+                    Path(args.html_dir) if args.html_dir else None, verbose, state, args.resume)
+        return
+    if sync_playwright is None:
+        raise SystemExit("Browser modes need playwright (pip install playwright); or use --http")
+
+    if args.parallel > 0:
+        # --sleep becomes the minimum spacing between requests to the host.
+        asyncio.run(scrape_parallel(levels, args.outdir, args.parallel, args.per_host,
+                                    args.sleep, args.headless, verbose, archive, state, args.resume))
+        if archive is not None:
+            print(archive.summary())
+        return
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=args.headless, slow_mo=50 if not args.headless else 0)
         context = browser.new_context()
+        if archive is not None:
+            context.route("**/*", archive.handle)
         page = context.new_page()
 
         for lvl in levels:
-            rows, total_expected = scrape_level(page, lvl, sleep_s=args.sleep, verbose=verbose)
-            csv_path, jsonl_path = write_outputs(rows, args.outdir, lvl)
-
-            print(f"[{lvl}] DONE: wrote {len(rows)} rows" + (f" (expected ~{total_expected})" if total_expected else ""))
-            print(f"  - {csv_path}")
-            print(f"  - {jsonl_path}")
+            checkpoint = level_checkpoint(args.outdir, lvl, args.resume)
+            try:
+                rows, total_expected = scrape_level(page, lvl, sleep_s=args.sleep, verbose=verbose, state=state,
+                                                    checkpoint=checkpoint)
+                emit_level(rows, args.outdir, lvl, total_expected, state)
+                checkpoint.finish()
+            finally:
+                checkpoint.close()
 
         context.close()
         browser.close()
 
+    if archive is not None:
+        print(archive.summary())
+
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,36 @@
+import argparse
+import asyncio
 import csv
 import json
 import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List
-
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+# Shared pipeline helpers live next door in hermesify/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "hermesify"))
+import jsonl_io
+from scrape_common import (
+    HostRateLimiter, HostThrottle, HttpArchive, PageCheckpoint, ScrapeState, archive_from_args, diff_rows,
+    parse_html, summarize_changes, write_changelog,
+)
+
+from playwright.async_api import async_playwright
 from playwright.sync_api import Page
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+# Only --api needs requests.
+try:
+    import requests
+except Exception:  # pragma: no cover
+    requests = None
+
 BASE_URL = "https://www.ros-edu.ru/basic-dictionary"
 
 LEVEL_LINK_TEXT: Dict[str, str] = {
@@ -21,9 +42,41 @@ LEVEL_LINK_TEXT: Dict[str, str] = {
     "C2": "IV сертификационный уровень (C2)",
 }
 
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
 OUT_DIR = Path("ros_edu_basic_dictionary_export")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+ROW_SELECTOR = "#catalog-content .row.row-dictionary"
+
+# --fast: nothing we extract needs these, and they are most of the bytes per page.
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+
+# One round-trip per page: the first three column divs of every dictionary row.
+ROWS_JS = """(rows) => rows.map(r =>
+    Array.from(r.querySelectorAll("div")).slice(0, 3).map(d => d.innerText || "")
+)"""
+
+NEXT_SELECTOR = "ul.pagination a.page-link.next"
+
+# --parallel: next-link state and the current first word in one round-trip.
+NEXT_STATE_JS = """() => {
+    const a = document.querySelector("ul.pagination a.page-link.next");
+    const li = a ? a.closest("li") : null;
+    const el = document.querySelector("#catalog-content .row.row-dictionary div");
+    return {
+        has_next: !!a && !(li && li.classList.contains("disabled")),
+        first: el ? el.textContent.trim().replace(/\\s+/g, " ") : "",
+    };
+}"""
+
+PAGE_CHANGED_JS = """(before) => {
+    const el = document.querySelector("#catalog-content .row.row-dictionary div");
+    if (!el) return false;
+    const now = el.textContent.trim().replace(/\\s+/g, " ");
+    return now && now !== before;
+}"""
+
 @dataclass(frozen=True)
 class Row:
     level: str
@@ -48,8 +101,17 @@ def _click_level_filter(page: Page, level: str) -> None:
     loc.scroll_into_view_if_needed()
     loc.click(timeout=15_000)
 
+def _block_heavy_resources(page: Page) -> None:
+    def handle(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
+    page.route("**/*", handle)
+
 def _wait_for_dictionary_rows(page: Page, timeout_ms: int = 20_000) -> None:
-    page.locator("#catalog-content .row.row-dictionary").first.wait_for(
+    page.locator(ROW_SELECTOR).first.wait_for(
         state="visible", timeout=timeout_ms
     )
 
@@ -57,7 +119,7 @@ def _extract_rows_on_current_page(page: Page, level: str) -> List[Row]:
     _wait_for_dictionary_rows(page)
 
     rows: List[Row] = []
-    row_loc = page.locator("#catalog-content .row.row-dictionary")
+    row_loc = page.locator(ROW_SELECTOR)
     n = row_loc.count()
 
     for i in range(n):
@@ -78,11 +140,27 @@ def _extract_rows_on_current_page(page: Page, level: str) -> List[Row]:
 
     return rows
 
-def _click_next_page(page: Page) -> bool:
+def _rows_from_columns(raw: List[List[str]], level: str) -> List[Row]:
+    rows: List[Row] = []
+    for cols in raw:
+        # Expect 3 columns: 3/6/3
+        if len(cols) < 3:
+            continue
+        word, extra, translation = (_clean_text(c) for c in cols)
+        if not word:
+            continue
+        rows.append(Row(level=level, word=word, extra=extra, translation=translation))
+    return rows
+
+def _extract_rows_fast(page: Page, level: str) -> List[Row]:
+    _wait_for_dictionary_rows(page)
+    return _rows_from_columns(page.eval_on_selector_all(ROW_SELECTOR, ROWS_JS), level)
+
+def _click_next_page(page: Page, settle_ms: int = 200) -> bool:
     """
     Returns True if moved to next page, False if no next page available.
     """
-    next_link = page.locator("ul.pagination a.page-link.next")
+    next_link = page.locator(NEXT_SELECTOR)
 
     if next_link.count() == 0:
         return False
@@ -107,18 +185,10 @@ def _click_next_page(page: Page) -> bool:
     next_link.first.click(timeout=10_000)
 
     # Wait until the content changes (more reliable than networkidle here)
-    page.wait_for_timeout(200)  # small breathing room
+    if settle_ms:
+        page.wait_for_timeout(settle_ms)  # small breathing room
     try:
-        page.wait_for_function(
-            """(before) => {
-                const el = document.querySelector("#catalog-content .row.row-dictionary div");
-                if (!el) return false;
-                const now = el.textContent.trim().replace(/\\s+/g, " ");
-                return now && now !== before;
-            }""",
-            arg=first_word_before,
-            timeout=20_000,
-        )
+        page.wait_for_function(PAGE_CHANGED_JS, arg=first_word_before, timeout=20_000)
     except PlaywrightTimeoutError:
         # If it didn't change, assume we didn't navigate
         return False
@@ -144,51 +214,601 @@ def write_csv(path: Path, rows: List[Row]) -> None:
             w.writerow([r.level, r.word, r.extra, r.translation])
 
 def write_jsonl(path: Path, rows: List[Row]) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r.__dict__, ensure_ascii=False) + "\n")
-
-def scrape_level(page: Page, level: str, polite_delay_s: float = 0.2) -> List[Row]:
+    jsonl_io.write_jsonl(path, (r.__dict__ for r in rows))
+
+def write_level(level: str, rows: List[Row], state: Optional[ScrapeState] = None) -> None:
+    csv_path = OUT_DIR / f"ros_edu_basic_dictionary_{level}.csv"
+    jsonl_path = OUT_DIR / f"ros_edu_basic_dictionary_{level}.jsonl"
+    if state is not None:
+        # Pages are only reachable by clicking through, so every page is still
+        # visited; what --incremental saves is the rewrite and the downstream rebuild.
+        new = [r.__dict__ for r in rows]
+        old = list(jsonl_io.iter_jsonl(jsonl_path)) if jsonl_path.exists() else []
+        changed = state.finish_level(level, new)
+        changes = diff_rows(old, new, key_fields=("word", "extra"))
+        _, changed_path = write_changelog(OUT_DIR / f"ros_edu_basic_dictionary_{level}", changes)
+        state.save()
+        print(f"[{level}] changes: {summarize_changes(changes)} -> {changed_path}")
+        if old and not changed:
+            print(f"[{level}] unchanged since last run; kept {jsonl_path}")
+            return
+    write_csv(csv_path, rows)
+    write_jsonl(jsonl_path, rows)
+    print(f"[{level}] wrote {len(rows)} rows")
+
+def level_checkpoint(level: str, resume: bool) -> PageCheckpoint:
+    return PageCheckpoint(OUT_DIR / f"ros_edu_basic_dictionary_{level}", level, resume=resume, first=1, step=1)
+
+def scrape_level(page: Page, level: str, polite_delay_s: float = 0.2, fast: bool = False,
+                 state: Optional[ScrapeState] = None,
+                 checkpoint: Optional[PageCheckpoint] = None) -> Tuple[List[Row], int]:
+    """
+    Returns (deduped rows, pages visited). With a checkpoint, each page's rows
+    are streamed to it; pages it already holds are clicked through (the
+    catalog has no page URLs) without being extracted again.
+    """
     _click_level_filter(page, level)
     _wait_for_dictionary_rows(page)
 
+    extract = _extract_rows_fast if fast else _extract_rows_on_current_page
     all_rows: List[Row] = []
     page_num = 1
+    t0 = time.perf_counter()
+
+    if checkpoint is not None and checkpoint.last:
+        all_rows = [Row(**d) for d in checkpoint.rows]
+        print(f"[{level}] resuming after page {checkpoint.last} ({len(all_rows)} rows from checkpoint)")
+        while page_num <= checkpoint.last:
+            time.sleep(polite_delay_s)
+            if not _click_next_page(page, settle_ms=0 if fast else 200):
+                return _dedupe_keep_order(all_rows), page_num
+            page_num += 1
 
     while True:
-        rows = _extract_rows_on_current_page(page, level)
+        rows = extract(page, level)
         all_rows.extend(rows)
-        print(f"[{level}] page {page_num}: +{len(rows)} rows (total {len(all_rows)})")
+        if checkpoint is not None:
+            checkpoint.add_page(page_num, [r.__dict__ for r in rows])
+        note = ""
+        if state is not None and not state.record_page(level, f"page {page_num}", [r.__dict__ for r in rows]):
+            note = " unchanged"
+        print(f"[{level}] page {page_num}: +{len(rows)} rows (total {len(all_rows)}){note}")
 
         time.sleep(polite_delay_s)
 
-        if not _click_next_page(page):
+        if not _click_next_page(page, settle_ms=0 if fast else 200):
             break
 
         page_num += 1
 
-    return _dedupe_keep_order(all_rows)
+    elapsed = time.perf_counter() - t0
+    print(f"[{level}] {page_num} pages in {elapsed:.1f}s ({page_num / max(elapsed, 1e-9):.2f} pages/s)")
+    return _dedupe_keep_order(all_rows), page_num
+
+# ----------------------------
+# --parallel: one browser context per level (async Playwright)
+# ----------------------------
+
+async def _scrape_level_async(browser, throttle: HostThrottle, level: str,
+                              archive: Optional[HttpArchive] = None,
+                              state: Optional[ScrapeState] = None,
+                              checkpoint: Optional[PageCheckpoint] = None) -> Tuple[List[Row], int]:
+    # ros-edu pages through the catalog with JS clicks, so pages within a level
+    # can't be addressed directly; levels run side by side instead.
+    context = await browser.new_context()
+    page = await context.new_page()
+
+    async def block(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", block)
+    if archive is not None:
+        # Registered last, so it sees requests first and falls back to `block`.
+        await page.route("**/*", archive.handle_async)
+    try:
+        async with throttle.slot(BASE_URL):
+            await page.goto(BASE_URL, wait_until="domcontentloaded")
+        btn = page.get_by_text("Принять условия", exact=False)
+        if await btn.count() > 0:
+            try:
+                await btn.first.click(timeout=3000)
+            except Exception:
+                pass
+
+        link = page.get_by_text(LEVEL_LINK_TEXT[level], exact=False).first
+        await link.scroll_into_view_if_needed()
+        async with throttle.slot(BASE_URL):
+            await link.click(timeout=15_000)
+
+        all_rows: List[Row] = []
+        skip = 0
+        if checkpoint is not None and checkpoint.last:
+            all_rows = [Row(**d) for d in checkpoint.rows]
+            skip = checkpoint.last
+            print(f"[{level}] resuming after page {skip} ({len(all_rows)} rows from checkpoint)")
+        page_num = 0
+        while True:
+            page_num += 1
+            await page.locator(ROW_SELECTOR).first.wait_for(state="visible", timeout=20_000)
+            if page_num > skip:
+                rows = _rows_from_columns(await page.eval_on_selector_all(ROW_SELECTOR, ROWS_JS), level)
+                all_rows.extend(rows)
+                if checkpoint is not None:
+                    checkpoint.add_page(page_num, [r.__dict__ for r in rows])
+                note = ""
+                if state is not None and not state.record_page(level, f"page {page_num}", [r.__dict__ for r in rows]):
+                    note = " unchanged"
+                print(f"[{level}] page {page_num}: +{len(rows)} rows (total {len(all_rows)}){note}")
+
+            nav = await page.evaluate(NEXT_STATE_JS)
+            if not nav["has_next"]:
+                break
+            async with throttle.slot(BASE_URL):
+                await page.locator(NEXT_SELECTOR).first.click(timeout=10_000)
+                try:
+                    await page.wait_for_function(PAGE_CHANGED_JS, arg=nav["first"], timeout=20_000)
+                except PlaywrightTimeoutError:
+                    break
+        return _dedupe_keep_order(all_rows), page_num
+    finally:
+        await context.close()
+
+async def scrape_parallel(levels: List[str], parallel: int, per_host: int, delay_s: float,
+                          archive: Optional[HttpArchive] = None, state: Optional[ScrapeState] = None,
+                          resume: bool = False) -> int:
+    """Scrapes up to `parallel` levels at once; each level is written as soon as it finishes."""
+    throttle = HostThrottle(per_host, delay_s)
+    sem = asyncio.Semaphore(max(1, parallel))
+    total_pages = 0
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+
+        async def run(level: str) -> None:
+            nonlocal total_pages
+            checkpoint = level_checkpoint(level, resume)
+            try:
+                async with sem:
+                    t0 = time.perf_counter()
+                    rows, pages = await _scrape_level_async(browser, throttle, level, archive, state, checkpoint)
+                elapsed = time.perf_counter() - t0
+                print(f"[{level}] {pages} pages in {elapsed:.1f}s ({pages / max(elapsed, 1e-9):.2f} pages/s)")
+                total_pages += pages
+                write_level(level, rows, state)
+                checkpoint.finish()
+            finally:
+                checkpoint.close()
+
+        try:
+            await asyncio.gather(*(run(level) for level in levels))
+        finally:
+            await browser.close()
+    return total_pages
+
+# ----------------------------
+# --discover / --api: call the catalog XHR directly
+# ----------------------------
+
+# What --discover learned about the catalog request; read by --api.
+API_SPEC_PATH = OUT_DIR / "catalog_api.json"
+
+# Request headers worth replaying; the rest come from the requests session.
+API_HEADERS = {"accept", "content-type", "x-requested-with", "referer"}
+
+_thread_local = threading.local()
+
+
+def _request_params(method: str, url: str, post_data: Optional[str], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Splits a request into endpoint + flat parameter dicts (query string, form body, JSON body)."""
+    parts = urlsplit(url)
+    params: Dict[str, Any] = {
+        "method": method,
+        "url": urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")),
+        "query": dict(parse_qsl(parts.query, keep_blank_values=True)),
+        "form": {},
+        "json": {},
+        "headers": {k: v for k, v in headers.items() if k.lower() in API_HEADERS},
+    }
+    if post_data:
+        if "json" in headers.get("content-type", "").lower():
+            body = json.loads(post_data)
+            if isinstance(body, dict):
+                params["json"] = body
+        else:
+            params["form"] = dict(parse_qsl(post_data, keep_blank_values=True))
+    return params
+
+
+def _changed_param(a: Dict[str, Any], b: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(location, name) of the one parameter that differs between two captured requests."""
+    diffs = []
+    for loc in ("query", "form", "json"):
+        for name in sorted(set(a[loc]) | set(b[loc])):
+            if a[loc].get(name) != b[loc].get(name):
+                diffs.append((loc, name))
+    return diffs[0] if len(diffs) == 1 else None
+
+
+def build_api_spec(first_pages: Dict[str, Dict[str, Any]], second_page: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    first_pages: the catalog request for page 1 of each level; second_page:
+    page 2 of the first level. The parameter that differs between levels is
+    the level filter, the one that differs between pages is the pager.
+    """
+    levels = list(first_pages)
+    base = first_pages[levels[0]]
+    page_param = _changed_param(base, second_page)
+    if page_param is None:
+        raise SystemExit(f"[discover] can't tell which parameter pages the catalog: {base} vs {second_page}")
+    level_param = None
+    for lvl in levels[1:]:
+        level_param = level_param or _changed_param(base, first_pages[lvl])
+    if level_param is None:
+        raise SystemExit("[discover] can't tell which parameter selects the level (need two levels)")
+
+    loc, name = page_param
+    v1, v2 = base[loc].get(name), second_page[loc].get(name)
+    if v1 not in (None, ""):
+        first, step = int(v1), int(v2) - int(v1)
+    elif int(v2) == 2:
+        first, step = 1, 1            # 1-based page numbers, page 1 sent without one
+    else:
+        first, step = 0, int(v2)      # row offsets, page 1 sent without one
+
+    spec = {k: base[k] for k in ("method", "url", "query", "form", "json", "headers")}
+    spec.update({
+        "level_param": list(level_param),
+        "levels": {lvl: first_pages[lvl][level_param[0]].get(level_param[1]) for lvl in levels},
+        "page_param": list(page_param),
+        "page_first": first,
+        "page_step": step,
+    })
+    return spec
+
+
+def discover_api(levels: List[str]) -> Dict[str, Any]:
+    """Clicks through the catalog once with a browser and records its XHR; writes API_SPEC_PATH."""
+    captured = []
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        _block_heavy_resources(page)
+        page.on("requestfinished", lambda r: captured.append(r) if r.resource_type in ("xhr", "fetch") else None)
+        page.goto(BASE_URL, wait_until="domcontentloaded")
+        _accept_cookies_if_present(page)
+
+        def catalog_request(mark: int) -> Dict[str, Any]:
+            # The catalog call is the one whose response carries the dictionary rows.
+            for req in reversed(captured[mark:]):
+                resp = req.response()
+                try:
+                    body = resp.text() if resp is not None else ""
+                except Exception:
+                    continue
+                if "row-dictionary" in body:
+                    return _request_params(req.method, req.url, req.post_data, req.headers)
+            raise SystemExit("[discover] no XHR with dictionary rows seen; the catalog may render server-side")
+
+        first_pages: Dict[str, Dict[str, Any]] = {}
+        second_page = None
+        for level in levels:
+            mark = len(captured)
+            _click_level_filter(page, level)
+            _wait_for_dictionary_rows(page)
+            page.wait_for_load_state("networkidle")
+            first_pages[level] = catalog_request(mark)
+            print(f"[discover] {level}: {first_pages[level]['method']} {first_pages[level]['url']}")
+            if second_page is None:
+                mark = len(captured)
+                if not _click_next_page(page):
+                    raise SystemExit(f"[discover] {level} has a single page; pick a level with more")
+                page.wait_for_load_state("networkidle")
+                second_page = catalog_request(mark)
+        browser.close()
+
+    spec = build_api_spec(first_pages, second_page)
+    API_SPEC_PATH.write_text(json.dumps(spec, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[discover] level={'.'.join(spec['level_param'])} page={'.'.join(spec['page_param'])} "
+          f"(first={spec['page_first']}, step={spec['page_step']}) -> {API_SPEC_PATH}")
+    return spec
+
+
+def browser_cookies() -> Tuple[List[Dict[str, Any]], str]:
+    """One short browser session for the site's cookies (and a matching User-Agent)."""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context()
+        page = context.new_page()
+        _block_heavy_resources(page)
+        page.goto(BASE_URL, wait_until="domcontentloaded")
+        _accept_cookies_if_present(page)
+        cookies = context.cookies()
+        user_agent = page.evaluate("navigator.userAgent")
+        browser.close()
+    return cookies, user_agent
+
+
+def _api_session(cookies: List[Dict[str, Any]], user_agent: str):
+    sess = getattr(_thread_local, "session", None)
+    if sess is None:
+        sess = requests.Session()
+        sess.headers["User-Agent"] = user_agent
+        for c in cookies:
+            sess.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+        _thread_local.session = sess
+    return sess
+
+
+def _catalog_fragment(body: str) -> str:
+    """The catalog HTML, whether the endpoint returns it bare or inside JSON."""
+    if not body.lstrip().startswith(("{", "[")):
+        return body
+    parts: List[str] = []
+    stack = [json.loads(body)]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, dict):
+            stack.extend(v.values())
+        elif isinstance(v, list):
+            stack.extend(v)
+        elif isinstance(v, str) and ("row-dictionary" in v or "pagination" in v):
+            parts.append(v)
+    return "\n".join(parts)
+
+
+def parse_catalog_fragment(html: str, level: str) -> Tuple[List[Row], Optional[int], Optional[bool]]:
+    """
+    Returns (rows, largest page number the pager shows, whether its "next"
+    link is enabled). The pager may show only a window of page numbers, so
+    the number is a lower bound on the page count; next is None when the
+    fragment has no "next" link at all.
+    """
+    doc = parse_html(html)
+    # inner_text, as ROWS_JS reads innerText: <br>-separated words stay apart.
+    raw = [[d.inner_text() for d in r.select("div")[:3]] for r in doc.select(".row.row-dictionary")]
+    numbers = [int(a.text()) for a in doc.select("ul.pagination a.page-link") if a.text().isdigit()]
+    nxt = doc.select_one("ul.pagination a.page-link.next")
+    has_next = None
+    if nxt is not None:
+        li = nxt.parent if nxt.parent is not None and nxt.parent.tag == "li" else None
+        has_next = not (li is not None and "disabled" in li.classes)
+    return _rows_from_columns(raw, level), max(numbers) if numbers else None, has_next
+
+
+def fetch_catalog_page(spec: Dict[str, Any], level: str, page_num: int, session, limiter: HostRateLimiter,
+                       timeout_s: float = 30.0) -> Tuple[List[Row], Optional[int], Optional[bool]]:
+    params = {loc: dict(spec[loc]) for loc in ("query", "form", "json")}
+    loc, name = spec["level_param"]
+    params[loc][name] = spec["levels"][level]
+    loc, name = spec["page_param"]
+    params[loc][name] = str(spec["page_first"] + (page_num - 1) * spec["page_step"])
+    if loc == "json":
+        params[loc][name] = int(params[loc][name])
+
+    for attempt in range(3):
+        limiter.wait(spec["url"])
+        try:
+            resp = session.request(
+                spec["method"],
+                spec["url"],
+                params=params["query"] or None,
+                data=params["form"] or None,
+                json=params["json"] or None,
+                headers=spec["headers"],
+                timeout=timeout_s,
+            )
+            if resp.status_code in (429, 500, 502, 503, 504) and attempt < 2:
+                time.sleep(2 ** attempt)
+                continue
+            resp.raise_for_status()
+        except requests.RequestException:
+            if attempt == 2:
+                raise
+            time.sleep(2 ** attempt)
+            continue
+        resp.encoding = resp.encoding or "utf-8"
+        return parse_catalog_fragment(_catalog_fragment(resp.text), level)
+    raise RuntimeError(f"unreachable: {level} page {page_num}")
+
+
+def scrape_api(levels: List[str], spec: Dict[str, Any], workers: int, delay_s: float,
+               state: Optional[ScrapeState] = None) -> int:
+    """
+    Page 1 of every level gives a page count (the largest page number its
+    pager shows); all those pages of all levels then go through one thread
+    pool. A windowed pager undercounts, so unless the last planned page's
+    "next" link is disabled, a level then walks on until a page is empty or
+    repeats the previous one. Returns pages fetched.
+    """
+    if requests is None:
+        raise SystemExit("--api needs the requests package (pip install requests)")
+    missing = [lvl for lvl in levels if lvl not in spec["levels"]]
+    if missing:
+        raise SystemExit(f"{API_SPEC_PATH} has no filter value for {missing}; rerun --discover with those levels")
+
+    cookies, user_agent = browser_cookies()
+    limiter = HostRateLimiter(delay_s)
+
+    def job(level: str, page_num: int) -> Tuple[List[Row], Optional[int], Optional[bool]]:
+        return fetch_catalog_page(spec, level, page_num, _api_session(cookies, user_agent), limiter)
+
+    pages_by_level: Dict[str, Dict[int, List[Row]]] = {lvl: {} for lvl in levels}
+    planned: Dict[str, int] = {}
+    pending: Dict[str, int] = {}
+    # Next-link state of each level's last planned page.
+    tail_next: Dict[str, Optional[bool]] = {}
+    fetched = 0
+
+    def keep(level: str, page_num: int, rows: List[Row]) -> None:
+        pages_by_level[level][page_num] = rows
+        if state is not None:
+            state.record_page(level, f"page {page_num}", [r.__dict__ for r in rows])
+
+    def walk(level: str) -> int:
+        """Fetch pages past the planned ones until one is empty or repeats the previous one."""
+        n = planned[level] + 1
+        prev = pages_by_level[level][n - 1]
+        walked = 0
+        while prev:
+            rows, _, has_next = job(level, n)
+            walked += 1
+            if not rows or rows == prev:
+                break
+            keep(level, n, rows)
+            if has_next is False:
+                break
+            n, prev = n + 1, rows
+        return walked
+
+    def finish(level: str) -> int:
+        walked = walk(level) if tail_next.get(level) is not False else 0
+        pages = pages_by_level[level]
+        rows = [r for n in sorted(pages) for r in pages[n]]
+        extra = f" ({len(pages) - planned[level]} past the pager's last page)" if len(pages) > planned[level] else ""
+        print(f"[{level}] {len(pages)} pages{extra}")
+        write_level(level, _dedupe_keep_order(rows), state)
+        return walked
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        firsts = {lvl: pool.submit(job, lvl, 1) for lvl in levels}
+        futures = {}
+        for lvl, fut in firsts.items():
+            rows, last, has_next = fut.result()
+            keep(lvl, 1, rows)
+            fetched += 1
+            planned[lvl] = last or 1
+            pending[lvl] = planned[lvl] - 1
+            if pending[lvl] == 0:
+                tail_next[lvl] = has_next
+            for n in range(2, planned[lvl] + 1):
+                futures[pool.submit(job, lvl, n)] = (lvl, n)
+
+        for lvl in levels:
+            if pending[lvl] == 0:
+                fetched += finish(lvl)
+        for fut in as_completed(futures):
+            lvl, n = futures[fut]
+            rows, _, has_next = fut.result()
+            keep(lvl, n, rows)
+            fetched += 1
+            if n == planned[lvl]:
+                tail_next[lvl] = has_next
+            pending[lvl] -= 1
+            if pending[lvl] == 0:
+                fetched += finish(lvl)
+    return fetched
 
 def main():
-    levels = ["A1", "A2", "B1", "B2", "C1", "C2"]
+    ap = argparse.ArgumentParser(description="Export the ros-edu.ru basic dictionary per CEFR level.")
+    ap.add_argument("--levels", nargs="+", default=LEVELS)
+    ap.add_argument("--delay", type=float, default=0.2, help="Polite delay between pages (seconds; per host with --parallel)")
+    ap.add_argument(
+        "--fast",
+        action="store_true",
+        help="Headless, no slow-mo, images/fonts/CSS blocked, one DOM round-trip per page",
+    )
+    ap.add_argument(
+        "--parallel",
+        type=int,
+        default=0,
+        help="Scrape up to N levels at once in separate browser contexts (implies --fast)",
+    )
+    ap.add_argument("--per-host", type=int, default=2, help="With --parallel: max requests in flight per host")
+    ap.add_argument("--record", default="", help="Save every document/XHR/script response to DIR")
+    ap.add_argument("--replay", default="", help="Serve responses from a --record DIR; no network")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Track per-page hashes, keep unchanged levels, write <level>.changes/.changed.jsonl",
+    )
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue each level after the last page in its <level>.checkpoint.json (rows so far are in <level>.partial.jsonl)",
+    )
+    ap.add_argument(
+        "--discover",
+        action="store_true",
+        help=f"Click through the catalog once and record its XHR request to {API_SPEC_PATH}",
+    )
+    ap.add_argument(
+        "--api",
+        action="store_true",
+        help="Call the recorded catalog endpoint directly (browser only for cookies); see --discover",
+    )
+    ap.add_argument("--workers", type=int, default=4, help="With --api: concurrent requests")
+    args = ap.parse_args()
+
+    levels = [x.upper() for x in args.levels]
+    if args.discover or args.api:
+        if args.record or args.replay or args.resume:
+            ap.error("--record/--replay/--resume apply to the browser modes, not --discover/--api")
+        spec = discover_api(levels) if args.discover else None
+        if not args.api:
+            return
+        if spec is None:
+            if not API_SPEC_PATH.exists():
+                raise SystemExit(f"{API_SPEC_PATH} not found; run with --discover first")
+            spec = json.loads(API_SPEC_PATH.read_text(encoding="utf-8"))
+        state = ScrapeState(OUT_DIR / "scrape_state.json") if args.incremental else None
+        t0 = time.perf_counter()
+        total_pages = scrape_api(levels, spec, args.workers, args.delay, state)
+        elapsed = time.perf_counter() - t0
+        print(f"[DONE] {total_pages} pages in {elapsed:.1f}s ({total_pages / max(elapsed, 1e-9):.2f} pages/s, api mode)")
+        return
+
+    archive = archive_from_args(args.record, args.replay)
+    state = ScrapeState(OUT_DIR / "scrape_state.json") if args.incremental else None
+    if args.replay:
+        args.delay = 0.0  # nothing to be polite to
+    total_pages = 0
+    t0 = time.perf_counter()
+
+    if args.parallel > 0:
+        total_pages = asyncio.run(scrape_parallel(levels, args.parallel, args.per_host, args.delay, archive, state,
+                                                  args.resume))
+        elapsed = time.perf_counter() - t0
+        print(f"[DONE] {total_pages} pages in {elapsed:.1f}s ({total_pages / max(elapsed, 1e-9):.2f} pages/s, parallel={args.parallel})")
+        if archive is not None:
+            print(archive.summary())
+        return
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=50)  # visible + easier to debug
+        if args.fast:
+            browser = p.chromium.launch(headless=True)
+        else:
+            browser = p.chromium.launch(headless=False, slow_mo=50)  # visible + easier to debug
         page = browser.new_page()
+        if args.fast:
+            _block_heavy_resources(page)
+        if archive is not None:
+            page.route("**/*", archive.handle)
         page.goto(BASE_URL, wait_until="domcontentloaded")
 
         _accept_cookies_if_present(page)
 
         for level in levels:
-            rows = scrape_level(page, level)
-
-            csv_path = OUT_DIR / f"ros_edu_basic_dictionary_{level}.csv"
-            jsonl_path = OUT_DIR / f"ros_edu_basic_dictionary_{level}.jsonl"
-            write_csv(csv_path, rows)
-            write_jsonl(jsonl_path, rows)
-            print(f"[{level}] wrote {len(rows)} rows")
+            checkpoint = level_checkpoint(level, args.resume)
+            try:
+                rows, pages = scrape_level(page, level, polite_delay_s=args.delay, fast=args.fast, state=state,
+                                           checkpoint=checkpoint)
+                total_pages += pages
+                write_level(level, rows, state)
+                checkpoint.finish()
+            finally:
+                checkpoint.close()
 
         browser.close()
 
+    elapsed = time.perf_counter() - t0
+    mode = "fast" if args.fast else "default"
+    print(f"[DONE] {total_pages} pages in {elapsed:.1f}s ({total_pages / max(elapsed, 1e-9):.2f} pages/s, {mode} mode)")
+    if archive is not None:
+        print(archive.summary())
+
 if __name__ == "__main__":
     main()